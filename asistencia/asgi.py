@@ -1,4 +1,6 @@
 import os
 from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asistencia.settings')
+# Bajo ASGI se sirven las versiones async de dashboards y métricas
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 application = get_asgi_application()
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 import environ
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,12 +28,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'asistencias.middleware.CompresionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'asistencias.middleware.PerfilMiddleware',
+    'asistencias.registro.RegistroMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'asistencias.middleware.ReplicaStickyMiddleware',
 ]
 
 ROOT_URLCONF = 'asistencia.urls'
@@ -53,6 +58,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'asistencia.wsgi.application'
+ASGI_APPLICATION = 'asistencia.asgi.application'
+
+# Dashboards/métricas async (asyncio.gather). asgi.py lo activa por defecto;
+# bajo WSGI (Vercel) se mantienen las vistas sync.
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
 
 # ===== Base de datos =====
 import dj_database_url
@@ -66,6 +76,60 @@ DATABASES = {
     )
 }
 
+# Réplica de solo lectura para métricas/reportes (opcional).
+# Localmente se puede probar con dos SQLite:
+#   DATABASE_URL=sqlite:///db.sqlite3 DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+if env('DATABASE_REPLICA_URL', default=''):
+    DATABASES['replica'] = dj_database_url.parse(
+        env('DATABASE_REPLICA_URL'),
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    # En tests la réplica apunta a la misma base que default
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['asistencias.routers.ReplicaRouter']
+
+# Segundos que un usuario sigue leyendo de la primaria después de un POST
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=15)
+
+# ===== Pool de conexiones (Postgres + psycopg 3) =====
+# Con DB_POOL=True (default) cada instancia reutiliza un pool acotado en lugar
+# de abrir una conexión por request. Los defaults están pensados para
+# serverless: pocas conexiones por instancia y sin conexiones ociosas de más,
+# para no superar el límite de Neon cuando muchas instancias arrancan juntas.
+# psycopg_pool se importa sólo con Postgres configurado: con SQLite el import
+# cuesta ~145 ms de arranque en frío (ver `manage.py perfil_arranque`).
+# DB_POOL queda True sólo si alguna base usa de verdad el pool.
+_POSTGRES = 'django.db.backends.postgresql'
+DB_POOL = env.bool("DB_POOL", default=True) and any(
+    _db['ENGINE'] == _POSTGRES for _db in DATABASES.values()
+)
+if DB_POOL:
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        DB_POOL = False  # psycopg2 o psycopg sin pool: se mantiene conn_max_age
+
+for _db in DATABASES.values():
+    if DB_POOL and _db['ENGINE'] == _POSTGRES:
+        _db['OPTIONS'] = {
+            **_db.get('OPTIONS', {}),
+            'pool': {
+                'min_size': env.int('DB_POOL_MIN_SIZE', default=0),
+                'max_size': env.int('DB_POOL_MAX_SIZE', default=4),
+                'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+                'max_idle': env.float('DB_POOL_MAX_IDLE', default=60.0),
+            },
+        }
+        # Django no admite conexiones persistentes junto con el pool
+        _db['CONN_MAX_AGE'] = 0
+        _db['CONN_HEALTH_CHECKS'] = False
+
+# Consultas en paralelo por request en las vistas async (sólo con el pool;
+# sin él corren en serie sobre la conexión del request, ver async_views.py)
+ASYNC_PARALELO_MAX = env.int('ASYNC_PARALELO_MAX', default=4)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME':'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME':'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -95,17 +159,106 @@ AUTH_USER_MODEL = 'asistencias.User'
 # Nombre institucional para exportes/reportes
 INSTITUTO_NOMBRE = "Instituto CENT40 - Campus Virtual Río Negro"
 
+# === Asistencia por QR ===
+# Cada cuántos segundos se renueva el QR y cuánto dura un token escaneado
+CHECKIN_ROTACION = env.int('CHECKIN_ROTACION', default=30)
+CHECKIN_TOKEN_TTL = env.int('CHECKIN_TOKEN_TTL', default=120)
+
+# === Compresión de respuestas ===
+# Brotli (si el paquete está instalado) con calidad moderada: páginas dinámicas
+BROTLI_CALIDAD = env.int('BROTLI_CALIDAD', default=5)
+
+# === Caché de exportaciones (XLSX/PDF) ===
+# En el temporal del sistema (el único escribible en Vercel); sin carpeta
+# usable los exports se generan sin cachear. Tamaño máximo en disco: al
+# superarlo se borran los archivos menos usados.
+CACHE_EXPORTES_DIR = env('CACHE_EXPORTES_DIR', default=str(Path(tempfile.gettempdir()) / 'siga_cache_exportes'))
+CACHE_EXPORTES_MAX_MB = env.int('CACHE_EXPORTES_MAX_MB', default=200)
+
+# === Borrados en cascada por lotes ===
+# Hasta ELIMINACION_UMBRAL filas se borra en el request; más, en segundo plano:
+# en un hilo (ELIMINACION_EN_HILO) o con `manage.py procesar_eliminaciones`.
+# En Vercel (VERCEL=1) el hilo se congela al responder, así que por defecto no
+# se usa y los borrados avanzan con el cron de vercel.json contra
+# /app/cron/eliminaciones/ (requiere CRON_SECRET).
+ELIMINACION_LOTE = env.int('ELIMINACION_LOTE', default=1000)
+ELIMINACION_UMBRAL = env.int('ELIMINACION_UMBRAL', default=2000)
+ELIMINACION_EN_HILO = env.bool('ELIMINACION_EN_HILO', default=not env.bool('VERCEL', default=False))
+ELIMINACION_CRON_SEGUNDOS = env.int('ELIMINACION_CRON_SEGUNDOS', default=8)
+
+# === Logging ===
+# JSON lines en LOG_DIR (rotación por tamaño) escritos por un QueueListener:
+# los requests sólo encolan. Cada línea lleva request_id, rol y vista. Por
+# defecto en el temporal del sistema (el único escribible en Vercel); si el
+# archivo no se puede abrir, las líneas van a stderr.
+# LOG_MUESTREO: fracción de eventos de caminos calientes que se registran
+# (1 = todos, 0 = ninguno); los eventos no listados se registran siempre.
+LOG_DIR = Path(env('LOG_DIR', default=str(Path(tempfile.gettempdir()) / 'siga_logs')))
+LOG_NIVEL = env('LOG_NIVEL', default='INFO')
+LOG_MAX_MB = env.int('LOG_MAX_MB', default=10)
+LOG_ARCHIVOS = env.int('LOG_ARCHIVOS', default=5)
+LOG_MUESTREO = {
+    'request': env.float('LOG_MUESTREO_REQUEST', default=0.05),
+    'asistencia_guardada': env.float('LOG_MUESTREO_ASISTENCIA', default=0.2),
+    'exportacion': env.float('LOG_MUESTREO_EXPORTACION', default=1.0),
+    'login': env.float('LOG_MUESTREO_LOGIN', default=1.0),
+    'login_fallido': 1.0,
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'archivo': {
+            'class': 'asistencias.registro.ColaJsonHandler',
+            'filename': str(LOG_DIR / 'siga.jsonl'),
+            'maxBytes': LOG_MAX_MB * 1024 * 1024,
+            'backupCount': LOG_ARCHIVOS,
+        },
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'asistencias': {
+            'handlers': ['archivo'] + (['consola'] if DEBUG else []),
+            'level': LOG_NIVEL,
+            'propagate': False,
+        },
+        'django.request': {'handlers': ['archivo', 'consola'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# === Respaldos (manage.py respaldar / restaurar) ===
+BACKUPS_DIR = env('BACKUPS_DIR', default=str(BASE_DIR / 'backups'))
+
 # === Password reset ===
 # Link de restablecimiento válido por 24 horas (en segundos)
 PASSWORD_RESET_TIMEOUT = 60 * 60 * 24
 
-# === Email: dev por consola / prod por SMTP vía .env ===
-# En DEBUG=True se usa consola; en producción se toman valores de .env
+# === Email: outbox + worker ===
+# Todo correo se encola en la tabla correo_saliente (el request no espera al
+# servidor SMTP) y lo envía asistencias/correo.py en lotes con una conexión
+# reutilizada, reintentos y backoff: en un hilo tras encolar (CORREO_EN_HILO)
+# y/o con `manage.py enviar_correos` (cron o --continuo). En Vercel (VERCEL=1)
+# el hilo se congela al responder: va apagado por defecto y el envío lo hace
+# el cron de vercel.json contra /app/cron/correos/ (requiere CRON_SECRET).
+# CORREO_BACKEND_ENVIO: "consola" y "archivo" (EMAIL_FILE_PATH) para probar
+# el worker en local; "smtp" en producción.
+EMAIL_BACKEND = 'asistencias.correo.CorreoSalienteBackend'
+CORREO_BACKEND_ENVIO = env('CORREO_BACKEND_ENVIO', default='consola' if DEBUG else 'smtp')
+EMAIL_FILE_PATH = env('EMAIL_FILE_PATH', default=str(BASE_DIR / 'tmp' / 'correos'))
+CORREO_EN_HILO = env.bool('CORREO_EN_HILO', default=not env.bool('VERCEL', default=False))
+CORREO_LOTE = env.int('CORREO_LOTE', default=50)
+CORREO_MAX_INTENTOS = env.int('CORREO_MAX_INTENTOS', default=6)
+CORREO_REINTENTO_BASE = env.int('CORREO_REINTENTO_BASE', default=60)  # segundos, se duplica por intento
+# Los enviados quedan sin cuerpo; enviados y con error se borran pasados estos días
+CORREO_RETENCION_DIAS = env.int('CORREO_RETENCION_DIAS', default=7)
+# Cron HTTP: Vercel manda "Authorization: Bearer $CRON_SECRET". Vacío = endpoint apagado
+CRON_SECRET = env('CRON_SECRET', default='')
+CORREO_CRON_SEGUNDOS = env.int('CORREO_CRON_SEGUNDOS', default=8)  # por debajo del timeout de la función
+
+# Dev: consola / prod: SMTP vía .env
 if DEBUG:
-    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
     DEFAULT_FROM_EMAIL = 'no-reply@siga.local'
 else:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = env('EMAIL_HOST', default='')
     EMAIL_PORT = env.int('EMAIL_PORT', default=587)
     EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='')
@@ -123,5 +276,40 @@ else:
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 7  # 7 días
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
+# === Sesiones ===
+# SESION_MODO:
+#   "db"             django_session en la base (default de Django)
+#   "cached_db"      lee del cache "sesiones" y sólo va a la base en un miss;
+#                    escribe en ambos
+#   "signed_cookies" sin estado en el servidor (serverless); los datos viajan
+#                    firmados (no cifrados) en la cookie
+# SESION_CACHE elige el cache de "sesiones": "archivo" (SESION_CACHE_DIR, por
+# defecto en el directorio temporal del sistema) o "db" (tabla cache_sesiones:
+# `manage.py createcachetable`, lo corre build_files.sh). En Vercel (VERCEL=1)
+# el default es "db": el /tmp de cada instancia es propio y una sesión cerrada
+# en una seguiría en el cache de archivo de otra.
+# "Cerrar sesión en todos los dispositivos" funciona en los tres modos
+# (ver User.sesiones_version). Medir con `manage.py bench_sesiones`.
+SESION_MODO = env('SESION_MODO', default='db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESION_MODO]
+SESION_CACHE = env('SESION_CACHE', default='db' if env.bool('VERCEL', default=False) else 'archivo')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sesiones': (
+        {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_sesiones'}
+        if SESION_CACHE == 'db' else
+        {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': env('SESION_CACHE_DIR', default=str(Path(tempfile.gettempdir()) / 'siga_cache_sesiones')),
+            'TIMEOUT': SESSION_COOKIE_AGE,
+        }
+    ),
+}
+SESSION_CACHE_ALIAS = 'sesiones'
+
 # Dominios de confianza para Vercel
 CSRF_TRUSTED_ORIGINS = env.list('CSRF_TRUSTED_ORIGINS', default=['https://*.vercel.app'])
\ No newline at end of file
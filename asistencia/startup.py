@@ -0,0 +1,116 @@
+# asistencia/startup.py
+"""
+Perfil de arranque (cold start) para el entry point WSGI de Vercel.
+
+Si la variable de entorno `SIGA_PERFIL_ARRANQUE=1` está definida, `wsgi.py`
+instala un `ImportProfiler` antes de cargar Django y, al terminar el
+arranque, imprime por stderr el costo de importación agregado por paquete
+(similar a `python -X importtime`, pero sumado por paquete de primer nivel).
+"""
+import sys
+import time
+from collections import defaultdict
+from importlib.abc import MetaPathFinder
+
+
+class _TimedLoader:
+    """Envuelve un loader y mide el tiempo de `exec_module`."""
+
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+
+class ImportProfiler(MetaPathFinder):
+    """
+    Finder que mide el tiempo propio (sin sub-imports) de cada módulo cargado.
+    """
+
+    def __init__(self):
+        self.tiempos = {}          # módulo -> segundos propios
+        self._pila = []            # [(nombre, inicio, tiempo_hijos)]
+        self._activo = False
+
+    # ---------- instalación ----------
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    # ---------- MetaPathFinder ----------
+    def find_spec(self, fullname, path=None, target=None):
+        if self._activo:
+            return None
+        self._activo = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._activo = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    # ---------- medición ----------
+    def _enter(self, name):
+        self._pila.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        nombre, inicio, hijos = self._pila.pop()
+        total = time.perf_counter() - inicio
+        self.tiempos[nombre] = self.tiempos.get(nombre, 0.0) + (total - hijos)
+        if self._pila:
+            self._pila[-1][2] += total
+
+    # ---------- reporte ----------
+    def por_paquete(self):
+        """Suma los tiempos propios por paquete de primer nivel."""
+        agregados = defaultdict(lambda: [0.0, 0])
+        for nombre, seg in self.tiempos.items():
+            raiz = nombre.split(".", 1)[0]
+            agregados[raiz][0] += seg
+            agregados[raiz][1] += 1
+        return sorted(
+            ((raiz, seg, n) for raiz, (seg, n) in agregados.items()),
+            key=lambda t: t[1],
+            reverse=True,
+        )
+
+    def reporte(self, limite=25):
+        filas = self.por_paquete()
+        total = sum(seg for _, seg, _ in filas)
+        lineas = [
+            f"{'paquete':<32} {'ms':>9} {'%':>6} {'módulos':>8}",
+            "-" * 58,
+        ]
+        for raiz, seg, n in filas[:limite]:
+            pct = (seg / total * 100) if total else 0
+            lineas.append(f"{raiz:<32} {seg * 1000:>9.1f} {pct:>6.1f} {n:>8}")
+        lineas.append("-" * 58)
+        lineas.append(f"{'TOTAL':<32} {total * 1000:>9.1f} {'':>6} {len(self.tiempos):>8}")
+        return "\n".join(lineas)
@@ -1,5 +1,22 @@
 import os
+import sys
+
+# Perfil de arranque opcional: SIGA_PERFIL_ARRANQUE=1 mide el costo de
+# importación por paquete y lo imprime en stderr (ver asistencia/startup.py).
+_perfil = None
+if os.environ.get("SIGA_PERFIL_ARRANQUE") == "1":
+    from asistencia.startup import ImportProfiler
+    _perfil = ImportProfiler().install()
+
 from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'asistencia.settings')
 application = get_wsgi_application()
+
+if _perfil is not None:
+    # Forzar la carga de URLconf + vistas, que de otro modo ocurre en el primer request
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    _perfil.uninstall()
+    print(_perfil.reporte(), file=sys.stderr)
+
 app = application  # ← Esta línea debe existir
@@ -0,0 +1,251 @@
+# asistencias/analitica.py
+"""
+Motor de analítica institucional sobre arreglos columnares de NumPy.
+
+Por cada periodo se arma un `Cubo` con una fila por Asistencia y columnas
+enteras compactas:
+
+    ids      int64  id de la asistencia (ordenado, para ubicar cambios)
+    materia  int32  código denso de la materia (índice en `materias`)
+    estado   int8   código de EstadoAsistencia
+    dia      int8   día de la semana (0 = lunes)
+
+Los cubos viven en memoria del proceso (no en el cache de Django: pickle de
+arreglos grandes en cada request cuesta más que el cálculo). Antes de usar
+uno se compara con la huella del periodo (cantidad de registros y último
+updated_at, una sola consulta para todos los periodos). Si cambió, sólo se
+traen las filas con updated_at posterior y se aplican sobre los arreglos; si
+la cantidad no cierra (hubo borrados) se reconstruye el periodo.
+
+Los desgloses son vectorizados (np.bincount): primero por materia y después
+se proyectan a carrera, docente y turno con tablas puente chicas. Un curso
+(materia + periodo) con varios docentes cuenta para cada uno de ellos, igual
+que en docente_metricas.
+
+Como exports.py y pdf.py, importa numpy a nivel de módulo: las vistas lo
+importan dentro de un try/except ImportError.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import Count, IntegerField, Max
+from django.db.models.functions import Cast
+
+from .models import Asistencia, DocenteMateria, EstadoAsistencia, Materia
+
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+_OK = (EstadoAsistencia.PRESENTE, EstadoAsistencia.JUSTIFICADO)
+MARGEN = timedelta(seconds=5)
+
+_cubos = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class Cubo:
+    periodo_id: int
+    ids: np.ndarray
+    materia: np.ndarray
+    estado: np.ndarray
+    dia: np.ndarray
+    materias: np.ndarray  # id real de cada código de materia
+    registros: int
+    marca: object  # max(updated_at) incorporado
+
+
+# ------------------------------------------------------------
+# Carga
+# ------------------------------------------------------------
+def _filas(periodo_id, desde=None):
+    qs = Asistencia.objects.filter(alumno_materia__periodo_id=periodo_id, estado__isnull=False)
+    if desde is not None:
+        qs = qs.filter(updated_at__gt=desde)
+    filas = list(
+        qs.annotate(codigo=Cast("estado", IntegerField()))
+        .order_by("id")
+        .values_list("id", "alumno_materia__materia_id", "codigo", "fecha", "updated_at")
+    )
+    if not filas:
+        return None
+    ids, materias, estados, fechas, marcas = zip(*filas)
+    dias = (np.array(fechas, dtype="datetime64[D]").astype(np.int64) + 3) % 7  # 1970-01-01 fue jueves
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(materias, dtype=np.int64),
+        np.array(estados, dtype=np.int8),
+        dias.astype(np.int8),
+        max(marcas),
+    )
+
+
+def _construir(periodo_id, registros):
+    datos = _filas(periodo_id)
+    if datos is None:
+        vacio = np.empty(0, dtype=np.int64)
+        return Cubo(periodo_id, vacio, vacio.astype(np.int32), vacio.astype(np.int8),
+                    vacio.astype(np.int8), vacio, 0, None)
+    ids, materias, estado, dia, marca = datos
+    codigos_materia, materia = np.unique(materias, return_inverse=True)
+    return Cubo(periodo_id, ids, materia.astype(np.int32), estado, dia,
+                codigos_materia, registros, marca)
+
+
+def _actualizar(cubo, registros, marca):
+    """Aplica las filas modificadas desde cubo.marca; None si hay que reconstruir."""
+    # Con margen: una transacción lenta puede confirmar con un updated_at viejo.
+    # Reaplicar filas ya incorporadas no cambia nada.
+    datos = _filas(cubo.periodo_id, desde=cubo.marca - MARGEN)
+    if datos is None:
+        return None
+    ids, materias, estado, dia, nueva_marca = datos
+
+    # Materias nuevas en el periodo: ampliar el diccionario de códigos
+    nuevas = np.setdiff1d(materias, cubo.materias)
+    codigos_materia = np.concatenate([cubo.materias, nuevas]) if nuevas.size else cubo.materias
+    orden = np.argsort(codigos_materia)
+    materia = orden[np.searchsorted(codigos_materia, materias, sorter=orden)].astype(np.int32)
+
+    pos = np.searchsorted(cubo.ids, ids)
+    existentes = (pos < cubo.ids.size) & (cubo.ids[np.minimum(pos, cubo.ids.size - 1)] == ids)
+
+    est, d, mat = cubo.estado.copy(), cubo.dia.copy(), cubo.materia.copy()
+    est[pos[existentes]] = estado[existentes]
+    d[pos[existentes]] = dia[existentes]
+    mat[pos[existentes]] = materia[existentes]
+
+    nuevos = ~existentes
+    todos_ids = np.concatenate([cubo.ids, ids[nuevos]])
+    if todos_ids.size != registros:
+        return None  # hubo borrados: no se pueden ubicar por updated_at
+    orden = np.argsort(todos_ids, kind="stable")
+    return Cubo(
+        cubo.periodo_id,
+        todos_ids[orden],
+        np.concatenate([mat, materia[nuevos]])[orden],
+        np.concatenate([est, estado[nuevos]])[orden],
+        np.concatenate([d, dia[nuevos]])[orden],
+        codigos_materia,
+        registros,
+        max(nueva_marca, cubo.marca),
+    )
+
+
+def cubos(periodo_ids=None):
+    """Cubos al día de los periodos pedidos (todos si es None)."""
+    # Sólo filas tomadas, como _filas(): las precargadas sin estado no cuentan
+    huellas = Asistencia.objects.filter(estado__isnull=False).values_list("alumno_materia__periodo_id").annotate(
+        registros=Count("id"), marca=Max("updated_at"),
+    )
+    if periodo_ids is not None:
+        huellas = huellas.filter(alumno_materia__periodo_id__in=periodo_ids)
+
+    resultado = []
+    for periodo_id, registros, marca in huellas:
+        with _lock:
+            cubo = _cubos.get(periodo_id)
+        if cubo is None or not cubo.ids.size:
+            cubo = _construir(periodo_id, registros)
+        elif cubo.registros != registros or cubo.marca != marca:
+            cubo = _actualizar(cubo, registros, marca) or _construir(periodo_id, registros)
+        with _lock:
+            _cubos[periodo_id] = cubo
+        resultado.append(cubo)
+    return resultado
+
+
+def invalidar():
+    with _lock:
+        _cubos.clear()
+
+
+# ------------------------------------------------------------
+# Desgloses
+# ------------------------------------------------------------
+def _filas_desglose(etiquetas, total, ok):
+    return [
+        {"etiqueta": etiqueta, "total": int(t), "porcentaje": round(float(o) / t * 100, 2)}
+        for etiqueta, t, o in zip(etiquetas, total, ok)
+        if t
+    ]
+
+
+def _sumar(acumulado, claves, total, ok):
+    for clave, t, o in zip(claves, total, ok):
+        if t:
+            previo = acumulado.get(clave, (0, 0))
+            acumulado[clave] = (previo[0] + t, previo[1] + o)
+
+
+def desgloses(periodo_id=None, materia_id=None):
+    """
+    Asistencia por docente, turno, día de la semana y carrera.
+    Devuelve {"docentes": [...], "turnos": [...], "dias": [...],
+    "carreras": [...], "ms": duración}. Cada fila: etiqueta, total, porcentaje.
+    """
+    t0 = time.perf_counter()
+    lista = cubos([int(periodo_id)] if periodo_id else None)
+
+    dias_total = np.zeros(7)
+    dias_ok = np.zeros(7)
+    por_materia = {}  # (periodo, materia_id) -> (total, ok)
+
+    for cubo in lista:
+        if not cubo.ids.size:
+            continue
+        ok = np.isin(cubo.estado, _OK)
+        mascara = slice(None)
+        if materia_id:
+            codigo = np.flatnonzero(cubo.materias == int(materia_id))
+            if not codigo.size:
+                continue
+            mascara = cubo.materia == codigo[0]
+        materia, dia, ok = cubo.materia[mascara], cubo.dia[mascara], ok[mascara]
+
+        dias_total += np.bincount(dia, minlength=7)
+        dias_ok += np.bincount(dia, weights=ok, minlength=7)
+
+        m = cubo.materias.size
+        total_m = np.bincount(materia, minlength=m)
+        ok_m = np.bincount(materia, weights=ok, minlength=m)
+        _sumar(por_materia, [(cubo.periodo_id, int(x)) for x in cubo.materias], total_m, ok_m)
+
+    # Proyección a carrera / docente / turno con tablas puente chicas
+    claves = list(por_materia)
+    total_m = np.array([por_materia[k][0] for k in claves], dtype=np.float64)
+    ok_m = np.array([por_materia[k][1] for k in claves], dtype=np.float64)
+    indice = {k: i for i, k in enumerate(claves)}
+
+    carrera_de = dict(Materia._base_manager.filter(id__in={m for _, m in claves})
+                      .values_list("id", "carrera__nombre"))
+    carreras = {}
+    _sumar(carreras, [carrera_de.get(m, "—") for _, m in claves], total_m, ok_m)
+
+    docentes, turnos = {}, {}
+    if claves:
+        puente = (
+            DocenteMateria.objects
+            .filter(periodo_id__in={p for p, _ in claves}, materia_id__in={m for _, m in claves})
+            .values_list("periodo_id", "materia_id", "docente__apellido", "docente__nombre", "turno")
+        )
+        filas = [(indice[(p, m)], f"{ap}, {no}", turno or "Sin turno")
+                 for p, m, ap, no, turno in puente if (p, m) in indice]
+        if filas:
+            pos = np.array([f[0] for f in filas])
+            _sumar(docentes, [f[1] for f in filas], total_m[pos], ok_m[pos])
+            _sumar(turnos, [f[2] for f in filas], total_m[pos], ok_m[pos])
+
+    def ordenar(acumulado, clave=None):
+        items = sorted(acumulado.items(), key=clave or (lambda kv: kv[0]))
+        return _filas_desglose([k for k, _ in items], [v[0] for _, v in items], [v[1] for _, v in items])
+
+    return {
+        # Docentes: los de menor asistencia primero
+        "docentes": ordenar(docentes, clave=lambda kv: (kv[1][1] / kv[1][0], kv[0])),
+        "turnos": ordenar(turnos),
+        "dias": _filas_desglose(DIAS, dias_total, dias_ok),
+        "carreras": ordenar(carreras),
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
@@ -0,0 +1,130 @@
+# asistencias/cache_exportes.py
+"""
+Caché de exportaciones (XLSX/PDF) direccionada por contenido.
+
+El nombre de cada archivo es el hash de la huella de los datos del curso
+(id, cantidad de inscriptos y de registros, último updated_at) más el tipo
+de exportación: si nada cambió, la descarga se sirve directo del disco sin
+reconstruir el libro. Cualquier cambio produce otra clave; los archivos
+viejos salen por LRU (mtime, que se renueva en cada hit) cuando el total
+supera CACHE_EXPORTES_MAX_MB.
+
+Hits y misses se registran como evento "exportacion" (ver registro.py) y
+en el header X-Cache de la respuesta. Si la carpeta no se puede usar (disco
+de sólo lectura, sin permisos) el export se genera igual en memoria, sin
+cachear ("sin_cache"): la descarga no depende del caché.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse
+
+from .estadisticas import huella_cursadas
+from .models import AlumnoMateria
+from .registro import registrar_evento
+
+# Subir si cambia el formato de algún export (invalida todo lo cacheado)
+FORMATO = 1
+
+_contadores = {"hit": 0, "miss": 0, "sin_cache": 0}
+
+
+def _carpeta():
+    carpeta = Path(getattr(settings, "CACHE_EXPORTES_DIR", Path(tempfile.gettempdir()) / "cache_exportes"))
+    carpeta.mkdir(parents=True, exist_ok=True)
+    return carpeta
+
+
+def _max_bytes():
+    return getattr(settings, "CACHE_EXPORTES_MAX_MB", 200) * 1024 * 1024
+
+
+def huella_curso(dm, tipo):
+    """Devuelve (clave, inscriptos) para un DocenteMateria y un tipo de export."""
+    h = huella_cursadas(
+        AlumnoMateria.objects.filter(materia_id=dm.materia_id, periodo_id=dm.periodo_id)
+    )
+    base = "|".join(str(x) for x in (
+        FORMATO, tipo, dm.id, dm.docente_id,
+        h["cursadas"], h["registros"], h["cursadas_max"], h["registros_max"],
+    ))
+    return hashlib.sha256(base.encode()).hexdigest(), h["cursadas"]
+
+
+def _registrar(resultado, dm, tipo):
+    _contadores[resultado] += 1
+    registrar_evento(
+        "exportacion", resultado=resultado, curso=dm.id, tipo=tipo,
+        hits=_contadores["hit"], misses=_contadores["miss"],
+    )
+
+
+def _desalojar(carpeta, conservar):
+    """Borra los archivos menos usados hasta quedar bajo el límite."""
+    archivos = []
+    for ruta in carpeta.iterdir():
+        if ruta.suffix == ".tmp":  # en escritura
+            continue
+        try:
+            st = ruta.stat()
+        except FileNotFoundError:  # otro proceso lo borró
+            continue
+        archivos.append((st.st_mtime, st.st_size, ruta))
+    total = sum(tam for _, tam, _ in archivos)
+    for _, tam, ruta in sorted(archivos):
+        if total <= _max_bytes():
+            break
+        if ruta == conservar:
+            continue
+        ruta.unlink(missing_ok=True)
+        total -= tam
+
+
+def _desde_cache(clave, nombre, generar):
+    """(archivo abierto, "hit" | "miss"); OSError si la carpeta no se puede usar."""
+    carpeta = _carpeta()
+    ruta = carpeta / f"{clave}{Path(nombre).suffix}"
+    try:
+        os.utime(ruta)  # LRU
+        return open(ruta, "rb"), "hit"
+    except FileNotFoundError:
+        pass
+
+    # Escritura atómica: nunca se sirve un archivo a medio generar
+    with tempfile.NamedTemporaryFile(dir=carpeta, suffix=".tmp", delete=False) as tmp:
+        try:
+            generar(tmp)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, ruta)
+    _desalojar(carpeta, conservar=ruta)
+    return open(ruta, "rb"), "miss"
+
+
+def exportar(dm, tipo, nombre, content_type, generar):
+    """
+    Respuesta de descarga para el export `tipo` (p. ej. "reporte_xlsx") del
+    curso `dm`, con el nombre de archivo `nombre`.
+    `generar(destino)` escribe el archivo y sólo se llama en un miss (o sin caché).
+    Devuelve None si el curso no tiene inscriptos.
+    """
+    clave, inscriptos = huella_curso(dm, tipo)
+    if not inscriptos:
+        return None
+
+    try:
+        archivo, resultado = _desde_cache(clave, nombre, generar)
+    except OSError:
+        archivo, resultado = io.BytesIO(), "sin_cache"
+        generar(archivo)
+        archivo.seek(0)
+
+    _registrar(resultado, dm, tipo)
+    response = FileResponse(archivo, as_attachment=True, filename=nombre, content_type=content_type)
+    response["X-Cache"] = resultado.upper().replace("_", "-")
+    return response
@@ -0,0 +1,124 @@
+# asistencias/checkin.py
+"""
+Auto-registro de asistencia por QR.
+
+- Tokens: firmados con HMAC (django.core.signing, SECRET_KEY) y con
+  timestamp; se validan sin tocar la base. El QR del docente se regenera
+  cada CHECKIN_ROTACION segundos y cada token vence a los CHECKIN_TOKEN_TTL.
+- Padrón: {user_id: alumno_materia_id} por curso, cacheado; una inscripción
+  que no está en el padrón cacheado fuerza una única recarga.
+- Escritura: un solo INSERT ... SELECT ... ON CONFLICT DO UPDATE sobre
+  (alumno_materia, fecha), así los reintentos son idempotentes. El SELECT
+  vuelve a comprobar la inscripción: el padrón cacheado puede ser de otra
+  instancia (caché por proceso) y tener una ya borrada. Sólo pisa una clase
+  sin tomar o un Ausente (escaneo tarde); nunca un Justificado ni una
+  Tardanza cargados por el docente.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .models import AlumnoMateria, EstadoAsistencia
+
+SALT = "asistencias.checkin"
+ROSTER_TTL = 300
+
+
+def _ttl():
+    return getattr(settings, "CHECKIN_TOKEN_TTL", 120)
+
+
+def generar_token(dm, fecha=None):
+    fecha = fecha or timezone.localdate()
+    return signing.dumps(
+        {"c": dm.id, "m": dm.materia_id, "p": dm.periodo_id, "f": fecha.isoformat()},
+        salt=SALT,
+        compress=True,
+    )
+
+
+def validar_token(token):
+    """Devuelve el payload o None si la firma es inválida o el token venció."""
+    try:
+        return signing.loads(token, salt=SALT, max_age=_ttl())
+    except signing.BadSignature:  # incluye SignatureExpired
+        return None
+
+
+def _roster_key(materia_id, periodo_id):
+    return f"checkin:roster:{materia_id}:{periodo_id}"
+
+
+def cargar_roster(materia_id, periodo_id):
+    roster = dict(
+        AlumnoMateria.objects
+        .filter(materia_id=materia_id, periodo_id=periodo_id)
+        .values_list("alumno__user_id", "id")
+    )
+    cache.set(_roster_key(materia_id, periodo_id), roster, ROSTER_TTL)
+    return roster
+
+
+def invalidar_roster(materia_id, periodo_id):
+    cache.delete(_roster_key(materia_id, periodo_id))
+
+
+def alumno_materia_de(user_id, materia_id, periodo_id):
+    roster = cache.get(_roster_key(materia_id, periodo_id))
+    if roster is None or user_id not in roster:
+        # Miss o alumno recién inscripto: una sola recarga
+        roster = cargar_roster(materia_id, periodo_id)
+    return roster.get(user_id)
+
+
+# Sólo incrementa la versión si el estado cambia: reescanear no genera conflictos.
+_UPSERT_PRESENTE = """
+    INSERT INTO asistencia (alumno_materia_id, fecha, estado, version, updated_at)
+    SELECT id, %s, %s, 0, %s FROM alumno_materia
+    WHERE id = %s AND materia_id = %s AND periodo_id = %s
+    ON CONFLICT (alumno_materia_id, fecha) DO UPDATE
+    SET estado = excluded.estado, version = asistencia.version + 1,
+        updated_at = excluded.updated_at
+    WHERE asistencia.estado IS NULL OR asistencia.estado = %s
+"""
+
+
+def registrar_presente(alumno_materia_id, fecha, materia_id, periodo_id):
+    """
+    Upsert idempotente en una sola sentencia. Devuelve False si no escribió
+    nada: la inscripción ya no existe o la clase ya tenía otro estado.
+    """
+    # Parámetros ya tipados: en un SELECT PostgreSQL no los infiere de la columna
+    with connection.cursor() as cursor:
+        ahora = connection.ops.adapt_datetimefield_value(timezone.now())
+        cursor.execute(_UPSERT_PRESENTE, [
+            connection.ops.adapt_datefield_value(fecha), EstadoAsistencia.PRESENTE, ahora,
+            alumno_materia_id, materia_id, periodo_id,
+            EstadoAsistencia.AUSENTE,
+        ])
+        return cursor.rowcount > 0
+
+
+def checkin(token, user_id):
+    """
+    Registra al usuario como presente. Devuelve (ok, mensaje).
+    """
+    payload = validar_token(token)
+    if payload is None:
+        return False, "El código QR venció o no es válido. Escaneá el código actual."
+
+    am_id = alumno_materia_de(user_id, payload["m"], payload["p"])
+    if am_id is None:
+        return False, "No figurás inscripto en este curso."
+
+    if not registrar_presente(am_id, date.fromisoformat(payload["f"]), payload["m"], payload["p"]):
+        if not AlumnoMateria.objects.filter(pk=am_id).exists():
+            # Padrón cacheado viejo: la inscripción se borró
+            invalidar_roster(payload["m"], payload["p"])
+            return False, "No figurás inscripto en este curso."
+        return True, "Tu asistencia de hoy ya estaba registrada."
+    return True, "¡Asistencia registrada!"
@@ -0,0 +1,245 @@
+# asistencias/correo.py
+"""
+Outbox de correo.
+
+`CorreoSalienteBackend` es el EMAIL_BACKEND de la app: en lugar de hablar
+con el servidor SMTP dentro del request (hasta EMAIL_TIMEOUT segundos con un
+servidor lento), guarda cada mensaje como una fila de CorreoSaliente. Todo lo
+que use send_mail / EmailMessage (el reset de contraseña incluido) pasa por
+acá sin cambios.
+
+`procesar()` es el worker: toma hasta CORREO_LOTE pendientes, abre UNA
+conexión con el backend real (CORREO_BACKEND_ENVIO: smtp, consola o
+archivo) y los envía reutilizándola. Un mensaje que falla se reintenta con
+backoff exponencial (CORREO_REINTENTO_BASE × 2^intentos, hasta una hora)
+y queda en ERROR después de CORREO_MAX_INTENTOS. Si el servidor corta la
+conexión, se reabre para el siguiente.
+
+Cada mensaje se marca ENVIADO apenas sale: si el proceso muere a mitad de
+lote, como mucho se reenvía el que estaba en vuelo. Al marcarlo se vacían
+cuerpo y html (el de un reset de contraseña lleva el link), y `purgar()`
+borra los ENVIADO y ERROR más viejos que CORREO_RETENCION_DIAS.
+
+Se ejecuta:
+- en un hilo después de encolar (CORREO_EN_HILO), sólo en un servidor que
+  sigue vivo después de responder. En serverless (Vercel) el hilo se
+  congela con la respuesta: ahí va apagado y lo envía el cron.
+- con `manage.py enviar_correos` (cron o --continuo), o desde el cron HTTP
+  de Vercel (views/cron_views.py, vercel.json).
+- los comandos que encolan lo hacen dentro de `sin_hilo()` y después llaman
+  a `procesar_pendientes()`: un daemon thread muere con el proceso.
+
+No se guardan adjuntos: ningún correo de la app los usa.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CorreoSaliente
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = {
+    "smtp": "django.core.mail.backends.smtp.EmailBackend",
+    "consola": "django.core.mail.backends.console.EmailBackend",
+    "archivo": "django.core.mail.backends.filebased.EmailBackend",
+}
+MAX_ESPERA = timedelta(hours=1)
+# Un mensaje ENVIANDO más viejo que esto quedó de un worker que se cortó
+ENVIANDO_VENCIDO = timedelta(minutes=15)
+
+_hilo_lock = threading.Lock()
+_hilo = None
+_sin_hilo = ContextVar("correo_sin_hilo", default=False)
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+# ------------------------------------------------------------
+# Encolado
+# ------------------------------------------------------------
+class CorreoSalienteBackend(BaseEmailBackend):
+    """Backend que encola los mensajes en CorreoSaliente."""
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        ahora = timezone.now()
+        filas = []
+        for m in email_messages:
+            if m.attachments:
+                raise ValueError("El outbox de correo no admite adjuntos.")
+            html = next(
+                (c for c, tipo in getattr(m, "alternatives", []) if tipo == "text/html"), ""
+            )
+            filas.append(CorreoSaliente(
+                remitente=m.from_email or settings.DEFAULT_FROM_EMAIL,
+                para=list(m.to), cc=list(m.cc), bcc=list(m.bcc),
+                asunto=m.subject, cuerpo=m.body, html=html,
+                encabezados={**m.extra_headers, **({"Reply-To": ", ".join(m.reply_to)} if m.reply_to else {})},
+                proximo_intento=ahora,
+            ))
+        CorreoSaliente.objects.bulk_create(filas)
+        if _config("CORREO_EN_HILO", True) and not _sin_hilo.get():
+            transaction.on_commit(procesar_en_hilo)
+        return len(filas)
+
+
+# ------------------------------------------------------------
+# Envío
+# ------------------------------------------------------------
+def _backend_envio():
+    nombre = _config("CORREO_BACKEND_ENVIO", "consola")
+    return BACKENDS.get(nombre, nombre)
+
+
+def _mensaje(correo, conexion):
+    msg = EmailMultiAlternatives(
+        subject=correo.asunto, body=correo.cuerpo, from_email=correo.remitente,
+        to=correo.para, cc=correo.cc, bcc=correo.bcc,
+        headers=correo.encabezados, connection=conexion,
+    )
+    if correo.html:
+        msg.attach_alternative(correo.html, "text/html")
+    return msg
+
+
+def _reclamar(lote):
+    """Marca ENVIANDO hasta `lote` correos listos y los devuelve."""
+    ahora = timezone.now()
+    listos = CorreoSaliente.objects.filter(
+        Q(estado=CorreoSaliente.Estado.PENDIENTE, proximo_intento__lte=ahora)
+        | Q(estado=CorreoSaliente.Estado.ENVIANDO, proximo_intento__lte=ahora - ENVIANDO_VENCIDO)
+    ).order_by("proximo_intento", "id")
+    with transaction.atomic():
+        # skip_locked: varios workers en paralelo no se pisan (en PostgreSQL)
+        ids = list(
+            listos.select_for_update(skip_locked=True).values_list("id", flat=True)[:lote]
+        )
+        CorreoSaliente.objects.filter(id__in=ids).update(
+            estado=CorreoSaliente.Estado.ENVIANDO, proximo_intento=ahora,
+        )
+    return list(CorreoSaliente.objects.filter(id__in=ids).order_by("id"))
+
+
+def _fallo(correo, error):
+    correo.intentos += 1
+    correo.error = str(error)[:2000]
+    if correo.intentos >= _config("CORREO_MAX_INTENTOS", 6):
+        correo.estado = CorreoSaliente.Estado.ERROR
+    else:
+        correo.estado = CorreoSaliente.Estado.PENDIENTE
+        espera = timedelta(seconds=_config("CORREO_REINTENTO_BASE", 60) * 2 ** (correo.intentos - 1))
+        correo.proximo_intento = timezone.now() + min(espera, MAX_ESPERA)
+    correo.save(update_fields=["intentos", "error", "estado", "proximo_intento"])
+
+
+def procesar(lote=None):
+    """Envía un lote de pendientes. Devuelve (enviados, fallidos)."""
+    correos = _reclamar(lote or _config("CORREO_LOTE", 50))
+    if not correos:
+        return 0, 0
+
+    enviados = fallidos = 0
+    conexion = get_connection(_backend_envio(), fail_silently=False)
+    try:
+        conexion.open()
+    except Exception as e:
+        logger.warning("No se pudo abrir la conexión de correo: %s", e)
+        for correo in correos:
+            _fallo(correo, e)
+        return 0, len(correos)
+
+    try:
+        for correo in correos:
+            try:
+                conexion.send_messages([_mensaje(correo, conexion)])
+            except Exception as e:
+                logger.warning("Falló el envío del correo %s: %s", correo.pk, e)
+                _fallo(correo, e)
+                fallidos += 1
+                conexion.close()  # el próximo send_messages reabre la conexión
+            else:
+                # Ya salió: marcarlo ahora, no al final del lote
+                CorreoSaliente.objects.filter(pk=correo.pk).update(
+                    estado=CorreoSaliente.Estado.ENVIADO, enviado=timezone.now(), error="",
+                    cuerpo="", html="",
+                )
+                enviados += 1
+    finally:
+        conexion.close()
+
+    logger.info("correo: %d enviados, %d fallidos", enviados, fallidos)
+    return enviados, fallidos
+
+
+def procesar_pendientes(segundos=None, lote=None):
+    """
+    Procesa lotes hasta que no queden correos listos (o, con `segundos`, hasta
+    que se cumpla ese tiempo entre lotes). Devuelve (enviados, fallidos).
+    """
+    limite = None if segundos is None else time.monotonic() + segundos
+    total = [0, 0]
+    while limite is None or time.monotonic() < limite:
+        enviados, fallidos = procesar(lote)
+        total[0] += enviados
+        total[1] += fallidos
+        if not enviados and not fallidos:
+            break
+    return tuple(total)
+
+
+def purgar(dias=None):
+    """Borra los ENVIADO y ERROR sin movimiento hace más de `dias`. Devuelve cuántos."""
+    dias = _config("CORREO_RETENCION_DIAS", 7) if dias is None else dias
+    # proximo_intento es el último intento: usa idx_correo_pendientes
+    borrados, _ = CorreoSaliente.objects.filter(
+        estado__in=[CorreoSaliente.Estado.ENVIADO, CorreoSaliente.Estado.ERROR],
+        proximo_intento__lt=timezone.now() - timedelta(days=dias),
+    ).delete()
+    return borrados
+
+
+@contextmanager
+def sin_hilo():
+    """Encola sin lanzar el hilo; quien lo usa envía con procesar_pendientes()."""
+    token = _sin_hilo.set(True)
+    try:
+        yield
+    finally:
+        _sin_hilo.reset(token)
+
+
+def _procesar_en_hilo():
+    global _hilo
+    try:
+        procesar_pendientes()
+    except Exception:
+        logger.exception("Falló el worker de correo")
+    finally:
+        close_old_connections()
+        connection.close()
+        with _hilo_lock:
+            _hilo = None
+
+
+def procesar_en_hilo():
+    """Lanza el worker en segundo plano (uno por proceso a la vez)."""
+    global _hilo
+    with _hilo_lock:
+        if _hilo is not None:
+            return
+        _hilo = threading.Thread(target=_procesar_en_hilo, daemon=True, name="correo-saliente")
+        _hilo.start()
@@ -0,0 +1,129 @@
+# asistencias/cronograma.py
+"""
+Fechas de clase a partir del cronograma (HorarioClase + Feriado).
+
+- `fechas_de_clase()` expande los días de la semana de un curso entre dos
+  fechas del periodo, sin los feriados. Varias franjas el mismo día son una
+  sola fecha: la asistencia se toma por día.
+- `cronograma(periodo)` hace lo mismo para todos los cursos del periodo (o
+  los pedidos) con dos consultas: horarios y feriados.
+- `precargar()` crea las filas de Asistencia que faltan para cada fecha de
+  clase ya transcurrida, con un bulk_create por curso, con estado NULL
+  ("sin tomar"): las clases dictadas sin asistencia quedan a la vista en la
+  planilla y en los reportes, sin inventar presentes ni ausentes. Los
+  porcentajes ignoran esas filas hasta que el docente las marca. Lo corre
+  el comando `precargar_asistencias` (una vez por día).
+
+Los cursos sin horario cargado no tienen cronograma: siguen como antes.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AlumnoMateria, Asistencia, DocenteMateria, Feriado, HorarioClase
+
+
+def fechas_de_clase(periodo, dias, feriados=(), desde=None, hasta=None):
+    """
+    Fechas (ordenadas) de los días de la semana `dias` (0 = lunes) entre
+    `desde` y `hasta` inclusive, recortadas al periodo y sin `feriados`.
+    """
+    desde = max(desde or periodo.fecha_inicio, periodo.fecha_inicio)
+    hasta = min(hasta or periodo.fecha_fin, periodo.fecha_fin)
+    feriados = set(feriados)
+    fechas = []
+    for dia in set(dias):
+        fecha = desde + timedelta(days=(dia - desde.weekday()) % 7)
+        while fecha <= hasta:
+            if fecha not in feriados:
+                fechas.append(fecha)
+            fecha += timedelta(days=7)
+    fechas.sort()
+    return fechas
+
+
+def cronograma(periodo, cursos=None, desde=None, hasta=None):
+    """
+    {docente_materia_id: [fechas]} de los cursos del periodo con horario
+    (o sólo de `cursos`, ids), en dos consultas.
+    """
+    horarios = HorarioClase.objects.filter(curso__periodo=periodo)
+    if cursos is not None:
+        horarios = horarios.filter(curso_id__in=cursos)
+    dias = defaultdict(set)
+    for curso_id, dia in horarios.values_list("curso_id", "dia_semana"):
+        dias[curso_id].add(dia)
+    if not dias:
+        return {}
+
+    feriados = set(Feriado.objects.filter(periodo=periodo).values_list("fecha", flat=True))
+    return {
+        curso_id: fechas_de_clase(periodo, d, feriados, desde, hasta)
+        for curso_id, d in dias.items()
+    }
+
+
+def fechas_por_materia(periodo, desde=None, hasta=None):
+    """
+    {materia_id: [fechas]} del periodo: unión de los cronogramas de los
+    cursos de cada materia (las inscripciones son por materia + periodo).
+    """
+    materia_de = dict(
+        DocenteMateria.objects.filter(periodo=periodo).values_list("id", "materia_id")
+    )
+    por_materia = defaultdict(set)
+    for curso_id, fechas in cronograma(periodo, desde=desde, hasta=hasta).items():
+        por_materia[materia_de[curso_id]].update(fechas)
+    return {m: sorted(f) for m, f in por_materia.items()}
+
+
+# ------------------------------------------------------------
+# Precarga de asistencias
+# ------------------------------------------------------------
+def precargar(periodo, hasta=None, desde=None, cursos=None, dry_run=False, informar=None):
+    """
+    Crea la Asistencia "sin tomar" (estado NULL) de cada inscripto para cada
+    fecha de clase entre `desde` y `hasta` (default: hoy) que todavía no la
+    tenga. Un bulk_create por curso; nunca pisa lo que ya cargó un docente. Devuelve la cantidad de filas
+    creadas (o a crear, con dry_run). `informar(curso, fechas, filas)` se
+    llama por curso.
+    """
+    hasta = hasta or timezone.localdate()
+    fechas_curso = cronograma(periodo, cursos=cursos, desde=desde, hasta=hasta)
+    if not fechas_curso:
+        return 0
+
+    total = 0
+    for dm in DocenteMateria.objects.filter(id__in=fechas_curso).select_related("materia").order_by("id"):
+        fechas = fechas_curso[dm.id]
+        inscriptos = list(
+            AlumnoMateria.objects
+            .filter(materia_id=dm.materia_id, periodo=periodo)
+            .values_list("id", flat=True)
+        )
+        if not fechas or not inscriptos:
+            if informar:
+                informar(dm, fechas, 0)
+            continue
+
+        existentes = set(
+            Asistencia.objects
+            .filter(alumno_materia_id__in=inscriptos, fecha__range=(fechas[0], fechas[-1]))
+            .values_list("alumno_materia_id", "fecha")
+        )
+        nuevas = [
+            Asistencia(alumno_materia_id=am_id, fecha=fecha, estado=None)
+            for fecha in fechas
+            for am_id in inscriptos
+            if (am_id, fecha) not in existentes
+        ]
+        if nuevas and not dry_run:
+            with transaction.atomic():
+                # ignore_conflicts: un docente pudo marcar entre la lectura y el insert
+                Asistencia.objects.bulk_create(nuevas, batch_size=1000, ignore_conflicts=True)
+        total += len(nuevas)
+        if informar:
+            informar(dm, fechas, len(nuevas))
+    return total
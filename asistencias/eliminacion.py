@@ -0,0 +1,221 @@
+# asistencias/eliminacion.py
+"""
+Borrado en cascada por lotes para Carrera, Materia y User.
+
+`.delete()` de Django junta en memoria todas las filas dependientes antes de
+borrar (Carrera → Materia → AlumnoMateria → Asistencia ...). Acá, en cambio:
+
+1. `plan(obj)` recorre las relaciones inversas del modelo (CASCADE y
+   SET_NULL, incluidas las tablas intermedias de M2M) y arma los pasos de
+   abajo hacia arriba, cada uno como un queryset sin materializar.
+2. `estimar(obj)` cuenta las filas de cada paso.
+3. `solicitar(obj, usuario)` marca el objeto `eliminado=True` (queda oculto
+   por su manager) y registra una Eliminacion. Si es chica se ejecuta en el
+   request; si no, queda para un hilo en segundo plano, para
+   `manage.py procesar_eliminaciones` o, sin hilos (Vercel), para el cron
+   /app/cron/eliminaciones/ (`procesar_pendientes`).
+4. `ejecutar(eliminacion)` borra cada paso en lotes de ELIMINACION_LOTE ids
+   con `DELETE ... WHERE id IN (...)` (una transacción corta por lote) y va
+   guardando el progreso. Es reanudable: si se corta (o se le acaba el
+   tiempo dado), volver a ejecutarla continúa donde quedó.
+
+No se disparan señales pre/post_delete (la app no usa ninguna).
+"""
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, connection, models, transaction
+from django.utils import timezone
+
+from .models import Carrera, Eliminacion, Materia, User
+
+logger = logging.getLogger(__name__)
+
+
+class EliminacionProtegida(Exception):
+    pass
+
+
+class _TiempoAgotado(Exception):
+    pass
+
+
+def _lote():
+    return getattr(settings, "ELIMINACION_LOTE", 1000)
+
+
+def _umbral():
+    return getattr(settings, "ELIMINACION_UMBRAL", 2000)
+
+
+# ------------------------------------------------------------
+# Plan
+# ------------------------------------------------------------
+def _pasos(model, qs):
+    """Pasos (accion, model, campo, queryset) para borrar `qs`, hijos primero."""
+    pasos = []
+    for rel in model._meta.get_fields(include_hidden=True):
+        if not (rel.auto_created and not rel.concrete and (rel.one_to_many or rel.one_to_one)):
+            continue
+        hijo = rel.related_model
+        campo = rel.field
+        dependientes = hijo._base_manager.filter(**{f"{campo.name}__in": qs.values("pk")})
+        if rel.on_delete is models.CASCADE:
+            pasos += _pasos(hijo, dependientes)
+        elif rel.on_delete is models.SET_NULL:
+            pasos.append(("null", hijo, campo, dependientes))
+        elif rel.on_delete is models.DO_NOTHING:
+            continue
+        else:  # PROTECT, RESTRICT, SET_DEFAULT, SET(...)
+            if dependientes.exists():
+                raise EliminacionProtegida(
+                    f"{hijo._meta.verbose_name_plural} impide borrar {model._meta.verbose_name}."
+                )
+    pasos.append(("borrar", model, None, qs))
+    return pasos
+
+
+def plan(obj):
+    model = type(obj)
+    return _pasos(model, model._base_manager.filter(pk=obj.pk))
+
+
+def estimar(obj):
+    """Cantidad total de filas que se borrarán o actualizarán."""
+    return sum(qs.count() for _, _, _, qs in plan(obj))
+
+
+# ------------------------------------------------------------
+# Ejecución
+# ------------------------------------------------------------
+def _ejecutar_paso(accion, model, campo, qs, al_avanzar):
+    tabla = connection.ops.quote_name(model._meta.db_table)
+    pk = connection.ops.quote_name(model._meta.pk.column)
+    while True:
+        ids = list(qs.values_list("pk", flat=True)[:_lote()])
+        if not ids:
+            return
+        marcadores = ", ".join(["%s"] * len(ids))
+        if accion == "borrar":
+            sql = f"DELETE FROM {tabla} WHERE {pk} IN ({marcadores})"
+        else:
+            col = connection.ops.quote_name(campo.column)
+            sql = f"UPDATE {tabla} SET {col} = NULL WHERE {pk} IN ({marcadores})"
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, ids)
+        al_avanzar(len(ids))
+
+
+def _objeto(eliminacion):
+    model = apps.get_model(eliminacion.modelo)
+    return model._base_manager.filter(pk=eliminacion.objeto_id).first()
+
+
+def ejecutar(eliminacion, informar=None, limite=None):
+    """
+    Ejecuta (o reanuda) una Eliminacion y la devuelve actualizada.
+    `informar(eliminacion)` se llama después de cada lote. Con `limite`
+    (time.monotonic()) corta entre lotes al pasarlo y la deja EN_CURSO.
+    """
+    eliminacion.estado = Eliminacion.Estado.EN_CURSO
+    eliminacion.save(update_fields=["estado"])
+
+    def al_avanzar(n):
+        eliminacion.borrados += n
+        eliminacion.save(update_fields=["borrados"])
+        if informar:
+            informar(eliminacion)
+        if limite is not None and time.monotonic() >= limite:
+            raise _TiempoAgotado
+
+    try:
+        obj = _objeto(eliminacion)
+        if obj is not None:
+            for accion, model, campo, qs in plan(obj):
+                _ejecutar_paso(accion, model, campo, qs, al_avanzar)
+    except _TiempoAgotado:
+        return eliminacion
+    except Exception as e:
+        logger.exception("Falló la eliminación %s", eliminacion.pk)
+        eliminacion.estado = Eliminacion.Estado.ERROR
+        eliminacion.error = str(e)
+        eliminacion.save(update_fields=["estado", "error"])
+        return eliminacion
+
+    eliminacion.estado = Eliminacion.Estado.TERMINADA
+    eliminacion.terminada = timezone.now()
+    eliminacion.save(update_fields=["estado", "terminada"])
+    return eliminacion
+
+
+def procesar_pendientes(segundos=None):
+    """
+    Ejecuta las eliminaciones PENDIENTE y reanuda las EN_CURSO (cortadas por
+    tiempo en una pasada anterior), las más viejas primero, hasta terminarlas
+    o cumplir `segundos`. Para cuando no hay hilos: con ELIMINACION_EN_HILO
+    una EN_CURSO puede estar corriendo en otro proceso. Devuelve
+    (terminadas, con_error).
+    """
+    limite = None if segundos is None else time.monotonic() + segundos
+    estados = [Eliminacion.Estado.PENDIENTE, Eliminacion.Estado.EN_CURSO]
+    total = [0, 0]
+    for pk in Eliminacion.objects.filter(estado__in=estados).order_by("creada").values_list("pk", flat=True):
+        if limite is not None and time.monotonic() >= limite:
+            break
+        eliminacion = ejecutar(Eliminacion.objects.get(pk=pk), limite=limite)
+        if eliminacion.estado == Eliminacion.Estado.TERMINADA:
+            total[0] += 1
+        elif eliminacion.estado == Eliminacion.Estado.ERROR:
+            total[1] += 1
+    return tuple(total)
+
+
+def _ejecutar_en_hilo(eliminacion_id):
+    try:
+        ejecutar(Eliminacion.objects.get(pk=eliminacion_id))
+    finally:
+        close_old_connections()
+        connection.close()
+
+
+# ------------------------------------------------------------
+# Solicitud (desde las vistas)
+# ------------------------------------------------------------
+def _marcar(obj):
+    """Oculta el objeto (y las materias de una carrera) con un UPDATE."""
+    campos = {"eliminado": True}
+    if isinstance(obj, User):
+        campos["is_active"] = False  # sin login mientras se borra
+    type(obj)._base_manager.filter(pk=obj.pk).update(**campos)
+    if isinstance(obj, Carrera):
+        Materia._base_manager.filter(carrera=obj).update(eliminado=True)
+
+
+def solicitar(obj, usuario=None):
+    """
+    Estima la cascada, oculta el objeto y lo borra: en el request si son
+    pocas filas, en segundo plano si no. Devuelve la Eliminacion.
+    """
+    estimado = estimar(obj)
+    with transaction.atomic():
+        _marcar(obj)
+        eliminacion = Eliminacion.objects.create(
+            modelo=obj._meta.label_lower,
+            objeto_id=obj.pk,
+            descripcion=f"{obj._meta.verbose_name.capitalize()}: {obj}",
+            solicitada_por=usuario,
+            estimado=estimado,
+        )
+
+    if estimado <= _umbral():
+        return ejecutar(eliminacion)
+
+    if getattr(settings, "ELIMINACION_EN_HILO", True):
+        threading.Thread(
+            target=_ejecutar_en_hilo, args=(eliminacion.pk,), daemon=True,
+            name=f"eliminacion-{eliminacion.pk}",
+        ).start()
+    return eliminacion
@@ -0,0 +1,159 @@
+# asistencias/estadisticas.py
+"""
+Agregados de asistencia calculados en la base (una consulta por listado),
+para reportes y procesos batch que no pueden permitirse N+1 consultas.
+
+Las filas precargadas sin tomar (estado NULL, ver cronograma.precargar) no
+cuentan como registros: se informan aparte como `sin_tomar`.
+"""
+from django.db.models import Count, Exists, FloatField, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from .models import AlumnoMateria, Asistencia, DocenteMateria
+
+
+def porcentaje(ok, total):
+    return round((ok / total * 100), 2) if total else 0
+
+
+_TOMADA = Q(asistencia__estado__isnull=False)
+
+
+def con_resumen(qs):
+    """Anota total/presentes/justificados/ausentes/sin_tomar sobre un queryset de AlumnoMateria."""
+    return qs.annotate(
+        total=Count("asistencia", filter=_TOMADA),
+        sin_tomar=Count("asistencia", filter=Q(asistencia__estado__isnull=True)),
+        presentes=Count("asistencia", filter=Q(asistencia__estado="Presente")),
+        justificados=Count("asistencia", filter=Q(asistencia__estado="Justificado")),
+        ausentes=Count("asistencia", filter=Q(asistencia__estado__in=["Ausente", "Tardanza"])),
+    )
+
+
+def fila_resumen(am):
+    """Dict con el mismo formato que usan reportes_curso / cursada_detalle."""
+    return {
+        "alumno": am.alumno,
+        "dni": getattr(am.alumno, "dni", ""),
+        "materia": am.materia,
+        "total": am.total,
+        "presentes": am.presentes,
+        "justificados": am.justificados,
+        "ausentes": am.ausentes,
+        "porcentaje": porcentaje(am.presentes + am.justificados, am.total),
+    }
+
+
+def resumen_curso(dm):
+    """Filas por alumno inscripto en la materia/periodo de un DocenteMateria."""
+    inscriptos = con_resumen(
+        AlumnoMateria.objects
+        .filter(materia_id=dm.materia_id, periodo_id=dm.periodo_id)
+        .select_related("alumno", "materia")
+        .order_by("alumno__apellido", "alumno__nombre")
+    )
+    return [fila_resumen(am) for am in inscriptos]
+
+
+def resumen_alumno(alumno, periodo_id):
+    """Filas por materia cursada por un alumno en un periodo."""
+    cursadas = con_resumen(
+        AlumnoMateria.objects
+        .filter(alumno=alumno, periodo_id=periodo_id)
+        .select_related("alumno", "materia")
+        .order_by("materia__nombre")
+    )
+    return [fila_resumen(am) for am in cursadas]
+
+
+def roster_docente(docente=None, user=None):
+    """
+    AlumnoMateria de los cursos del docente (o del docente de `user`): las
+    inscripciones cuyo par exacto (materia, periodo) es el de alguno de sus
+    DocenteMateria, con EXISTS. No usar materia__in / periodo__in por
+    separado: cruza cada materia con cada periodo del docente.
+    """
+    cursos = DocenteMateria.objects.filter(materia=OuterRef("materia"), periodo=OuterRef("periodo"))
+    cursos = cursos.filter(docente=docente) if docente is not None else cursos.filter(docente__user=user)
+    return AlumnoMateria.objects.filter(Exists(cursos))
+
+
+def totales_docente(docente):
+    """{"alumnos", "asistencias"} de los cursos del docente, en una consulta."""
+    return roster_docente(docente).aggregate(
+        alumnos=Count("alumno", distinct=True),
+        asistencias=Count("asistencia", filter=_TOMADA),
+    )
+
+
+def huella_cursadas(qs):
+    """
+    Versión de los datos de un conjunto de AlumnoMateria en una sola consulta:
+    conteos (detectan borrados) y último updated_at de cursadas y asistencias.
+    """
+    return qs.aggregate(
+        cursadas=Count("id", distinct=True),
+        registros=Count("asistencia"),
+        cursadas_max=Max("updated_at"),
+        registros_max=Max("asistencia__updated_at"),
+    )
+
+
+# ------------------------------------------------------------
+# Listados del catálogo: agregados por (materia, periodo) como subconsultas
+# ------------------------------------------------------------
+_ASISTIDO = Q(estado__in=["Presente", "Justificado"])
+
+
+def _escalar(qs, agregado, output_field):
+    """Subquery de una fila con `agregado` sobre `qs` (ya correlacionado con OuterRef)."""
+    return Subquery(
+        qs.order_by().annotate(_g=Value(1)).values("_g").annotate(v=agregado).values("v"),
+        output_field=output_field,
+    )
+
+
+def _contar(qs, campo="pk", distinct=False):
+    return Coalesce(_escalar(qs, Count(campo, distinct=distinct), IntegerField()), 0)
+
+
+def _porcentaje(asistencias):
+    """% de asistidos (presente + justificado) de `asistencias`; NULL si no hay registros."""
+    return _escalar(
+        asistencias,
+        Round(Cast(Count("pk", filter=_ASISTIDO), FloatField()) * 100 / NullIf(Count("pk"), 0), 2),
+        FloatField(),
+    )
+
+
+def con_totales_cursada(qs):
+    """
+    Anota inscriptos, registros y porcentaje (None sin registros) sobre un
+    queryset de DocenteMateria, con subconsultas correlacionadas por
+    (materia, periodo): el listado sigue siendo una sola consulta y se puede
+    ordenar por cualquiera de ellos.
+    """
+    asistencias = Asistencia.objects.filter(
+        alumno_materia__materia_id=OuterRef("materia_id"),
+        alumno_materia__periodo_id=OuterRef("periodo_id"),
+        estado__isnull=False,
+    )
+    return qs.annotate(
+        inscriptos=_contar(AlumnoMateria.objects.filter(
+            materia_id=OuterRef("materia_id"), periodo_id=OuterRef("periodo_id")
+        )),
+        registros=_contar(asistencias),
+        porcentaje=_porcentaje(asistencias),
+    )
+
+
+def con_totales_materia(qs):
+    """Como con_totales_cursada, para un queryset de Materia (todos los periodos)."""
+    asistencias = Asistencia.objects.filter(alumno_materia__materia_id=OuterRef("pk"), estado__isnull=False)
+    return qs.annotate(
+        total_alumnos=_contar(
+            AlumnoMateria.objects.filter(materia_id=OuterRef("pk")), campo="alumno_id", distinct=True
+        ),
+        registros=_contar(asistencias),
+        porcentaje=_porcentaje(asistencias),
+    )
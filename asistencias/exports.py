@@ -0,0 +1,173 @@
+# asistencias/exports.py
+"""
+Generación de planillas XLSX para reportes.
+
+Este módulo importa openpyxl a nivel de módulo, por eso las vistas lo
+importan sólo dentro de la rama de exportación: así la dependencia no se
+carga en el arranque en frío de la función serverless.
+"""
+from pathlib import Path
+
+import openpyxl
+from openpyxl.drawing.image import Image as XLImage
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+def _borde(color):
+    return Border(
+        left=Side(style="thin", color=color),
+        right=Side(style="thin", color=color),
+        top=Side(style="thin", color=color),
+        bottom=Side(style="thin", color=color),
+    )
+
+
+def _encabezados(ws, headers, header_row):
+    for col, h in enumerate(headers, start=1):
+        c = ws.cell(row=header_row, column=col, value=h)
+        c.font = Font(bold=True, color="FFFFFF")
+        c.fill = PatternFill("solid", fgColor="111827")  # gris oscuro
+        c.alignment = Alignment(horizontal="center", vertical="center")
+        c.border = _borde("CCCCCC")
+
+
+def _autoajustar(ws, desde_fila, hasta_fila, columnas, col_porcentaje):
+    """Autoajuste de ancho de columnas (en base al contenido)."""
+    for col in range(1, columnas + 1):
+        col_letter = get_column_letter(col)
+        max_len = 0
+        for r in range(desde_fila, hasta_fila):
+            val = ws.cell(row=r, column=col).value
+            if col == col_porcentaje and isinstance(val, (int, float)):
+                val_str = f"{val:.2%}"
+            else:
+                val_str = str(val) if val is not None else ""
+            max_len = max(max_len, len(val_str))
+        ws.column_dimensions[col_letter].width = min(max(12, max_len + 2), 45)
+
+
+def xlsx_reporte_curso(curso, datos, destino):
+    """
+    Planilla con formato institucional para `reportes_curso`.
+    `destino` es cualquier objeto tipo archivo (HttpResponse, BytesIO, archivo en disco).
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Reporte"
+
+    logo_path = BASE_DIR / "static" / "img" / "logo.png"
+    start_row = 1
+    if logo_path.exists():
+        try:
+            img = XLImage(str(logo_path))
+            img.height = 60  # ajuste visual
+            img.width = 60
+            ws.add_image(img, "A1")
+            start_row = 5  # dejamos espacio para el logo
+        except Exception:
+            start_row = 3
+
+    # --- Título institucional ---
+    titulo = (
+        f"Reporte de Asistencia — {curso.materia.nombre} / "
+        f"{curso.periodo.nombre} — Docente: {curso.docente}"
+    )
+    ws.merge_cells(start_row=start_row, start_column=1, end_row=start_row, end_column=6)
+    cell_title = ws.cell(row=start_row, column=1, value=titulo)
+    cell_title.font = Font(bold=True, size=14)
+    cell_title.alignment = Alignment(horizontal="center")
+    start_row += 2  # salteamos una fila
+
+    # --- Encabezados
+    header_row = start_row
+    _encabezados(ws, ["Alumno", "Total", "Presentes", "Justificados", "Ausentes", "% Asistencia"], header_row)
+
+    # --- Datos
+    data_row_start = header_row + 1
+    row = data_row_start
+    for d in datos:
+        ws.cell(row=row, column=1, value=str(d["alumno"]))
+        ws.cell(row=row, column=2, value=d["total"])
+        ws.cell(row=row, column=3, value=d["presentes"])
+        ws.cell(row=row, column=4, value=d["justificados"])
+        ws.cell(row=row, column=5, value=d["ausentes"])
+        # porcentaje numérico (0..1) con formato 0.00%
+        pcell = ws.cell(row=row, column=6, value=(d["porcentaje"] / 100.0))
+        pcell.number_format = "0.00%"
+        for col in range(1, 7):
+            ws.cell(row=row, column=col).border = _borde("EEEEEE")
+        row += 1
+
+    _autoajustar(ws, header_row, row, columnas=6, col_porcentaje=6)
+
+    # --- Alineaciones
+    for r in ws.iter_rows(min_row=data_row_start, min_col=2, max_col=6, max_row=row - 1):
+        for c in r:
+            c.alignment = Alignment(horizontal="center")
+
+    # --- Congelar encabezado
+    ws.freeze_panes = ws.cell(row=data_row_start, column=1)
+
+    # --- Resumen al final
+    summary_row = row + 1
+    ws.cell(row=summary_row, column=1, value="Total alumnos:")
+    ws.cell(row=summary_row, column=2, value=len(datos))
+    ws.cell(row=summary_row, column=1).font = Font(bold=True)
+
+    wb.save(destino)
+
+
+def xlsx_cursada(dm, datos, total_alumnos, porcentaje_global, destino):
+    """Planilla de asistencia de una cursada (`cursada_detalle`)."""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Asistencia cursada"
+
+    # Título
+    titulo = (
+        f"Asistencia — {dm.materia.nombre} / {dm.periodo.nombre} "
+        f"(Docente: {dm.docente})"
+    )
+    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
+    cell_title = ws.cell(row=1, column=1, value=titulo)
+    cell_title.font = Font(bold=True, size=14)
+    cell_title.alignment = Alignment(horizontal="center")
+
+    # Encabezados
+    header_row = 3
+    _encabezados(
+        ws,
+        ["Alumno", "DNI", "Total", "Presentes", "Justificados", "Ausentes", "% Asistencia"],
+        header_row,
+    )
+
+    # Datos
+    row = header_row + 1
+    for d in datos:
+        ws.cell(row=row, column=1, value=str(d["alumno"]))
+        ws.cell(row=row, column=2, value=d["dni"])
+        ws.cell(row=row, column=3, value=d["total"])
+        ws.cell(row=row, column=4, value=d["presentes"])
+        ws.cell(row=row, column=5, value=d["justificados"])
+        ws.cell(row=row, column=6, value=d["ausentes"])
+        pcell = ws.cell(row=row, column=7, value=(d["porcentaje"] / 100.0))
+        pcell.number_format = "0.00%"
+        for col in range(1, 8):
+            ws.cell(row=row, column=col).border = _borde("EEEEEE")
+        row += 1
+
+    _autoajustar(ws, 1, row, columnas=7, col_porcentaje=7)
+
+    # Resumen al final
+    summary_row = row + 1
+    ws.cell(row=summary_row, column=1, value="Total alumnos:")
+    ws.cell(row=summary_row, column=2, value=total_alumnos)
+    ws.cell(row=summary_row + 1, column=1, value="% asistencia global:")
+    ws.cell(row=summary_row + 1, column=2, value=(porcentaje_global / 100.0)).number_format = "0.00%"
+
+    wb.save(destino)
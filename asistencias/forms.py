@@ -4,8 +4,22 @@ from django.contrib.auth.password_validation import validate_password
 
 from .models import (
     User, Alumno, Docente, Carrera, Materia, Periodo,
-    DocenteMateria, AlumnoMateria
+    DocenteMateria, AlumnoMateria, HorarioClase, Feriado
 )
+from .widgets import AutocompletarSelect, AutocompletarSelectMultiple
+
+
+def _ya_existe(model, instance, mensaje, **filtros):
+    """
+    `mensaje` si otra fila de `model` cumple `filtros`; None si no.
+    Usa _base_manager: las filas que se están borrando en segundo plano (ver
+    eliminacion.py) no aparecen en `objects` pero siguen en la tabla, y el
+    INSERT fallaría con IntegrityError en lugar de un error de formulario.
+    """
+    otro = model._base_manager.filter(**filtros).exclude(pk=instance.pk).only("pk", "eliminado").first()
+    if otro is None:
+        return None
+    return f"{mensaje} Se está eliminando: esperá a que termine." if otro.eliminado else mensaje
 
 # ========================
 # Usuarios
@@ -38,10 +52,16 @@ class CustomUserCreationForm(forms.ModelForm):
             "is_staff": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
 
+    def clean_username(self):
+        username = self.cleaned_data.get("username")
+        if error := _ya_existe(User, self.instance, "Ya existe un usuario con ese nombre.", username=username):
+            raise ValidationError(error)
+        return username
+
     def clean_email(self):
         email = (self.cleaned_data.get("email") or "").strip().lower()
-        if User.objects.filter(email__iexact=email).exists():
-            raise ValidationError("Ya existe un usuario con ese correo.")
+        if error := _ya_existe(User, self.instance, "Ya existe un usuario con ese correo.", email__iexact=email):
+            raise ValidationError(error)
         return email
 
     def clean_password1(self):
@@ -98,10 +118,16 @@ class CustomUserEditForm(forms.ModelForm):
             "is_superuser": forms.CheckboxInput(attrs={"class": "form-check-input"}),
         }
 
+    def clean_username(self):
+        username = self.cleaned_data.get("username")
+        if error := _ya_existe(User, self.instance, "Ya existe un usuario con ese nombre.", username=username):
+            raise ValidationError(error)
+        return username
+
     def clean_email(self):
         email = (self.cleaned_data.get("email") or "").strip().lower()
-        if User.objects.filter(email__iexact=email).exclude(pk=self.instance.pk).exists():
-            raise ValidationError("Ya existe un usuario con ese correo.")
+        if error := _ya_existe(User, self.instance, "Ya existe un usuario con ese correo.", email__iexact=email):
+            raise ValidationError(error)
         return email
 
     def clean_new_password1(self):
@@ -156,14 +182,14 @@ class CarreraForm(forms.ModelForm):
 
     def clean_codigo(self):
         codigo = (self.cleaned_data["codigo"] or "").strip()
-        if Carrera.objects.filter(codigo__iexact=codigo).exclude(pk=self.instance.pk).exists():
-            raise forms.ValidationError("Ya existe una carrera con ese código.")
+        if error := _ya_existe(Carrera, self.instance, "Ya existe una carrera con ese código.", codigo__iexact=codigo):
+            raise forms.ValidationError(error)
         return codigo
 
     def clean_nombre(self):
         nombre = (self.cleaned_data["nombre"] or "").strip()
-        if Carrera.objects.filter(nombre__iexact=nombre).exclude(pk=self.instance.pk).exists():
-            raise forms.ValidationError("Ya existe una carrera con ese nombre.")
+        if error := _ya_existe(Carrera, self.instance, "Ya existe una carrera con ese nombre.", nombre__iexact=nombre):
+            raise forms.ValidationError(error)
         return nombre
 
 
@@ -191,11 +217,13 @@ class MateriaForm(forms.ModelForm):
 
         # Unicidad por (carrera, código) y (carrera, nombre) para evitar duplicados
         if carrera and codigo:
-            if Materia.objects.filter(carrera=carrera, codigo__iexact=codigo).exclude(pk=self.instance.pk).exists():
-                self.add_error("codigo", "Ya existe una materia en esta carrera con ese código.")
+            if error := _ya_existe(Materia, self.instance, "Ya existe una materia en esta carrera con ese código.",
+                                   carrera=carrera, codigo__iexact=codigo):
+                self.add_error("codigo", error)
         if carrera and nombre:
-            if Materia.objects.filter(carrera=carrera, nombre__iexact=nombre).exclude(pk=self.instance.pk).exists():
-                self.add_error("nombre", "Ya existe una materia en esta carrera con ese nombre.")
+            if error := _ya_existe(Materia, self.instance, "Ya existe una materia en esta carrera con ese nombre.",
+                                   carrera=carrera, nombre__iexact=nombre):
+                self.add_error("nombre", error)
         return cleaned
 
 
@@ -208,15 +236,21 @@ class DocenteMateriaForm(forms.ModelForm):
         fields = ("docente", "materia", "periodo")
         labels = {"docente": "Docente", "materia": "Materia", "periodo": "Periodo"}
         widgets = {
-            "docente": forms.Select(attrs={"class": "form-select"}),
-            "materia": forms.Select(attrs={"class": "form-select"}),
+            # Docentes y materias se buscan por JSON: sólo se renderiza lo elegido
+            "docente": AutocompletarSelect(
+                "asistencias:autocompletar_docentes", attrs={"class": "form-select"},
+                placeholder="Apellido o legajo…",
+            ),
+            "materia": AutocompletarSelect(
+                "asistencias:autocompletar_materias", attrs={"class": "form-select"},
+                placeholder="Nombre o código…",
+            ),
             "periodo": forms.Select(attrs={"class": "form-select"}),
         }
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields["docente"].queryset = Docente.objects.select_related("user").order_by("apellido", "nombre")
-        self.fields["materia"].queryset = Materia.objects.order_by("nombre")
+        self.fields["materia"].queryset = Materia.objects.select_related("carrera")
         self.fields["periodo"].queryset = Periodo.objects.order_by("id")
 
     def clean(self):
@@ -233,7 +267,10 @@ class DocenteMateriaForm(forms.ModelForm):
 class AlumnoMateriaForm(forms.Form):
     materia = forms.ModelChoiceField(
         queryset=Materia.objects.none(),
-        widget=forms.Select(attrs={"class": "form-select"}),
+        widget=AutocompletarSelect(
+            "asistencias:autocompletar_materias", attrs={"class": "form-select"},
+            placeholder="Nombre o código…",
+        ),
         label="Materia"
     )
     periodo = forms.ModelChoiceField(
@@ -243,17 +280,73 @@ class AlumnoMateriaForm(forms.Form):
     )
     alumnos = forms.ModelMultipleChoiceField(
         queryset=Alumno.objects.none(),
-        widget=forms.SelectMultiple(attrs={"class": "form-select", "size": 12}),
+        widget=AutocompletarSelectMultiple(
+            "asistencias:autocompletar_alumnos", attrs={"class": "form-select", "size": 12},
+            placeholder="Apellido, nombre o DNI…",
+        ),
         label="Alumnos"
     )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields["materia"].queryset = Materia.objects.order_by("nombre")
+        # Los campos validan sólo los ids enviados (filter(pk__in=...))
+        self.fields["materia"].queryset = Materia.objects.select_related("carrera")
         self.fields["periodo"].queryset = Periodo.objects.order_by("id")
         self.fields["alumnos"].queryset = Alumno.objects.order_by("apellido", "nombre")
 
 
+# ================================
+# Admin: Cronograma de clases (horarios del curso y feriados del periodo)
+# ================================
+class HorarioClaseForm(forms.ModelForm):
+    class Meta:
+        model = HorarioClase
+        fields = ("dia_semana", "hora_inicio", "hora_fin")
+        labels = {"dia_semana": "Día", "hora_inicio": "Desde", "hora_fin": "Hasta"}
+        widgets = {
+            "dia_semana": forms.Select(attrs={"class": "form-select form-select-sm"}),
+            "hora_inicio": forms.TimeInput(attrs={"class": "form-control form-control-sm", "type": "time"}),
+            "hora_fin": forms.TimeInput(attrs={"class": "form-control form-control-sm", "type": "time"}),
+        }
+
+    def __init__(self, *args, curso=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.curso = curso
+
+    def clean(self):
+        cleaned = super().clean()
+        inicio = cleaned.get("hora_inicio")
+        if inicio and self.curso and HorarioClase.objects.filter(
+            curso=self.curso, dia_semana=cleaned.get("dia_semana"), hora_inicio=inicio
+        ).exists():
+            raise forms.ValidationError("El curso ya tiene una clase ese día a esa hora.")
+        return cleaned
+
+
+class FeriadoForm(forms.ModelForm):
+    class Meta:
+        model = Feriado
+        fields = ("fecha", "descripcion")
+        labels = {"fecha": "Fecha", "descripcion": "Descripción"}
+        widgets = {
+            "fecha": forms.DateInput(attrs={"class": "form-control form-control-sm", "type": "date"}),
+            "descripcion": forms.TextInput(attrs={"class": "form-control form-control-sm", "placeholder": "Ej.: Día del trabajador"}),
+        }
+
+    def __init__(self, *args, periodo=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.periodo = periodo
+
+    def clean_fecha(self):
+        fecha = self.cleaned_data["fecha"]
+        if self.periodo:
+            if not self.periodo.fecha_inicio <= fecha <= self.periodo.fecha_fin:
+                raise forms.ValidationError("La fecha está fuera del periodo.")
+            if Feriado.objects.filter(periodo=self.periodo, fecha=fecha).exists():
+                raise forms.ValidationError("Esa fecha ya está cargada como feriado.")
+        return fecha
+
+
 # ================================
 # Formularios de PERFIL (User / Docente / Alumno)
 # ================================
@@ -271,6 +364,12 @@ class PerfilUserForm(forms.ModelForm):
             "avatar": forms.ClearableFileInput(attrs={"class": "form-control"}),
         }
 
+    def clean_email(self):
+        email = (self.cleaned_data.get("email") or "").strip().lower()
+        if error := _ya_existe(User, self.instance, "Ya existe un usuario con ese correo.", email__iexact=email):
+            raise ValidationError(error)
+        return email
+
 
 class PerfilDocenteForm(forms.ModelForm):
     """Formulario para que el DOCENTE actualice sus datos personales."""
@@ -0,0 +1,77 @@
+# asistencias/management/commands/bench_arranque.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Script que corre en un intérprete limpio: importa la app WSGI y atiende
+# dos requests, midiendo cada etapa.
+SCRIPT = r"""
+import io, json, sys, time
+t0 = time.perf_counter()
+from asistencia.wsgi import application
+t1 = time.perf_counter()
+
+def pedir(path):
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "",
+        "SERVER_NAME": "localhost", "SERVER_PORT": "80", "HTTP_HOST": "localhost",
+        "wsgi.url_scheme": "http", "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+        "wsgi.version": (1, 0), "wsgi.multithread": False, "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    estado = []
+    cuerpo = b"".join(application(environ, lambda s, h, e=None: estado.append(s)))
+    return estado[0], len(cuerpo)
+
+estado, _ = pedir(sys.argv[1])
+t2 = time.perf_counter()
+pedir(sys.argv[1])
+t3 = time.perf_counter()
+print(json.dumps({"estado": estado, "import": t1 - t0, "primera": t2 - t1, "segunda": t3 - t2}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Mide el tiempo hasta la primera respuesta desde un intérprete nuevo (cold start)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="/accounts/login/", help="Ruta a pedir (default: /accounts/login/)")
+        parser.add_argument("--repeticiones", type=int, default=5)
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.pop("SIGA_PERFIL_ARRANQUE", None)
+
+        muestras = []
+        for _ in range(options["repeticiones"]):
+            proc = subprocess.run(
+                [sys.executable, "-c", SCRIPT, options["url"]],
+                cwd=settings.BASE_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                raise CommandError(proc.stderr.strip())
+            muestras.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+        self.stdout.write(f"URL: {options['url']}  (estado {muestras[0]['estado']})")
+        for clave, etiqueta in (
+            ("import", "import asistencia.wsgi"),
+            ("primera", "primer request"),
+            ("segunda", "segundo request"),
+        ):
+            valores = [m[clave] * 1000 for m in muestras]
+            self.stdout.write(
+                f"{etiqueta:<24} mediana {statistics.median(valores):8.1f} ms   "
+                f"min {min(valores):8.1f} ms   max {max(valores):8.1f} ms"
+            )
+        total = [(m["import"] + m["primera"]) * 1000 for m in muestras]
+        self.stdout.write(self.style.SUCCESS(
+            f"Tiempo hasta la primera respuesta (mediana): {statistics.median(total):.1f} ms"
+        ))
@@ -0,0 +1,79 @@
+# asistencias/management/commands/bench_checkin.py
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.db.models import Count
+from django.test import RequestFactory
+from django.utils import timezone
+
+from ...checkin import generar_token, invalidar_roster
+from ...models import AlumnoMateria, Asistencia, DocenteMateria
+from ...views.checkin_views import checkin_alumno
+
+
+class Command(BaseCommand):
+    help = (
+        "Simula a toda una comisión escaneando el QR a la vez y mide el throughput "
+        "del endpoint de check-in (token + padrón cacheado + upsert)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--curso", type=int, help="Id de DocenteMateria (default: el de más inscriptos)")
+        parser.add_argument("--hilos", type=int, default=50, help="Check-ins simultáneos (default: 50)")
+        parser.add_argument("--rondas", type=int, default=3, help="Veces que cada alumno escanea (reintentos)")
+
+    def handle(self, *args, **o):
+        cursos = DocenteMateria.objects.select_related("materia", "periodo")
+        if o["curso"]:
+            dm = cursos.filter(id=o["curso"]).first()
+        else:
+            # El curso con más inscriptos en su materia/periodo
+            mayor = (
+                AlumnoMateria.objects.values("materia_id", "periodo_id")
+                .annotate(n=Count("id")).order_by("-n").first()
+            )
+            dm = mayor and cursos.filter(materia_id=mayor["materia_id"], periodo_id=mayor["periodo_id"]).first()
+        if not dm:
+            raise CommandError("No hay cursos con inscriptos (ver generar_datos_sinteticos).")
+
+        inscriptos = list(
+            AlumnoMateria.objects.filter(materia=dm.materia, periodo=dm.periodo)
+            .select_related("alumno__user")
+        )
+        usuarios = [am.alumno.user for am in inscriptos] * o["rondas"]
+        token = generar_token(dm)
+        hoy = timezone.localdate()
+        Asistencia.objects.filter(alumno_materia__in=inscriptos, fecha=hoy).delete()
+        invalidar_roster(dm.materia_id, dm.periodo_id)
+
+        rf = RequestFactory()
+
+        def escanear(user):
+            request = rf.get(f"/app/alumno/checkin/{token}/")
+            request.user = user
+            t0 = time.perf_counter()
+            try:
+                response = checkin_alumno(request, token)
+            finally:
+                close_old_connections()
+            return response.status_code, time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=o["hilos"]) as ex:
+            resultados = list(ex.map(escanear, usuarios))
+        duracion = time.perf_counter() - t0
+
+        latencias = sorted(r[1] * 1000 for r in resultados)
+        errores = sum(1 for r in resultados if r[0] != 200)
+        registrados = Asistencia.objects.filter(alumno_materia__in=inscriptos, fecha=hoy, estado="Presente").count()
+
+        self.stdout.write(f"Curso: {dm} — {len(inscriptos)} inscriptos × {o['rondas']} escaneos, {o['hilos']} hilos")
+        self.stdout.write(
+            f"{len(resultados)} check-ins en {duracion:.2f}s → {len(resultados) / duracion:.0f}/s · "
+            f"p50 {statistics.median(latencias):.1f} ms · p95 {latencias[int(len(latencias) * 0.95) - 1]:.1f} ms"
+        )
+        estilo = self.style.SUCCESS if registrados == len(inscriptos) and not errores else self.style.ERROR
+        self.stdout.write(estilo(f"Filas Presente: {registrados}/{len(inscriptos)} · errores: {errores}"))
@@ -0,0 +1,78 @@
+# asistencias/management/commands/bench_conexiones.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+
+from ...models import Asistencia
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga local: simula requests concurrentes contra Postgres y "
+        "muestrea pg_stat_activity para verificar que las conexiones quedan acotadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hilos", type=int, default=32, help="Requests concurrentes (default: 32)")
+        parser.add_argument("--requests", type=int, default=500, help="Requests totales (default: 500)")
+        parser.add_argument("--intervalo", type=float, default=0.05, help="Muestreo de conexiones en segundos")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Esta prueba requiere DATABASE_URL apuntando a Postgres.")
+
+        pool_cfg = connection.settings_dict.get("OPTIONS", {}).get("pool")
+        self.stdout.write(f"Pool: {pool_cfg or 'desactivado (conn_max_age)'}")
+
+        muestras = []
+        fin = threading.Event()
+
+        def muestrear():
+            # Conexión aparte (fuera del pool) para muestrear sin afectar la medición
+            monitor = connections.create_connection("default")
+            monitor.settings_dict = {**monitor.settings_dict, "OPTIONS": {
+                k: v for k, v in monitor.settings_dict.get("OPTIONS", {}).items() if k != "pool"
+            }}
+            try:
+                with monitor.cursor() as cur:
+                    while not fin.is_set():
+                        cur.execute(
+                            "SELECT count(*) FROM pg_stat_activity "
+                            "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+                        )
+                        muestras.append(cur.fetchone()[0])
+                        time.sleep(options["intervalo"])
+            finally:
+                monitor.close()
+
+        def simular_request(_):
+            # Mismo ciclo que el handler de Django: al terminar el request la
+            # conexión vuelve al pool (sin pool, queda abierta por conn_max_age).
+            request_started.send(sender=self.__class__)
+            t0 = time.perf_counter()
+            try:
+                Asistencia.objects.filter(fecha__isnull=False).count()
+            finally:
+                request_finished.send(sender=self.__class__)
+            return time.perf_counter() - t0
+
+        hilo_monitor = threading.Thread(target=muestrear, daemon=True)
+        hilo_monitor.start()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["hilos"]) as ex:
+            latencias = sorted(ex.map(simular_request, range(options["requests"])))
+        duracion = time.perf_counter() - t0
+        fin.set()
+        hilo_monitor.join()
+
+        p95 = latencias[int(len(latencias) * 0.95) - 1] if latencias else 0
+        self.stdout.write(f"Requests: {len(latencias)} en {duracion:.2f}s ({len(latencias) / duracion:.0f} req/s)")
+        self.stdout.write(f"Latencia p50 {latencias[len(latencias) // 2] * 1000:.1f} ms · p95 {p95 * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"Conexiones abiertas (pg_stat_activity): máx {max(muestras, default=0)} · "
+            f"promedio {sum(muestras) / max(len(muestras), 1):.1f}"
+        ))
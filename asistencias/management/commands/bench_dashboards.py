@@ -0,0 +1,95 @@
+# asistencias/management/commands/bench_dashboards.py
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, AsyncRequestFactory
+
+from ...models import User, Docente
+from ...views import admin_views, docente_views, async_views
+
+VISTAS = {
+    "admin_dashboard": (admin_views.admin_dashboard, async_views.admin_dashboard, "/app/admin/dashboard/"),
+    "docente_dashboard": (docente_views.docente_dashboard, async_views.docente_dashboard, "/app/docente/dashboard/"),
+    "docente_metricas": (docente_views.docente_metricas, async_views.docente_metricas, "/app/docente/metricas/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara la latencia de dashboards/métricas: vistas sync (camino WSGI) "
+        "contra las versiones async con consultas concurrentes (camino ASGI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vista", choices=sorted(VISTAS), action="append",
+                            help="Vista a medir (repetible; default: todas)")
+        parser.add_argument("--repeticiones", type=int, default=10)
+        parser.add_argument("--latencia-ms", type=float, default=0.0,
+                            help="Latencia simulada por consulta (ej. 5 para emular una base remota)")
+
+    def handle(self, *args, **options):
+        admin = User.objects.filter(rol=User.Rol.ADMIN).first()
+        # El docente con más cursos, para que el detalle por curso pese
+        docente = (
+            Docente.objects.select_related("user")
+            .annotate(n=Count("docentemateria")).order_by("-n", "id").first()
+        )
+        if not admin or not docente:
+            raise CommandError("Hace falta al menos un usuario ADMIN y un Docente (ver generar_datos_sinteticos).")
+
+        latencia = options["latencia_ms"] / 1000.0
+        if latencia:
+            def _demora(execute, sql, params, many, context):
+                time.sleep(latencia)
+                return execute(sql, params, many, context)
+
+            def _instalar(sender, connection, **kwargs):
+                connection.execute_wrappers.append(_demora)
+
+            connection_created.connect(_instalar, weak=False)
+            connections.close_all()
+
+        for nombre in options["vista"] or sorted(VISTAS):
+            vista_sync, vista_async, path = VISTAS[nombre]
+            user = admin if nombre.startswith("admin") else docente.user
+            t_sync = self._medir_sync(vista_sync, path, user, options["repeticiones"])
+            t_async = self._medir_async(vista_async, path, user, options["repeticiones"])
+            self.stdout.write(
+                f"{nombre:<20} sync {t_sync:8.1f} ms   async {t_async:8.1f} ms   "
+                f"x{(t_sync / t_async) if t_async else 0:.2f}"
+            )
+
+    def _medir_sync(self, vista, path, user, n):
+        rf = RequestFactory()
+        tiempos = []
+        for _ in range(n):
+            request = rf.get(path)
+            request.user = user
+            t0 = time.perf_counter()
+            vista(request)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(tiempos)
+
+    def _medir_async(self, vista, path, user, n):
+        rf = AsyncRequestFactory()
+
+        async def _auser():
+            return user
+
+        async def _correr():
+            tiempos = []
+            for _ in range(n):
+                request = rf.get(path)
+                request.user = user
+                request.auser = _auser
+                t0 = time.perf_counter()
+                await vista(request)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            return statistics.median(tiempos)
+
+        return asyncio.run(_correr())
@@ -0,0 +1,70 @@
+# asistencias/management/commands/bench_sesiones.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ...models import Docente
+
+ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los modos de sesión (SESION_MODO): consultas a la base por "
+        "request (total y a django_session) y latencia, con un docente logueado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modo", choices=sorted(ENGINES), action="append",
+                            help="Modo a medir (repetible; default: todos)")
+        parser.add_argument("--path", default="/app/docente/cursos/")
+        parser.add_argument("--repeticiones", type=int, default=20)
+
+    def handle(self, *args, **options):
+        docente = Docente.objects.select_related("user").first()
+        if not docente:
+            raise CommandError("Hace falta al menos un Docente (ver generar_datos_sinteticos).")
+
+        self.stdout.write(f"{'modo':<16}{'consultas':>10}{'sesión':>8}{'escrituras':>12}{'ms':>9}")
+        for modo in options["modo"] or ENGINES:
+            with override_settings(SESSION_ENGINE=ENGINES[modo]):
+                fila = self._medir(docente.user, options["path"], options["repeticiones"])
+            self.stdout.write(
+                f"{modo:<16}{fila['consultas']:>10.1f}{fila['sesion']:>8.1f}"
+                f"{fila['escrituras']:>12.1f}{fila['ms']:>9.1f}"
+            )
+
+    def _medir(self, user, path, n):
+        # Client nuevo: SessionMiddleware toma el engine al instanciarse
+        client = Client(SERVER_NAME="localhost")
+        client.force_login(user)
+        client.get(path)  # calentar (cache de sesión, perfil en la sesión)
+
+        consultas, sesion, escrituras, tiempos = [], [], [], []
+        for _ in range(n):
+            with CaptureQueriesContext(connection) as q:
+                t0 = time.perf_counter()
+                response = client.get(path)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{path} respondió {response.status_code}.")
+            sql = [c["sql"] for c in q.captured_queries]
+            consultas.append(len(sql))
+            sesion.append(sum("django_session" in s for s in sql))
+            escrituras.append(sum(
+                "django_session" in s and not s.lstrip().upper().startswith("SELECT") for s in sql
+            ))
+        return {
+            "consultas": statistics.mean(consultas),
+            "sesion": statistics.mean(sesion),
+            "escrituras": statistics.mean(escrituras),
+            "ms": statistics.median(tiempos),
+        }
@@ -0,0 +1,55 @@
+# asistencias/management/commands/enviar_correos.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...correo import procesar, procesar_pendientes, purgar
+
+PURGA_CADA = 3600  # segundos, en --continuo
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía los correos pendientes del outbox en lotes, reutilizando una "
+        "conexión por lote, y borra los enviados o con error más viejos que "
+        "CORREO_RETENCION_DIAS. Con --continuo queda corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, help="Correos por conexión (default CORREO_LOTE)")
+        parser.add_argument("--continuo", action="store_true", help="No terminar: revisar cada --intervalo segundos")
+        parser.add_argument("--intervalo", type=float, default=5)
+
+    def handle(self, *args, **o):
+        if not o["continuo"]:
+            if o["lote"]:
+                enviados, fallidos = procesar(o["lote"])
+            else:
+                enviados, fallidos = procesar_pendientes()
+            self._informar(enviados, fallidos)
+            self._purgar()
+            return
+
+        self.stdout.write(f"Worker de correo corriendo (cada {o['intervalo']}s). Ctrl+C para salir.")
+        ultima_purga = None
+        try:
+            while True:
+                if ultima_purga is None or time.monotonic() - ultima_purga >= PURGA_CADA:
+                    self._purgar()
+                    ultima_purga = time.monotonic()
+                enviados, fallidos = procesar(o["lote"])
+                if enviados or fallidos:
+                    self._informar(enviados, fallidos)
+                else:
+                    time.sleep(o["intervalo"])
+        except KeyboardInterrupt:
+            pass
+
+    def _informar(self, enviados, fallidos):
+        estilo = self.style.WARNING if fallidos else self.style.SUCCESS
+        self.stdout.write(estilo(f"{enviados} correos enviados, {fallidos} con error (se reintentan)."))
+
+    def _purgar(self):
+        borrados = purgar()
+        if borrados:
+            self.stdout.write(f"{borrados} correos viejos borrados del outbox.")
@@ -0,0 +1,114 @@
+# asistencias/management/commands/enviar_resumen_riesgo.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from ...correo import procesar_pendientes, sin_hilo
+from ...estadisticas import con_resumen, porcentaje
+from ...models import AlumnoMateria, DocenteMateria, Periodo
+
+UMBRAL = 75
+
+
+class Command(BaseCommand):
+    help = (
+        "Encola el resumen semanal de asistencia: a cada alumno con materias en "
+        "riesgo (o en riesgo pronto) y a cada docente con alumnos en esa situación. "
+        "Pensado para un cron semanal. Los envía por el outbox antes de salir "
+        "(con --solo-encolar quedan para enviar_correos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", type=int, help="Periodo (default: los activos)")
+        parser.add_argument("--dry-run", action="store_true", help="Sólo contar, no encolar")
+        parser.add_argument(
+            "--solo-encolar", action="store_true",
+            help="Dejar los correos para `enviar_correos` en lugar de enviarlos antes de salir",
+        )
+
+    def handle(self, *args, **o):
+        if o["periodo"]:
+            if not Periodo.objects.filter(id=o["periodo"]).exists():
+                raise CommandError(f"No existe el periodo {o['periodo']}.")
+            periodos = [o["periodo"]]
+        else:
+            periodos = list(Periodo.objects.filter(activo=True).values_list("id", flat=True))
+
+        try:
+            from ...proyeccion import proyecciones
+            proyectadas = {}
+            for p in periodos:
+                proyectadas.update(proyecciones(p))
+        except ImportError:
+            self.stdout.write(self.style.WARNING("Sin numpy: sólo se informa el riesgo actual."))
+            proyectadas = {}
+
+        # Una consulta agregada para todas las cursadas de los periodos
+        cursadas = con_resumen(
+            AlumnoMateria.objects
+            .filter(periodo_id__in=periodos)
+            .select_related("alumno__user", "materia", "periodo")
+        ).filter(total__gt=0)
+
+        por_alumno = defaultdict(lambda: {"en_riesgo": [], "en_riesgo_pronto": []})
+        por_curso = defaultdict(lambda: {"en_riesgo": [], "en_riesgo_pronto": []})
+        for am in cursadas:
+            fila = {
+                "alumno": am.alumno,
+                "materia": am.materia.nombre,
+                "periodo": am.periodo,
+                "porcentaje": porcentaje(am.presentes + am.justificados, am.total),
+                "proyeccion": proyectadas.get(am.id),
+            }
+            if fila["porcentaje"] < UMBRAL:
+                lista = "en_riesgo"
+            elif fila["proyeccion"] and fila["proyeccion"].en_riesgo_pronto:
+                lista = "en_riesgo_pronto"
+            else:
+                continue
+            por_alumno[am.alumno][lista].append(fila)
+            por_curso[(am.materia_id, am.periodo_id)][lista].append(fila)
+
+        comun = {"umbral": UMBRAL, "instituto": getattr(settings, "INSTITUTO_NOMBRE", "SIGA")}
+        mensajes = []
+        for alumno, listas in por_alumno.items():
+            if alumno.user.email:
+                mensajes.append(EmailMessage(
+                    subject="Tu resumen semanal de asistencia",
+                    body=render_to_string("correos/resumen_riesgo_alumno.txt", {**comun, **listas, "alumno": alumno}),
+                    to=[alumno.user.email],
+                ))
+
+        cursos_por_docente = defaultdict(list)
+        for dm in (
+            DocenteMateria.objects
+            .filter(periodo_id__in=periodos)
+            .select_related("docente__user", "materia", "periodo")
+            .order_by("materia__nombre")
+        ):
+            listas = por_curso.get((dm.materia_id, dm.periodo_id))
+            if listas:
+                cursos_por_docente[dm.docente].append({"curso": dm, **listas})
+        for docente, cursos in cursos_por_docente.items():
+            if docente.user.email:
+                mensajes.append(EmailMessage(
+                    subject="Resumen semanal: alumnos en riesgo en tus cursos",
+                    body=render_to_string("correos/resumen_riesgo_docente.txt", {**comun, "docente": docente, "cursos": cursos}),
+                    to=[docente.user.email],
+                ))
+
+        if o["dry_run"]:
+            self.stdout.write(f"Se encolarían {len(mensajes)} correos.")
+            return
+        # Con el backend de outbox: una sola inserción masiva. Sin el hilo de
+        # envío: moriría con el proceso a mitad de lote.
+        with sin_hilo():
+            encolados = get_connection().send_messages(mensajes) if mensajes else 0
+        self.stdout.write(self.style.SUCCESS(f"{encolados} correos encolados."))
+        if encolados and not o["solo_encolar"]:
+            enviados, fallidos = procesar_pendientes()
+            estilo = self.style.WARNING if fallidos else self.style.SUCCESS
+            self.stdout.write(estilo(f"{enviados} correos enviados, {fallidos} con error (se reintentan)."))
@@ -0,0 +1,125 @@
+# asistencias/management/commands/generar_datos_sinteticos.py
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import (
+    User, Alumno, Docente, Carrera, Materia, Periodo,
+    DocenteMateria, AlumnoMateria, Asistencia,
+)
+
+ESTADOS = ["Presente", "Ausente", "Tardanza", "Justificado"]
+PESOS = [0.78, 0.12, 0.06, 0.04]
+TURNOS = ["Mañana", "Tarde", "Noche"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un dataset sintético (carreras, materias, docentes, alumnos, "
+        "inscripciones y asistencias) para benchmarks locales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--carreras", type=int, default=3)
+        parser.add_argument("--materias", type=int, default=8, help="Materias por carrera")
+        parser.add_argument("--docentes", type=int, default=30)
+        parser.add_argument("--alumnos", type=int, default=500)
+        parser.add_argument("--periodos", type=int, default=2)
+        parser.add_argument("--inscripciones", type=int, default=5, help="Materias por alumno y periodo")
+        parser.add_argument("--clases", type=int, default=30, help="Clases por cursada")
+        parser.add_argument("--password", default="siga1234", help="Contraseña de todos los usuarios generados")
+        parser.add_argument("--seed", type=int, default=40)
+
+    @transaction.atomic
+    def handle(self, *args, **o):
+        if Carrera.objects.filter(codigo__startswith="SYN").exists():
+            raise CommandError("Ya existe un dataset sintético (carreras SYN*).")
+
+        rnd = random.Random(o["seed"])
+        pwd = make_password(o["password"])  # un solo hash para todos
+        lote = 5000
+
+        carreras = Carrera.objects.bulk_create([
+            Carrera(nombre=f"Carrera sintética {i}", codigo=f"SYN{i}")
+            for i in range(1, o["carreras"] + 1)
+        ])
+        materias = Materia.objects.bulk_create([
+            Materia(nombre=f"Materia {c.codigo}-{j}", codigo=f"M{j}", carrera=c)
+            for c in carreras for j in range(1, o["materias"] + 1)
+        ])
+
+        hoy = date.today()
+        periodos = []
+        for k in range(o["periodos"]):
+            inicio = date(hoy.year - k, 3, 1)
+            pid = inicio.year * 100 + inicio.month
+            p, _ = Periodo.objects.get_or_create(
+                id=pid,
+                defaults={"fecha_inicio": inicio, "fecha_fin": date(inicio.year, 7, 31), "activo": k == 0},
+            )
+            periodos.append(p)
+
+        usuarios_doc = User.objects.bulk_create([
+            User(username=f"syn_doc{i}", email=f"syn_doc{i}@siga.local", rol=User.Rol.DOCENTE, password=pwd)
+            for i in range(o["docentes"])
+        ], batch_size=lote)
+        docentes = Docente.objects.bulk_create([
+            Docente(user=u, nombre=f"Docente{i}", apellido=f"Sintético{i:04d}", legajo=900000 + i)
+            for i, u in enumerate(usuarios_doc)
+        ], batch_size=lote)
+
+        usuarios_al = User.objects.bulk_create([
+            User(username=f"syn_al{i}", email=f"syn_al{i}@siga.local", rol=User.Rol.ALUMNO, password=pwd)
+            for i in range(o["alumnos"])
+        ], batch_size=lote)
+        alumnos = Alumno.objects.bulk_create([
+            Alumno(user=u, nombre=f"Alumno{i}", apellido=f"Sintético{i:05d}", dni=90000000 + i)
+            for i, u in enumerate(usuarios_al)
+        ], batch_size=lote)
+
+        # Un docente por materia y periodo
+        DocenteMateria.objects.bulk_create([
+            DocenteMateria(
+                docente=rnd.choice(docentes), materia=m, periodo=p,
+                turno=rnd.choice(TURNOS), aula=f"A{rnd.randint(1, 20)}",
+            )
+            for m in materias for p in periodos
+        ], batch_size=lote, ignore_conflicts=True)
+
+        # Inscripciones: materias de una misma carrera por alumno
+        por_carrera = {}
+        for m in materias:
+            por_carrera.setdefault(m.carrera_id, []).append(m)
+        inscripciones = []
+        for a in alumnos:
+            propias = por_carrera[rnd.choice(carreras).id]
+            for p in periodos:
+                for m in rnd.sample(propias, min(o["inscripciones"], len(propias))):
+                    inscripciones.append(AlumnoMateria(alumno=a, materia=m, periodo=p))
+        inscripciones = AlumnoMateria.objects.bulk_create(inscripciones, batch_size=lote)
+
+        # Asistencias: una clase por semana desde el inicio del periodo
+        total = 0
+        buffer = []
+        for am in inscripciones:
+            p = next(x for x in periodos if x.id == am.periodo_id)
+            for n in range(o["clases"]):
+                buffer.append(Asistencia(
+                    alumno_materia=am,
+                    fecha=p.fecha_inicio + timedelta(days=7 * n + (am.materia_id % 5)),
+                    estado=rnd.choices(ESTADOS, PESOS)[0],
+                ))
+            if len(buffer) >= lote:
+                Asistencia.objects.bulk_create(buffer, batch_size=lote)
+                total += len(buffer)
+                buffer = []
+        Asistencia.objects.bulk_create(buffer, batch_size=lote)
+        total += len(buffer)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generados: {len(carreras)} carreras, {len(materias)} materias, {len(docentes)} docentes, "
+            f"{len(alumnos)} alumnos, {len(inscripciones)} inscripciones, {total} asistencias."
+        ))
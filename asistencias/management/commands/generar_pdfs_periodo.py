@@ -0,0 +1,122 @@
+# asistencias/management/commands/generar_pdfs_periodo.py
+import os
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ...models import Alumno, AlumnoMateria, DocenteMateria, Periodo
+
+
+def _inicializar():
+    # Con "spawn" el proceso hijo arranca sin Django configurado
+    import django
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "asistencia.settings")
+    django.setup()
+
+
+def _render_cursos(ids, carpeta):
+    from ...estadisticas import resumen_curso
+    from ...pdf import pdf_reporte_curso
+
+    generados = []
+    cursos = (
+        DocenteMateria.objects
+        .filter(id__in=ids)
+        .select_related("materia", "materia__carrera", "periodo", "docente")
+    )
+    for dm in cursos:
+        ruta = Path(carpeta) / f"curso_{dm.id}.pdf"
+        pdf_reporte_curso(dm, resumen_curso(dm), ruta)
+        nombre = f"cursos/{dm.materia.carrera.codigo}/{dm.materia.codigo}_{dm.id}.pdf"
+        generados.append((str(ruta), nombre))
+    return generados
+
+
+def _render_constancias(ids, periodo_id, carpeta):
+    from ...estadisticas import con_resumen, fila_resumen
+    from ...pdf import pdf_constancia
+
+    periodo = Periodo.objects.get(id=periodo_id)
+    # Una sola consulta agregada para todo el lote de alumnos
+    por_alumno = {}
+    cursadas = con_resumen(
+        AlumnoMateria.objects
+        .filter(alumno_id__in=ids, periodo_id=periodo_id)
+        .select_related("alumno", "materia")
+        .order_by("alumno_id", "materia__nombre")
+    )
+    for am in cursadas:
+        por_alumno.setdefault(am.alumno_id, (am.alumno, []))[1].append(fila_resumen(am))
+
+    generados = []
+    for alumno, datos in por_alumno.values():
+        ruta = Path(carpeta) / f"constancia_{alumno.id}.pdf"
+        pdf_constancia(alumno, periodo, datos, ruta)
+        generados.append((str(ruta), f"constancias/{alumno.dni}_{alumno.apellido}.pdf"))
+    return generados
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera en paralelo los PDF de un periodo (reportes por curso o constancias "
+        "por alumno) y los empaqueta en un único ZIP escrito directamente a disco."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("periodo", type=int, help="Id del periodo (AAAAMM)")
+        parser.add_argument("--tipo", choices=["cursos", "constancias"], default="cursos")
+        parser.add_argument("--procesos", type=int, default=os.cpu_count() or 2)
+        parser.add_argument("--lote", type=int, default=25, help="PDFs por tarea (default: 25)")
+        parser.add_argument("--salida", help="Ruta del ZIP (default: MEDIA_ROOT/reportes/...)")
+
+    def handle(self, *args, **o):
+        try:
+            periodo = Periodo.objects.get(id=o["periodo"])
+        except Periodo.DoesNotExist:
+            raise CommandError(f"No existe el periodo {o['periodo']}.")
+
+        if o["tipo"] == "cursos":
+            ids = list(DocenteMateria.objects.filter(periodo=periodo).order_by("id").values_list("id", flat=True))
+        else:
+            ids = list(
+                Alumno.objects.filter(alumnomateria__periodo=periodo)
+                .distinct().order_by("id").values_list("id", flat=True)
+            )
+        if not ids:
+            raise CommandError("No hay datos para ese periodo.")
+
+        salida = Path(o["salida"] or Path(settings.MEDIA_ROOT) / "reportes" / f"periodo_{periodo.id}_{o['tipo']}.zip")
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        lotes = [ids[i:i + o["lote"]] for i in range(0, len(ids), o["lote"])]
+
+        # Los procesos hijos (fork) no deben heredar conexiones abiertas
+        connections.close_all()
+
+        t0 = time.perf_counter()
+        hechos = 0
+        with tempfile.TemporaryDirectory(dir=salida.parent) as carpeta, \
+                zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_STORED) as zf, \
+                ProcessPoolExecutor(max_workers=o["procesos"], initializer=_inicializar) as ex:
+            if o["tipo"] == "cursos":
+                futuros = [ex.submit(_render_cursos, lote, carpeta) for lote in lotes]
+            else:
+                futuros = [ex.submit(_render_constancias, lote, periodo.id, carpeta) for lote in lotes]
+
+            # Cada PDF pasa del disco temporal al ZIP y se borra: memoria acotada
+            for futuro in as_completed(futuros):
+                for ruta, nombre in futuro.result():
+                    zf.write(ruta, nombre)
+                    os.unlink(ruta)
+                    hechos += 1
+                self.stdout.write(f"  {hechos} PDFs...", ending="\r")
+
+        dur = time.perf_counter() - t0
+        self.stdout.write(self.style.SUCCESS(
+            f"{hechos} PDFs ({o['tipo']}) en {dur:.1f}s ({hechos / dur:.1f}/s) con {o['procesos']} procesos → {salida}"
+        ))
@@ -0,0 +1,62 @@
+# asistencias/management/commands/medir_asistencia.py
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+
+from ...estadisticas import con_resumen
+from ...models import AlumnoMateria, Asistencia
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tamaño en disco de la tabla asistencia (datos e índices) y la "
+        "velocidad de los agregados por estado (PostgreSQL o SQLite con dbstat)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticiones", type=int, default=5)
+
+    def handle(self, *args, **o):
+        tabla = Asistencia._meta.db_table
+        filas = Asistencia.objects.count()
+        datos, indices = self._tamanios(tabla)
+        self.stdout.write(f"Filas: {filas}")
+        self.stdout.write(f"Tabla:   {datos / 1024:10.0f} KiB  ({datos / max(filas, 1):.1f} B/fila)")
+        self.stdout.write(f"Índices: {indices / 1024:10.0f} KiB")
+
+        consultas = {
+            "conteo por estado": lambda: list(Asistencia.objects.values("estado").annotate(n=Count("id"))),
+            "resumen por cursada": lambda: list(con_resumen(AlumnoMateria.objects.all())),
+            "filtro estado=Justificado": lambda: Asistencia.objects.filter(estado="Justificado").count(),
+        }
+        for nombre, consulta in consultas.items():
+            tiempos = []
+            for _ in range(o["repeticiones"]):
+                t0 = time.perf_counter()
+                consulta()
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            self.stdout.write(f"{nombre:<28} {statistics.median(tiempos):8.1f} ms (mediana)")
+
+    def _tamanios(self, tabla):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_relation_size(%s), pg_indexes_size(%s)", [tabla, tabla])
+                return cursor.fetchone()
+            if connection.vendor == "sqlite":
+                indices = [
+                    nombre for nombre, info in
+                    connection.introspection.get_constraints(cursor, tabla).items()
+                    if info["index"] or info["unique"]
+                ]
+                try:
+                    cursor.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+                except Exception:
+                    raise CommandError("Este SQLite no tiene la tabla virtual dbstat.")
+                tam = dict(cursor.fetchall())
+                # Los UNIQUE inline se guardan como sqlite_autoindex_<tabla>_N
+                auto = sum(v for k, v in tam.items() if k.startswith(f"sqlite_autoindex_{tabla}_"))
+                return tam.get(tabla, 0), sum(tam.get(i, 0) for i in indices) + auto
+        raise CommandError(f"Motor no soportado: {connection.vendor}")
@@ -0,0 +1,27 @@
+# asistencias/management/commands/perfil_arranque.py
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Arranca un intérprete nuevo con SIGA_PERFIL_ARRANQUE=1 y muestra el costo "
+        "de importación de asistencia.wsgi agregado por paquete."
+    )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, SIGA_PERFIL_ARRANQUE="1")
+        proc = subprocess.run(
+            [sys.executable, "-c", "import asistencia.wsgi"],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise CommandError(proc.stderr.strip())
+        self.stdout.write(proc.stderr.rstrip())
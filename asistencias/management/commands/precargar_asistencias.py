@@ -0,0 +1,51 @@
+# asistencias/management/commands/precargar_asistencias.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...cronograma import precargar
+from ...models import Periodo
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f"Fecha inválida: {valor} (AAAA-MM-DD).")
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea las asistencias \"sin tomar\" (estado vacío) de cada fecha de clase "
+        "del cronograma (HorarioClase, sin feriados) hasta hoy, un bulk_create por "
+        "curso. No pisa lo ya cargado ni cuenta en los porcentajes. Pensado para "
+        "un cron diario."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", type=int, help="Periodo (default: los activos)")
+        parser.add_argument("--curso", type=int, action="append", help="Sólo este DocenteMateria (repetible)")
+        parser.add_argument("--desde", type=_fecha, help="AAAA-MM-DD (default: inicio del periodo)")
+        parser.add_argument("--hasta", type=_fecha, help="AAAA-MM-DD (default: hoy)")
+        parser.add_argument("--dry-run", action="store_true", help="Sólo contar, no crear")
+
+    def handle(self, *args, **o):
+        if o["periodo"]:
+            periodos = list(Periodo.objects.filter(id=o["periodo"]))
+            if not periodos:
+                raise CommandError(f"No existe el periodo {o['periodo']}.")
+        else:
+            periodos = list(Periodo.objects.filter(activo=True))
+
+        def informar(dm, fechas, filas):
+            self.stdout.write(f"  {dm.materia.nombre} [{dm.id}]: {len(fechas)} clases, {filas} asistencias")
+
+        total = 0
+        for periodo in periodos:
+            self.stdout.write(f"Periodo {periodo.id}:")
+            total += precargar(
+                periodo, hasta=o["hasta"], desde=o["desde"], cursos=o["curso"],
+                dry_run=o["dry_run"], informar=informar,
+            )
+        accion = "a crear" if o["dry_run"] else "creadas"
+        self.stdout.write(self.style.SUCCESS(f"{total} asistencias {accion}."))
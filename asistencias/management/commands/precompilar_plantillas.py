@@ -0,0 +1,37 @@
+# asistencias/management/commands/precompilar_plantillas.py
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError, engines
+
+
+class Command(BaseCommand):
+    help = (
+        "Compila todas las plantillas del proyecto para detectar errores en el build "
+        "y dejar el loader cacheado caliente en el proceso actual."
+    )
+
+    def handle(self, *args, **options):
+        total = 0
+        errores = []
+        for engine in engines.all():
+            dirs = getattr(engine, "template_dirs", [])
+            for base in dirs:
+                base = Path(base)
+                if not base.is_dir():
+                    continue
+                for path in sorted(base.rglob("*")):
+                    if path.suffix not in (".html", ".txt") or not path.is_file():
+                        continue
+                    nombre = path.relative_to(base).as_posix()
+                    try:
+                        engine.get_template(nombre)
+                        total += 1
+                    except TemplateSyntaxError as exc:
+                        errores.append(f"{nombre}: {exc}")
+
+        for e in errores:
+            self.stderr.write(self.style.ERROR(e))
+        if errores:
+            raise CommandError(f"{len(errores)} plantilla(s) con errores.")
+        self.stdout.write(self.style.SUCCESS(f"Plantillas compiladas: {total}"))
@@ -0,0 +1,40 @@
+# asistencias/management/commands/procesar_eliminaciones.py
+from django.core.management.base import BaseCommand, CommandError
+
+from ...eliminacion import ejecutar
+from ...models import Eliminacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los borrados en cascada pendientes (o reanuda los cortados) "
+        "por lotes, informando el progreso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--id", type=int, help="Sólo esta eliminación")
+        parser.add_argument(
+            "--reintentar", action="store_true",
+            help="Incluir también las que quedaron EN_CURSO o con ERROR",
+        )
+
+    def handle(self, *args, **o):
+        estados = [Eliminacion.Estado.PENDIENTE]
+        if o["reintentar"] or o["id"]:
+            estados += [Eliminacion.Estado.EN_CURSO, Eliminacion.Estado.ERROR]
+        qs = Eliminacion.objects.filter(estado__in=estados).order_by("creada")
+        if o["id"]:
+            qs = qs.filter(pk=o["id"])
+            if not qs.exists():
+                raise CommandError(f"No hay una eliminación {o['id']} para procesar.")
+
+        for eliminacion in qs:
+            self.stdout.write(f"{eliminacion.descripcion}: ~{eliminacion.estimado} registros")
+            eliminacion = ejecutar(
+                eliminacion,
+                informar=lambda e: self.stdout.write(f"  {e.borrados}/{e.estimado} ({e.progreso}%)", ending="\r"),
+            )
+            if eliminacion.estado == Eliminacion.Estado.ERROR:
+                self.stdout.write(self.style.ERROR(f"  error: {eliminacion.error}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"  {eliminacion.borrados} registros borrados."))
@@ -0,0 +1,22 @@
+# asistencias/management/commands/purgar_operaciones_sync.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...models import OperacionSync
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las claves de idempotencia de la sincronización offline más "
+        "viejas que --dias (un cliente no reintenta un lote tanto tiempo después)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=30)
+
+    def handle(self, *args, **o):
+        limite = timezone.now() - timedelta(days=o["dias"])
+        borradas, _ = OperacionSync.objects.filter(creado__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"{borradas} operaciones borradas."))
@@ -0,0 +1,47 @@
+# asistencias/management/commands/restaurar.py
+from django.core.management.base import BaseCommand, CommandError
+
+from ...respaldos import ErrorRespaldo, leer_manifest, restaurar, verificar
+
+
+class Command(BaseCommand):
+    help = (
+        "Restaura un respaldo hecho con `respaldar`: verifica los checksums y "
+        "carga por lotes (upsert por pk) en una transacción con las "
+        "restricciones diferidas. Los grupos y permisos de auth no se "
+        "respaldan: los de los usuarios tienen que existir con los mismos ids."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("ruta", help="Carpeta del respaldo o su manifest.json")
+        parser.add_argument("--modelo", action="append", help="Sólo este modelo (repetible)")
+        parser.add_argument("--solo-verificar", action="store_true", help="Verificar checksums sin restaurar")
+
+    def handle(self, *args, **o):
+        try:
+            if o["solo_verificar"]:
+                carpeta, manifest = leer_manifest(o["ruta"])
+                errores = verificar(carpeta, manifest)
+                if errores:
+                    raise CommandError("Respaldo dañado:\n  " + "\n  ".join(errores))
+                self.stdout.write(self.style.SUCCESS(f"{len(manifest['modelos'])} archivos verificados."))
+                return
+
+            totales = {"bytes": 0, "segundos": 0.0}
+
+            def informar(modelo, filas, tam, segundos):
+                totales["bytes"] += tam
+                totales["segundos"] += segundos
+                self.stdout.write(
+                    f"  {modelo:<32}{filas:>10} filas {filas / segundos if segundos else 0:>10.0f} filas/s"
+                )
+
+            filas = restaurar(o["ruta"], nombres=o["modelo"], informar=informar)
+        except ErrorRespaldo as e:
+            raise CommandError(str(e))
+
+        s = totales["segundos"]
+        self.stdout.write(self.style.SUCCESS(
+            f"{filas} filas restauradas en {s:.1f} s "
+            f"({filas / s if s else 0:.0f} filas/s, {totales['bytes'] / 1024 / 1024 / s if s else 0:.1f} MB/s)."
+        ))
@@ -0,0 +1,60 @@
+# asistencias/management/commands/traspasar_periodo.py
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Periodo
+from ...traspaso import ESTADOS_DEFAULT, diferencias, traspasar
+
+
+def _periodo(id):
+    try:
+        return Periodo.objects.get(id=id)
+    except Periodo.DoesNotExist:
+        raise CommandError(f"No existe el periodo {id}.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Clona las asignaciones docente-materia de un periodo en otro y, con "
+        "--inscripciones, las inscripciones de alumnos. Un INSERT ... SELECT "
+        "por tabla en una transacción; lo que ya está en el destino no se toca."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("origen", type=int, help="Periodo origen (AAAAMM)")
+        parser.add_argument("destino", type=int, help="Periodo destino (AAAAMM), ya creado")
+        parser.add_argument("--inscripciones", action="store_true", help="Clonar también las inscripciones")
+        parser.add_argument(
+            "--estado", action="append",
+            help=f"estado_inscripcion a clonar (repetible, default: {', '.join(ESTADOS_DEFAULT)})",
+        )
+        parser.add_argument("--materia", type=int, action="append", help="Sólo esta materia (repetible)")
+        parser.add_argument("--dry-run", action="store_true", help="Mostrar las diferencias, no crear")
+
+    def handle(self, *args, **o):
+        origen, destino = _periodo(o["origen"]), _periodo(o["destino"])
+        if origen.pk == destino.pk:
+            raise CommandError("El periodo origen y el destino son el mismo.")
+        opciones = {"inscripciones": o["inscripciones"], "estados": o["estado"], "materias": o["materia"]}
+
+        if o["dry_run"]:
+            self.stdout.write(f"{origen.id} -> {destino.id} (a crear / ya en destino):")
+            totales = {"docentes": [0, 0], "inscripciones": [0, 0]}
+            for fila in diferencias(origen, destino, **opciones):
+                linea = f"  {fila['materia'].nombre}: docentes +{fila['docentes'][0]} / {fila['docentes'][1]}"
+                if o["inscripciones"]:
+                    linea += f", inscripciones +{fila['inscripciones'][0]} / {fila['inscripciones'][1]}"
+                self.stdout.write(linea)
+                for clave in totales:
+                    totales[clave][0] += fila[clave][0]
+                    totales[clave][1] += fila[clave][1]
+            resumen = f"{totales['docentes'][0]} asignaciones a crear ({totales['docentes'][1]} ya existen)"
+            if o["inscripciones"]:
+                resumen += f", {totales['inscripciones'][0]} inscripciones a crear ({totales['inscripciones'][1]} ya existen)"
+            self.stdout.write(self.style.SUCCESS(resumen + "."))
+            return
+
+        docentes, alumnos = traspasar(origen, destino, **opciones)
+        resumen = f"{docentes} asignaciones creadas en {destino.id}"
+        if o["inscripciones"]:
+            resumen += f", {alumnos} inscripciones"
+        self.stdout.write(self.style.SUCCESS(resumen + "."))
@@ -0,0 +1,104 @@
+# asistencias/middleware.py
+import re
+import secrets
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .perfiles import perfil_de
+from .routers import STICKY_COOKIE, replica_configurada
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete se sirve sólo gzip
+    brotli = None
+
+_ACEPTA_BR = re.compile(r"\bbr\b")
+# Ya comprimidos (XLSX es un ZIP): recomprimirlos sólo gasta CPU
+_YA_COMPRIMIDOS = ("application/vnd.openxmlformats", "application/zip", "application/pdf", "image/")
+
+
+class ReplicaStickyMiddleware:
+    """
+    Después de un request que escribe (POST/PUT/PATCH/DELETE), deja una cookie
+    corta para que las vistas `@usar_replica` lean de la primaria y el usuario
+    vea sus propios cambios aunque la réplica tenga lag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and replica_configurada():
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_STICKY_SECONDS", 15),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class PerfilMiddleware:
+    """
+    Resuelve una vez el perfil del rol (Docente / Alumno) y lo deja en
+    `request.profile` (ver perfiles.py). Va después de AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = perfil_de(request) if request.session.get(SESSION_KEY) else None
+        return self.get_response(request)
+
+
+class CompresionMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware de Django, con Brotli cuando el paquete `brotli` está
+    instalado y el navegador lo acepta (comprime mejor las tablas HTML
+    grandes). Sólo HTML va por Brotli; las respuestas streaming y las que no
+    califican siguen el camino gzip estándar.
+
+    Mitigación de BREACH igual que gzip: Django mete un nombre de archivo de
+    largo al azar (hasta `max_random_bytes`) en el header gzip; Brotli no
+    tiene dónde, así que al HTML se le agrega un comentario de largo al azar
+    antes de comprimir. El tamaño comprimido deja de delatar el token CSRF.
+    """
+
+    def _relleno(self):
+        n = secrets.randbelow(self.max_random_bytes + 1)
+        return b"<!-- " + secrets.token_urlsafe(n)[:n].encode() + b" -->"
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith(_YA_COMPRIMIDOS):
+            return response
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("text/html")
+            or len(response.content) < 200
+            or not _ACEPTA_BR.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        comprimido = brotli.compress(
+            response.content + self._relleno(), quality=getattr(settings, "BROTLI_CALIDAD", 5),
+        )
+        if len(comprimido) >= len(response.content):
+            return response
+
+        response.content = comprimido
+        response.headers["Content-Length"] = str(len(comprimido))
+        # Igual que gzip: el cuerpo ya no es byte a byte el mismo
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
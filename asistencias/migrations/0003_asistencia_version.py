@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0002_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asistencia',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0003_asistencia_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asistencia',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='asistencia',
+            index=models.Index(fields=['updated_at', 'id'], name='idx_asistencia_updated'),
+        ),
+        migrations.CreateModel(
+            name='OperacionSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=64)),
+                ('resultado', models.CharField(max_length=10)),
+                ('version', models.PositiveIntegerField(blank=True, null=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'operacion_sync',
+                'indexes': [models.Index(fields=['creado'], name='idx_operacion_sync_creado')],
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'clave'), name='unique_operacion_sync_clave')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0004_asistencia_updated_at_operacionsync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alumnomateria',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0005_alumnomateria_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carrera',
+            name='eliminado',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='materia',
+            name='eliminado',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='eliminado',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Eliminacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=100)),
+                ('objeto_id', models.BigIntegerField()),
+                ('descripcion', models.CharField(max_length=255)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_CURSO', 'En curso'), ('TERMINADA', 'Terminada'), ('ERROR', 'Error')], default='PENDIENTE', max_length=20)),
+                ('estimado', models.PositiveIntegerField(default=0)),
+                ('borrados', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('creada', models.DateTimeField(auto_now_add=True)),
+                ('terminada', models.DateTimeField(blank=True, null=True)),
+                ('solicitada_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'eliminacion',
+                'indexes': [models.Index(fields=['estado'], name='idx_eliminacion_estado')],
+            },
+        ),
+    ]
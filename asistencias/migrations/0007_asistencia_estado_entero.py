@@ -0,0 +1,73 @@
+# Asistencia.estado: de CharField(20) a entero pequeño (ver EstadoField).
+#
+# Primera parte: la columna nueva (estado_codigo) se llena por rangos de id
+# en lotes, cada uno en su propia transacción (atomic = False), para no
+# bloquear la tabla entera ni generar una única transacción enorme en
+# PostgreSQL. Antes de tocar nada se verifica que todos los valores
+# guardados tengan código: si alguno no lo tiene, la migración falla con la
+# lista y sin cambios.
+#
+# El reemplazo de la columna vieja (que sí destruye datos) está en
+# 0008_asistencia_estado_reemplazo, atómica (también la vuelta atrás).
+
+from django.db import migrations, models, transaction
+from django.db.models import Case, IntegerField, Max, Min, Value, When
+
+CODIGOS = {"Presente": 1, "Ausente": 2, "Tardanza": 3, "Justificado": 4}
+LOTE = 20000
+
+
+def _codigo(valor):
+    """Código de un valor guardado; tolera mayúsculas y espacios ("presente ")."""
+    return CODIGOS.get((valor or "").strip().capitalize())
+
+
+def _valores(Asistencia):
+    return set(Asistencia.objects.order_by().values_list("estado", flat=True).distinct())
+
+
+def verificar(apps, schema_editor):
+    Asistencia = apps.get_model("asistencias", "Asistencia")
+    desconocidos = sorted(repr(v) for v in _valores(Asistencia) if _codigo(v) is None)
+    if desconocidos:
+        raise ValueError(
+            "Asistencia.estado tiene valores sin código: " + ", ".join(desconocidos)
+            + f". Corregirlos a uno de {', '.join(CODIGOS)} antes de migrar."
+        )
+
+
+def _por_lotes(Asistencia, actualizar):
+    rango = Asistencia.objects.aggregate(desde=Min("id"), hasta=Max("id"))
+    if rango["desde"] is None:
+        return
+    for inicio in range(rango["desde"], rango["hasta"] + 1, LOTE):
+        with transaction.atomic():
+            actualizar(Asistencia.objects.filter(id__gte=inicio, id__lt=inicio + LOTE))
+
+
+def a_codigos(apps, schema_editor):
+    Asistencia = apps.get_model("asistencias", "Asistencia")
+    # Un When por valor distinto guardado, no sólo por los cuatro nombres
+    codigo = Case(
+        *[When(estado=valor, then=Value(_codigo(valor))) for valor in _valores(Asistencia)],
+        output_field=IntegerField(),
+    )
+    _por_lotes(Asistencia, lambda qs: qs.update(estado_codigo=codigo))
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('asistencias', '0006_eliminacion_en_segundo_plano'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='asistencia',
+            name='estado_codigo',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.RunPython(a_codigos, migrations.RunPython.noop),
+    ]
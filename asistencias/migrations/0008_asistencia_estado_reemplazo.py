@@ -0,0 +1,69 @@
+# Asistencia.estado: de CharField(20) a entero pequeño, segunda parte.
+#
+# Reemplaza la columna vieja por estado_codigo (ya llenada por
+# 0007_asistencia_estado_entero) en una sola transacción: si algo falla, el
+# esquema y los datos quedan como estaban. Al revertir, la columna vieja
+# vuelve como nullable, se llena desde los códigos y recién después pasa a
+# NOT NULL. Las filas sin código ("sin tomar", ver 0013) se borran: antes de
+# esta serie una clase sin tomar no tenía fila.
+
+import asistencias.models
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+CODIGOS = {"Presente": 1, "Ausente": 2, "Tardanza": 3, "Justificado": 4}
+ESTADOS = [(nombre, nombre) for nombre in CODIGOS]
+
+
+def verificar(apps, schema_editor):
+    Asistencia = apps.get_model("asistencias", "Asistencia")
+    sin_codigo = (
+        Asistencia.objects.filter(estado_codigo__isnull=True)
+        .order_by().values_list("estado", flat=True).distinct()
+    )
+    if sin_codigo:
+        raise RuntimeError(
+            "Asistencias sin estado_codigo (¿cargadas durante la migración?): "
+            + ", ".join(sorted(repr(v) for v in sin_codigo))
+            + ". Completar su estado_codigo antes de seguir."
+        )
+
+
+def a_nombres(apps, schema_editor):
+    Asistencia = apps.get_model("asistencias", "Asistencia")
+    Asistencia.objects.filter(estado_codigo__isnull=True).delete()
+    Asistencia.objects.update(estado=Case(
+        *[When(estado_codigo=cod, then=Value(nombre)) for nombre, cod in CODIGOS.items()],
+        output_field=models.CharField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0007_asistencia_estado_entero'),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='asistencia',
+            name='estado',
+            field=models.CharField(choices=ESTADOS, max_length=20, null=True),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, a_nombres),
+        migrations.RemoveField(
+            model_name='asistencia',
+            name='estado',
+        ),
+        migrations.RenameField(
+            model_name='asistencia',
+            old_name='estado_codigo',
+            new_name='estado',
+        ),
+        migrations.AlterField(
+            model_name='asistencia',
+            name='estado',
+            field=asistencias.models.EstadoField(choices=[('Presente', 'Presente'), ('Ausente', 'Ausente'), ('Tardanza', 'Tardanza'), ('Justificado', 'Justificado')]),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0009_correo_saliente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='sesiones_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
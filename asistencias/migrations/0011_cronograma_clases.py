@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0010_user_sesiones_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('descripcion', models.CharField(blank=True, max_length=200)),
+                ('periodo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feriados', to='asistencias.periodo')),
+            ],
+            options={
+                'db_table': 'feriado',
+                'ordering': ['fecha'],
+                'constraints': [models.UniqueConstraint(fields=('periodo', 'fecha'), name='unique_feriado_periodo_fecha')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HorarioClase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia_semana', models.PositiveSmallIntegerField(choices=[(0, 'Lunes'), (1, 'Martes'), (2, 'Miércoles'), (3, 'Jueves'), (4, 'Viernes'), (5, 'Sábado'), (6, 'Domingo')])),
+                ('hora_inicio', models.TimeField()),
+                ('hora_fin', models.TimeField()),
+                ('curso', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='horarios', to='asistencias.docentemateria')),
+            ],
+            options={
+                'db_table': 'horario_clase',
+                'ordering': ['dia_semana', 'hora_inicio'],
+                'constraints': [models.UniqueConstraint(fields=('curso', 'dia_semana', 'hora_inicio'), name='unique_horario_clase'), models.CheckConstraint(condition=models.Q(('hora_fin__gt', models.F('hora_inicio'))), name='horario_clase_fin_posterior', violation_error_message='La hora de fin debe ser posterior a la de inicio.')],
+            },
+        ),
+    ]
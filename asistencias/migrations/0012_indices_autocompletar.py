@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0011_cronograma_clases'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(django.db.models.functions.text.Upper('apellido'), django.db.models.functions.text.Upper('nombre'), name='idx_alumno_apellido_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(django.db.models.functions.text.Upper('nombre'), name='idx_alumno_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='docente',
+            index=models.Index(django.db.models.functions.text.Upper('apellido'), django.db.models.functions.text.Upper('nombre'), name='idx_docente_apellido_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='materia',
+            index=models.Index(django.db.models.functions.text.Upper('nombre'), name='idx_materia_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='materia',
+            index=models.Index(django.db.models.functions.text.Upper('codigo'), name='idx_materia_codigo'),
+        ),
+    ]
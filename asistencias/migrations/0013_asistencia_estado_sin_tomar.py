@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:28
+
+import asistencias.models
+from django.db import migrations
+
+
+def borrar_sin_tomar(apps, schema_editor):
+    # Antes de esta migración una clase sin tomar no tenía fila
+    Asistencia = apps.get_model("asistencias", "Asistencia")
+    Asistencia.objects.filter(estado__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0012_indices_autocompletar'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asistencia',
+            name='estado',
+            field=asistencias.models.EstadoField(choices=[('Presente', 'Presente'), ('Ausente', 'Ausente'), ('Tardanza', 'Tardanza'), ('Justificado', 'Justificado')], null=True),
+        ),
+        # Al revertir corre antes de volver a NOT NULL
+        migrations.RunPython(migrations.RunPython.noop, borrar_sin_tomar),
+    ]
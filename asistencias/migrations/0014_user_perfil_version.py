@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0013_asistencia_estado_sin_tomar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='perfil_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
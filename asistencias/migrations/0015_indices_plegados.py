@@ -0,0 +1,54 @@
+# Generated by Django 5.2.5 on 2026-10-19 00:49
+
+import asistencias.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0014_user_perfil_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='alumno',
+            name='idx_alumno_apellido_nombre',
+        ),
+        migrations.RemoveIndex(
+            model_name='alumno',
+            name='idx_alumno_nombre',
+        ),
+        migrations.RemoveIndex(
+            model_name='docente',
+            name='idx_docente_apellido_nombre',
+        ),
+        migrations.RemoveIndex(
+            model_name='materia',
+            name='idx_materia_nombre',
+        ),
+        migrations.RemoveIndex(
+            model_name='materia',
+            name='idx_materia_codigo',
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(asistencias.models.Plegado('apellido'), asistencias.models.Plegado('nombre'), name='idx_alumno_apellido_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='alumno',
+            index=models.Index(asistencias.models.Plegado('nombre'), name='idx_alumno_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='docente',
+            index=models.Index(asistencias.models.Plegado('apellido'), asistencias.models.Plegado('nombre'), name='idx_docente_apellido_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='materia',
+            index=models.Index(asistencias.models.Plegado('nombre'), name='idx_materia_nombre'),
+        ),
+        migrations.AddIndex(
+            model_name='materia',
+            index=models.Index(asistencias.models.Plegado('codigo'), name='idx_materia_codigo'),
+        ),
+    ]
@@ -1,6 +1,40 @@
 # asistencias/models.py
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Func
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
+from django.utils.crypto import salted_hmac
+
+
+# ============================================================
+# BÚSQUEDA POR PREFIJO: texto plegado (sin tildes, en mayúsculas)
+# ============================================================
+# UPPER() de SQLite sólo convierte ASCII: las letras con tilde, diéresis y la
+# ñ se reemplazan antes, en la base. Índices y consultas (autocompletar) usan
+# la misma expresión, y `plegar` aplica lo mismo a lo que escribe el usuario.
+_PLIEGUES = {"á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u", "ñ": "n"}
+_PLIEGUES.update({k.upper(): v.upper() for k, v in _PLIEGUES.items()})
+
+
+class Plegado(Func):
+    """
+    UPPER(REPLACE(...)) de un campo: "Muñoz" -> "MUNOZ". Los reemplazos van
+    como literales y no como parámetros: SQLite sólo usa un índice de
+    expresión si la consulta repite la expresión tal cual, constantes incluidas.
+    """
+    arity = 1
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        for origen, destino in _PLIEGUES.items():
+            sql = f"REPLACE({sql}, '{origen}', '{destino}')"
+        return f"UPPER({sql})", params
+
+
+def plegar(texto):
+    """Lo mismo que `Plegado`, en Python (mayúsculas sólo ASCII, como SQLite)."""
+    texto = texto.translate(str.maketrans(_PLIEGUES))
+    return "".join(c.upper() if c.isascii() else c for c in texto)
 
 
 # ============================================================
@@ -36,6 +70,17 @@ class UserManager(BaseUserManager):
 
         return self.create_user(username, email, password, rol="ADMIN", **extra)
 
+    def get_queryset(self):
+        # Usuarios en proceso de borrado: invisibles (y sin login)
+        return super().get_queryset().filter(eliminado=False)
+
+
+class VisiblesManager(models.Manager):
+    """Excluye las filas marcadas para borrar (ver eliminacion.py)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(eliminado=False)
+
 
 # ============================================================
 # USER CUSTOM
@@ -55,6 +100,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Marcado mientras un borrado en segundo plano elimina sus dependencias
+    eliminado = models.BooleanField(default=False, editable=False)
+    # Se incrementa para cerrar todas sus sesiones (ver get_session_auth_hash)
+    sesiones_version = models.PositiveIntegerField(default=0, editable=False)
+    # Se incrementa para que las sesiones relean el perfil (ver perfiles.py)
+    perfil_version = models.PositiveIntegerField(default=0, editable=False)
 
     avatar = models.ImageField(
         upload_to="avatars/",
@@ -78,6 +129,21 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.username} ({self.rol})"
 
+    def _get_session_auth_hash(self, secret=None):
+        """
+        Como el de Django, más `sesiones_version`: al incrementarla ninguna
+        sesión existente valida, sea cual sea el SESSION_ENGINE (también las
+        de cookie firmada, que no se pueden borrar del lado del servidor).
+        Con versión 0 el hash es el estándar (no invalida sesiones previas).
+        """
+        if not self.sesiones_version:
+            return super()._get_session_auth_hash(secret=secret)
+        key_salt = "django.contrib.auth.models.AbstractBaseUser.get_session_auth_hash"
+        return salted_hmac(
+            key_salt, f"{self.password}:{self.sesiones_version}",
+            secret=secret, algorithm="sha256",
+        ).hexdigest()
+
 # ============================================================
 # ALUMNO
 # ============================================================
@@ -90,7 +156,10 @@ class Alumno(models.Model):
     class Meta:
         db_table = "alumno"
         indexes = [
-            models.Index(fields=["dni"], name="idx_alumno_dni")
+            models.Index(fields=["dni"], name="idx_alumno_dni"),
+            # Búsqueda por prefijo (autocompletar): rangos sobre Plegado(...)
+            models.Index(Plegado("apellido"), Plegado("nombre"), name="idx_alumno_apellido_nombre"),
+            models.Index(Plegado("nombre"), name="idx_alumno_nombre"),
         ]
 
     def __str__(self):
@@ -109,7 +178,8 @@ class Docente(models.Model):
     class Meta:
         db_table = "docente"
         indexes = [
-            models.Index(fields=["legajo"], name="idx_docente_legajo")
+            models.Index(fields=["legajo"], name="idx_docente_legajo"),
+            models.Index(Plegado("apellido"), Plegado("nombre"), name="idx_docente_apellido_nombre"),
         ]
 
     def __str__(self):
@@ -122,6 +192,9 @@ class Docente(models.Model):
 class Carrera(models.Model):
     nombre = models.CharField(max_length=200, unique=True)
     codigo = models.CharField(max_length=50, unique=True)
+    eliminado = models.BooleanField(default=False, editable=False)
+
+    objects = VisiblesManager()
 
     class Meta:
         db_table = "carrera"
@@ -137,6 +210,9 @@ class Materia(models.Model):
     nombre = models.CharField(max_length=200)
     carrera = models.ForeignKey(Carrera, on_delete=models.CASCADE)
     codigo = models.CharField(max_length=50)
+    eliminado = models.BooleanField(default=False, editable=False)
+
+    objects = VisiblesManager()
 
     class Meta:
         db_table = "materia"
@@ -146,6 +222,10 @@ class Materia(models.Model):
                 name="unique_materia_carrera"
             )
         ]
+        indexes = [
+            models.Index(Plegado("nombre"), name="idx_materia_nombre"),
+            models.Index(Plegado("codigo"), name="idx_materia_codigo"),
+        ]
 
     def __str__(self):
         return f"{self.nombre} - {self.carrera.codigo}/{self.codigo}"
@@ -200,6 +280,67 @@ class DocenteMateria(models.Model):
         return f"{self.materia} - {self.docente} - {self.periodo_id}"
 
 
+# ============================================================
+# CRONOGRAMA DE CLASES
+# ============================================================
+class HorarioClase(models.Model):
+    """
+    Franja semanal en que se dicta un curso. Con los feriados del periodo
+    define las fechas de clase (ver cronograma.py).
+    """
+    class Dia(models.IntegerChoices):
+        LUNES = 0, "Lunes"
+        MARTES = 1, "Martes"
+        MIERCOLES = 2, "Miércoles"
+        JUEVES = 3, "Jueves"
+        VIERNES = 4, "Viernes"
+        SABADO = 5, "Sábado"
+        DOMINGO = 6, "Domingo"
+
+    curso = models.ForeignKey(DocenteMateria, on_delete=models.CASCADE, related_name="horarios")
+    dia_semana = models.PositiveSmallIntegerField(choices=Dia.choices)
+    hora_inicio = models.TimeField()
+    hora_fin = models.TimeField()
+
+    class Meta:
+        db_table = "horario_clase"
+        ordering = ["dia_semana", "hora_inicio"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["curso", "dia_semana", "hora_inicio"],
+                name="unique_horario_clase"
+            ),
+            models.CheckConstraint(
+                condition=models.Q(hora_fin__gt=models.F("hora_inicio")),
+                name="horario_clase_fin_posterior",
+                violation_error_message="La hora de fin debe ser posterior a la de inicio.",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_dia_semana_display()} {self.hora_inicio:%H:%M}-{self.hora_fin:%H:%M}"
+
+
+class Feriado(models.Model):
+    """Día sin clases en un periodo (feriado, mesa de examen, receso)."""
+    periodo = models.ForeignKey(Periodo, on_delete=models.CASCADE, related_name="feriados")
+    fecha = models.DateField()
+    descripcion = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        db_table = "feriado"
+        ordering = ["fecha"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["periodo", "fecha"],
+                name="unique_feriado_periodo_fecha"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} {self.descripcion}".strip()
+
+
 # ============================================================
 # ALUMNO - MATERIA - PERIODO
 # ============================================================
@@ -209,6 +350,7 @@ class AlumnoMateria(models.Model):
     periodo = models.ForeignKey(Periodo, on_delete=models.CASCADE)
     fecha_inscripcion = models.DateField(auto_now_add=True)
     estado_inscripcion = models.CharField(max_length=50, default="Activo")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "alumno_materia"
@@ -229,22 +371,68 @@ class AlumnoMateria(models.Model):
 # ============================================================
 # ASISTENCIA
 # ============================================================
+class EstadoAsistencia(models.IntegerChoices):
+    """Código guardado en la base para cada estado (no renumerar)."""
+    PRESENTE = 1, "Presente"
+    AUSENTE = 2, "Ausente"
+    TARDANZA = 3, "Tardanza"
+    JUSTIFICADO = 4, "Justificado"
+
+
+_CODIGO_ESTADO = {e.label: e.value for e in EstadoAsistencia}
+
+
+class EstadoField(models.PositiveSmallIntegerField):
+    """
+    Guarda el estado como entero de 2 bytes, pero en Python sigue siendo el
+    nombre ("Presente", "Ausente", ...): filtros como estado="Presente" o
+    estado__in=[...], formularios, plantillas y JSON no cambian.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else EstadoAsistencia(value).label
+
+    def to_python(self, value):
+        if value is None or value in _CODIGO_ESTADO:
+            return value
+        try:
+            return EstadoAsistencia(int(value)).label
+        except (TypeError, ValueError):
+            raise ValidationError(f"Estado desconocido: {value!r}", code="invalid")
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                return _CODIGO_ESTADO[value]
+            except KeyError:
+                raise ValueError(f"Estado desconocido: {value!r}")
+        return int(value)
+
+    @property
+    def validators(self):
+        # Sin los validadores de rango de IntegerField: el valor en Python es el nombre
+        return [*self.default_validators, *self._validators]
+
+
 class Asistencia(models.Model):
-    ESTADOS = (
-        ("Presente", "Presente"),
-        ("Ausente", "Ausente"),
-        ("Tardanza", "Tardanza"),
-        ("Justificado", "Justificado"),
-    )
+    ESTADOS = tuple((e.label, e.label) for e in EstadoAsistencia)
 
     alumno_materia = models.ForeignKey(AlumnoMateria, on_delete=models.CASCADE)
     fecha = models.DateField()
-    estado = models.CharField(max_length=20, choices=ESTADOS)
+    # NULL: fila precargada por el cronograma (cronograma.precargar), todavía
+    # sin tomar. No cuenta en los porcentajes hasta que alguien la marca.
+    estado = EstadoField(choices=ESTADOS, null=True)
 
     justificativo_path = models.CharField(max_length=255, null=True, blank=True)
     validado_por = models.ForeignKey(Docente, null=True, blank=True, on_delete=models.SET_NULL)
     validado_fecha = models.DateTimeField(null=True, blank=True)
     observaciones = models.TextField(null=True, blank=True)
+    # Control de concurrencia optimista: se incrementa en cada modificación
+    version = models.PositiveIntegerField(default=0)
+    # Las escrituras masivas (.update / upserts) deben setearlo explícitamente
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "asistencia"
@@ -257,11 +445,131 @@ class Asistencia(models.Model):
         indexes = [
             models.Index(fields=["fecha"], name="idx_asistencia_fecha"),
             models.Index(fields=["alumno_materia"], name="idx_asistencia_alumno_materia"),
+            models.Index(fields=["updated_at", "id"], name="idx_asistencia_updated"),
         ]
 
     def __str__(self):
         return f"{self.alumno_materia} - {self.fecha} ({self.estado})"
 
+    def save(self, *args, **kwargs):
+        # Toda modificación por save() invalida la versión que tenga el cliente
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version", "updated_at"}
+        super().save(*args, **kwargs)
+
     @property
     def cuenta_como_presente(self):
         return self.estado in ("Presente", "Justificado")
+
+
+# ============================================================
+# SINCRONIZACIÓN OFFLINE: claves de idempotencia
+# ============================================================
+class OperacionSync(models.Model):
+    """
+    Registro de cada operación recibida por la API de sincronización.
+    Un reintento con la misma `clave` devuelve el resultado guardado
+    en lugar de volver a aplicarse.
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE)
+    clave = models.CharField(max_length=64)
+    resultado = models.CharField(max_length=10)  # "ok" / "err"
+    version = models.PositiveIntegerField(null=True, blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "operacion_sync"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["usuario", "clave"],
+                name="unique_operacion_sync_clave"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["creado"], name="idx_operacion_sync_creado"),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id}:{self.clave} ({self.resultado})"
+
+
+# ============================================================
+# BORRADOS EN SEGUNDO PLANO
+# ============================================================
+class Eliminacion(models.Model):
+    """
+    Borrado en cascada de una Carrera, Materia o User, por lotes.
+    Mientras está pendiente el objeto queda marcado `eliminado=True`.
+    """
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        EN_CURSO = "EN_CURSO", "En curso"
+        TERMINADA = "TERMINADA", "Terminada"
+        ERROR = "ERROR", "Error"
+
+    modelo = models.CharField(max_length=100)  # app_label.model
+    objeto_id = models.BigIntegerField()
+    descripcion = models.CharField(max_length=255)
+    solicitada_por = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    estado = models.CharField(max_length=20, choices=Estado.choices, default=Estado.PENDIENTE)
+    estimado = models.PositiveIntegerField(default=0)
+    borrados = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    creada = models.DateTimeField(auto_now_add=True)
+    terminada = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "eliminacion"
+        indexes = [
+            models.Index(fields=["estado"], name="idx_eliminacion_estado"),
+        ]
+
+    def __str__(self):
+        return f"{self.descripcion} ({self.get_estado_display()})"
+
+    @property
+    def progreso(self):
+        if self.estado == self.Estado.TERMINADA:
+            return 100
+        return min(99, int(self.borrados * 100 / self.estimado)) if self.estimado else 0
+
+
+# ============================================================
+# CORREO SALIENTE (outbox)
+# ============================================================
+class CorreoSaliente(models.Model):
+    """
+    Mensaje encolado por el backend de correo de la app: el request sólo
+    inserta la fila y el envío real lo hace el worker (ver correo.py).
+    """
+    class Estado(models.TextChoices):
+        PENDIENTE = "PENDIENTE", "Pendiente"
+        ENVIANDO = "ENVIANDO", "Enviando"
+        ENVIADO = "ENVIADO", "Enviado"
+        ERROR = "ERROR", "Error"
+
+    remitente = models.CharField(max_length=255)
+    para = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    asunto = models.CharField(max_length=255)
+    cuerpo = models.TextField()
+    html = models.TextField(blank=True)
+    encabezados = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=20, choices=Estado.choices, default=Estado.PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField()
+    error = models.TextField(blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    enviado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "correo_saliente"
+        indexes = [
+            models.Index(fields=["estado", "proximo_intento"], name="idx_correo_pendientes"),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} → {', '.join(self.para)} ({self.get_estado_display()})"
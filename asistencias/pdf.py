@@ -0,0 +1,122 @@
+# asistencias/pdf.py
+"""
+Reportes PDF (reportlab): reporte de asistencia por curso y constancia de
+asistencia por alumno.
+
+Igual que exports.py, este módulo importa reportlab a nivel de módulo y sólo
+se importa dentro de la rama de exportación o desde el proceso batch
+(`manage.py generar_pdfs_periodo`).
+
+`destino` puede ser una ruta o un objeto tipo archivo: el batch escribe
+directo a disco para no acumular PDFs en memoria.
+
+Paragraph interpreta marcado (<b>, &amp;...): todo dato cargado por usuarios
+que va en un Paragraph pasa por `escape`. Las celdas de tabla con texto
+plano se dibujan tal cual y no hace falta.
+"""
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+LOGO = BASE_DIR / "static" / "img" / "siga_logo.png"
+
+_estilos = getSampleStyleSheet()
+
+_ESTILO_TABLA = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#111827")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 9),
+    ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#CCCCCC")),
+    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F6F7F9")]),
+])
+
+
+def _encabezado(titulo, subtitulo):
+    partes = []
+    if LOGO.exists():
+        partes.append(Image(str(LOGO), width=2.2 * cm, height=2.2 * cm, hAlign="LEFT"))
+    partes += [
+        Paragraph(escape(getattr(settings, "INSTITUTO_NOMBRE", "SIGA")), _estilos["Normal"]),
+        Paragraph(escape(titulo), _estilos["Title"]),
+        Paragraph(escape(subtitulo), _estilos["Normal"]),
+        Spacer(1, 0.5 * cm),
+    ]
+    return partes
+
+
+def _pie(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.drawString(2 * cm, 1.2 * cm, f"Generado por SIGA el {timezone.localtime():%d/%m/%Y %H:%M}")
+    canvas.drawRightString(A4[0] - 2 * cm, 1.2 * cm, f"Página {doc.page}")
+    canvas.restoreState()
+
+
+def _construir(destino, partes, titulo):
+    if isinstance(destino, Path):
+        destino = str(destino)
+    doc = SimpleDocTemplate(
+        destino, pagesize=A4, title=titulo,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=1.5 * cm, bottomMargin=2 * cm,
+    )
+    doc.build(partes, onFirstPage=_pie, onLaterPages=_pie)
+
+
+def pdf_reporte_curso(curso, datos, destino):
+    """Reporte de asistencia de un curso (DocenteMateria) con una fila por alumno."""
+    titulo = f"Reporte de Asistencia — {curso.materia.nombre}"
+    partes = _encabezado(titulo, f"Periodo {curso.periodo.nombre} — Docente: {curso.docente}")
+
+    filas = [["Alumno", "Total", "Presentes", "Justificados", "Ausentes", "% Asistencia"]]
+    for d in datos:
+        filas.append([
+            str(d["alumno"]), d["total"], d["presentes"], d["justificados"],
+            d["ausentes"], f'{d["porcentaje"]:.2f}%',
+        ])
+    tabla = Table(filas, repeatRows=1, colWidths=[6.5 * cm] + [2.1 * cm] * 5)
+    tabla.setStyle(_ESTILO_TABLA)
+    partes += [tabla, Spacer(1, 0.4 * cm), Paragraph(f"Total alumnos: {len(datos)}", _estilos["Normal"])]
+    _construir(destino, partes, titulo)
+
+
+def pdf_constancia(alumno, periodo, datos, destino):
+    """Constancia de asistencia de un alumno para todas sus materias de un periodo."""
+    titulo = "Constancia de Asistencia"
+    partes = _encabezado(titulo, f"Periodo {periodo.nombre}")
+    partes.append(Paragraph(
+        f"Se deja constancia de que <b>{escape(alumno.apellido)}, {escape(alumno.nombre)}</b> "
+        f"(DNI {alumno.dni}) registra la siguiente asistencia en las materias cursadas "
+        f"durante el periodo {escape(periodo.nombre)}:",
+        _estilos["Normal"],
+    ))
+    partes.append(Spacer(1, 0.4 * cm))
+
+    filas = [["Materia", "Clases", "Presentes", "Justificados", "Ausentes", "% Asistencia"]]
+    for d in datos:
+        filas.append([
+            d["materia"].nombre, d["total"], d["presentes"], d["justificados"],
+            d["ausentes"], f'{d["porcentaje"]:.2f}%',
+        ])
+    tabla = Table(filas, repeatRows=1, colWidths=[6.5 * cm] + [2.1 * cm] * 5)
+    tabla.setStyle(_ESTILO_TABLA)
+    partes += [
+        tabla,
+        Spacer(1, 0.8 * cm),
+        Paragraph(
+            f"Emitida el {timezone.localdate():%d/%m/%Y} a pedido del interesado.",
+            _estilos["Normal"],
+        ),
+    ]
+    _construir(destino, partes, titulo)
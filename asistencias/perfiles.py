@@ -0,0 +1,105 @@
+# asistencias/perfiles.py
+"""
+Perfil del rol (Docente / Alumno) resuelto una vez por request.
+
+`PerfilMiddleware` deja en `request.profile` el Docente o Alumno del usuario
+(None para ADMIN o sin perfil) y lo precarga en `request.user.docente` /
+`request.user.alumno`, así permisos, vistas y templates no vuelven a
+consultarlo.
+
+El perfil se guarda en la sesión como una foto de sus campos junto con
+`User.perfil_version`. `invalidar_perfil(user)` incrementa la columna (al
+editar el perfil, el usuario o su rol) y el próximo request de cualquiera
+de sus sesiones, en cualquier worker o instancia, lo vuelve a leer con una
+consulta. La versión viaja en la fila del User que la autenticación ya
+trae: con la foto vigente, autenticación + perfil es una sola consulta.
+
+`con_docente` / `con_alumno` inyectan el perfil como segundo argumento de
+la vista (404 si el usuario no lo tiene), igual que el get_object_or_404
+que reemplazan.
+"""
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.db.models import F
+from django.http import Http404
+
+from .models import Alumno, Docente, User
+
+SESION_PERFIL = "_perfil"
+PERFILES = {User.Rol.DOCENTE: Docente, User.Rol.ALUMNO: Alumno}
+
+
+def invalidar_perfil(user):
+    """Fuerza a releer el perfil en todas las sesiones del usuario."""
+    user_id = getattr(user, "pk", user)
+    User.objects.filter(pk=user_id).update(perfil_version=F("perfil_version") + 1)
+
+
+def _precargar(user, perfil):
+    """Deja user.docente / user.alumno en la caché de relaciones del User."""
+    for rol, modelo in PERFILES.items():
+        rel = User._meta.get_field(modelo._meta.model_name)
+        rel.set_cached_value(user, perfil if isinstance(perfil, modelo) else None)
+    if perfil is not None:
+        type(perfil).user.field.set_cached_value(perfil, user)
+
+
+def perfil_de(request):
+    """Docente / Alumno de request.user (o None), con la foto de la sesión."""
+    user = request.user
+    modelo = PERFILES.get(getattr(user, "rol", None)) if user.is_authenticated else None
+    if modelo is None:
+        if user.is_authenticated:
+            _precargar(user, None)
+        return None
+
+    version = user.perfil_version
+    foto = request.session.get(SESION_PERFIL)
+    campos = [f.attname for f in modelo._meta.concrete_fields]
+    if (
+        foto
+        and foto.get("v") == version
+        and foto.get("uid") == user.pk
+        and foto.get("modelo") == modelo._meta.label_lower
+    ):
+        perfil = modelo.from_db(None, campos, [foto["datos"][c] for c in campos])
+    else:
+        perfil = modelo.objects.filter(user_id=user.pk).first()
+        if perfil is not None:
+            request.session[SESION_PERFIL] = {
+                "v": version,
+                "uid": user.pk,
+                "modelo": modelo._meta.label_lower,
+                "datos": {c: getattr(perfil, c) for c in campos},
+            }
+    _precargar(user, perfil)
+    return perfil
+
+
+# ------------------------------------------------------------
+# Decoradores
+# ------------------------------------------------------------
+def _con_perfil(modelo):
+    def decorador(view):
+        def _perfil(request):
+            perfil = getattr(request, "profile", None)
+            if not isinstance(perfil, modelo):
+                raise Http404(f"No hay un {modelo._meta.verbose_name} asociado al usuario.")
+            return perfil
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def _async_view(request, *args, **kwargs):
+                return await view(request, _perfil(request), *args, **kwargs)
+            return _async_view
+
+        @wraps(view)
+        def _view(request, *args, **kwargs):
+            return view(request, _perfil(request), *args, **kwargs)
+        return _view
+    return decorador
+
+
+con_docente = _con_perfil(Docente)
+con_alumno = _con_perfil(Alumno)
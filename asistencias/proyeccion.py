@@ -0,0 +1,152 @@
+# asistencias/proyeccion.py
+"""
+Proyección del porcentaje final de asistencia ("en riesgo pronto").
+
+Para todas las inscripciones de un periodo a la vez, con arreglos de NumPy:
+
+- Clases restantes del curso (materia + periodo): si tiene cronograma
+  (HorarioClase), las fechas de clase que quedan desde la próxima clase (hoy
+  o el día siguiente al último registro), sin feriados. Si no, los días de
+  la semana en que ya se tomó asistencia marcan la cursada; se cuentan esos
+  días entre la próxima clase y periodo.fecha_fin con np.busday_count,
+  agrupando cursos por día(s) de clase.
+- Tendencia del alumno: proporción de asistencias en sus últimas
+  ULTIMAS_CLASES clases (o en todas, si todavía tiene menos).
+- Proyectado = (asistidas + restantes × tendencia) / (registradas + restantes).
+- Faltas disponibles: cuántas de las clases restantes puede faltar y
+  terminar con al menos UMBRAL %. Negativo: ya no llega aunque asista a todas.
+
+El resultado se guarda en el cache de Django por periodo y por día: el
+"en riesgo ahora" de las vistas sigue siendo en vivo.
+
+Como analitica.py, importa numpy a nivel de módulo: las vistas lo importan
+dentro de un try/except ImportError.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .cronograma import fechas_por_materia
+from .models import Asistencia, EstadoAsistencia, Periodo
+
+UMBRAL = 75
+ULTIMAS_CLASES = 6
+MARGEN_FALTAS = 1  # con esta cantidad de faltas disponibles o menos, ya es "pronto"
+CACHE_TTL = 60 * 60 * 24
+
+_OK = (EstadoAsistencia.PRESENTE, EstadoAsistencia.JUSTIFICADO)
+
+
+@dataclass(frozen=True)
+class Proyeccion:
+    porcentaje: float       # actual
+    proyectado: float       # al final del periodo
+    restantes: int          # clases que quedan en el curso
+    faltas_disponibles: int
+
+    @property
+    def en_riesgo(self):
+        return self.porcentaje < UMBRAL
+
+    @property
+    def en_riesgo_pronto(self):
+        return not self.en_riesgo and self.restantes > 0 and (
+            self.proyectado < UMBRAL or self.faltas_disponibles <= MARGEN_FALTAS
+        )
+
+
+def _cache_key(periodo_id, hoy):
+    return f"proyeccion:{periodo_id}:{hoy.isoformat()}"
+
+
+def _calcular(periodo, hoy):
+    filas = list(
+        Asistencia.objects
+        .filter(alumno_materia__periodo_id=periodo.id, estado__isnull=False)
+        .annotate(codigo=Cast("estado", IntegerField()))
+        .order_by("alumno_materia_id", "fecha")
+        .values_list("alumno_materia_id", "alumno_materia__materia_id", "fecha", "codigo")
+    )
+    if not filas:
+        return {}
+    am, materia, fecha, codigo = zip(*filas)
+    am = np.array(am, dtype=np.int64)
+    fecha = np.array(fecha, dtype="datetime64[D]")
+    ok = np.isin(np.array(codigo, dtype=np.int8), _OK)
+
+    # Inscripciones: códigos densos (filas ya ordenadas por am, fecha)
+    ams, inicio, am_cod = np.unique(am, return_index=True, return_inverse=True)
+    total = np.bincount(am_cod)
+    asistidas = np.bincount(am_cod, weights=ok)
+
+    # Tendencia: las últimas ULTIMAS_CLASES filas de cada inscripción
+    fin = inicio + total
+    desde_el_final = fin[am_cod] - np.arange(am.size)
+    recientes = desde_el_final <= ULTIMAS_CLASES
+    tendencia = (
+        np.bincount(am_cod, weights=ok & recientes, minlength=ams.size)
+        / np.bincount(am_cod, weights=recientes, minlength=ams.size)
+    )
+
+    # Cursos: días de clase y último registro
+    materias, curso_cod = np.unique(np.array(materia, dtype=np.int64), return_inverse=True)
+    dia = (fecha.astype(np.int64) + 3) % 7  # 0 = lunes
+    dias_clase = np.zeros((materias.size, 7), dtype=bool)
+    dias_clase[curso_cod, dia] = True
+    ultima = np.full(materias.size, np.datetime64("1970-01-01"), dtype="datetime64[D]")
+    np.maximum.at(ultima, curso_cod, fecha)
+
+    desde = np.maximum(ultima + 1, np.datetime64(hoy, "D"))
+    hasta = np.datetime64(periodo.fecha_fin, "D") + 1
+    restantes_curso = np.zeros(materias.size, dtype=np.int64)
+    mascaras, grupo = np.unique(dias_clase, axis=0, return_inverse=True)
+    for g, mascara in enumerate(mascaras):
+        sel = grupo.ravel() == g
+        restantes_curso[sel] = np.busday_count(
+            desde[sel], np.maximum(desde[sel], hasta), weekmask=mascara
+        )
+    # Cronograma cargado: reemplaza la inferencia por días de la semana
+    for m, fechas in fechas_por_materia(periodo, desde=hoy).items():
+        i = np.searchsorted(materias, m)
+        if i < materias.size and materias[i] == m:
+            fechas = np.array(fechas, dtype="datetime64[D]")
+            restantes_curso[i] = fechas.size - np.searchsorted(fechas, desde[i])
+
+    restantes = restantes_curso[curso_cod[inicio]]
+    porcentaje = asistidas / total * 100
+    proyectado = (asistidas + restantes * tendencia) / (total + restantes) * 100
+    faltas = np.floor(asistidas + restantes - UMBRAL / 100 * (total + restantes)).astype(np.int64)
+
+    return {
+        int(a): Proyeccion(round(float(p), 2), round(float(pr), 2), int(r), int(f))
+        for a, p, pr, r, f in zip(ams, porcentaje, proyectado, restantes, faltas)
+    }
+
+
+def proyecciones(periodo_id):
+    """{alumno_materia_id: Proyeccion} de un periodo, calculado una vez por día."""
+    hoy = timezone.localdate()
+    key = _cache_key(periodo_id, hoy)
+    datos = cache.get(key)
+    if datos is None:
+        periodo = Periodo.objects.filter(id=periodo_id).first()
+        datos = _calcular(periodo, hoy) if periodo else {}
+        cache.set(key, datos, CACHE_TTL)
+    return datos
+
+
+def proyecciones_de(cursadas):
+    """{alumno_materia_id: Proyeccion} para un iterable de AlumnoMateria."""
+    cursadas = list(cursadas)
+    por_periodo = {}
+    for periodo_id in {am.periodo_id for am in cursadas}:
+        por_periodo[periodo_id] = proyecciones(periodo_id)
+    return {
+        am.id: por_periodo[am.periodo_id][am.id]
+        for am in cursadas
+        if am.id in por_periodo[am.periodo_id]
+    }
@@ -0,0 +1,192 @@
+# asistencias/registro.py
+"""
+Logging sin bloquear los requests.
+
+- `ColaJsonHandler` es un QueueHandler: el hilo del request sólo arma el
+  registro y lo deja en una cola en memoria; un QueueListener en su propio
+  hilo lo escribe como una línea JSON en un RotatingFileHandler (LOG_DIR,
+  rotación por tamaño). El listener arranca en el primer registro de cada
+  proceso (sobrevive a los fork de gunicorn) y se detiene con atexit. Si el
+  archivo no se puede abrir (disco de sólo lectura, sin permisos) escribe
+  las mismas líneas a stderr: loguear nunca hace fallar un request.
+- `RegistroMiddleware` asigna un request id (el de X-Request-ID si viene, o
+  uno nuevo, que se devuelve en la respuesta) y deja en un contextvar el id,
+  el rol del usuario y el nombre de la vista: `ContextoFilter` los agrega a
+  cada registro en el hilo que loguea.
+- `registrar_evento(evento, **datos)` es para los caminos calientes
+  (guardado de asistencia, exportaciones, logins, cada request): se muestrea
+  ANTES de crear el registro, con la tasa de LOG_MUESTREO[evento]
+  (1 = todos, 0 = ninguno).
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+
+logger_eventos = logging.getLogger("asistencias.eventos")
+
+_contexto = ContextVar("registro_contexto", default=None)
+
+# Atributos estándar de LogRecord: el resto son `extra`
+_ESTANDAR = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_formato_excepcion = logging.Formatter()
+
+
+# ------------------------------------------------------------
+# Formato y contexto
+# ------------------------------------------------------------
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los `extra` como claves propias."""
+
+    def format(self, record):
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ESTANDAR and not clave.startswith("_"):
+                datos[clave] = valor
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class ContextoFilter(logging.Filter):
+    """Agrega request_id, rol y vista del request en curso (si hay uno)."""
+
+    def filter(self, record):
+        ctx = _contexto.get()
+        if ctx:
+            for clave in ("request_id", "rol", "vista"):
+                if not hasattr(record, clave):
+                    setattr(record, clave, ctx.get(clave))
+        return True
+
+
+# ------------------------------------------------------------
+# Handler con cola
+# ------------------------------------------------------------
+class ColaJsonHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que escribe, desde un QueueListener, a un archivo JSON lines
+    rotado por tamaño. Se configura desde LOGGING como cualquier handler:
+    filename, maxBytes, backupCount.
+    """
+
+    def __init__(self, filename, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"):
+        super().__init__(queue.SimpleQueue())
+        self._destino = dict(filename=filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self._listener = None
+        self._pid = None
+        self.addFilter(ContextoFilter())
+
+    def _iniciar(self):
+        try:
+            Path(self._destino["filename"]).parent.mkdir(parents=True, exist_ok=True)
+            # Se abre ya (sin delay) para que el error salga acá y no en el listener
+            destino = logging.handlers.RotatingFileHandler(**self._destino)
+        except OSError:
+            destino = logging.StreamHandler(sys.stderr)
+        destino.setFormatter(JsonFormatter())
+        self._listener = logging.handlers.QueueListener(self.queue, destino, respect_handler_level=False)
+        self._listener.start()
+        self._pid = os.getpid()
+        atexit.register(self._detener)
+
+    def _detener(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()  # vacía la cola antes de terminar
+            self._listener = None
+
+    def prepare(self, record):
+        # Mensaje y traceback se resuelven acá (hilo del request): args y
+        # exc_info pueden no ser seguros de usar desde otro hilo
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.excepcion = _formato_excepcion.formatException(record.exc_info)
+        record.exc_info = record.exc_text = record.stack_info = None
+        return record
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            # Primer registro del proceso (o de un hijo tras fork)
+            self._listener = None
+            self._iniciar()
+        super().emit(record)
+
+    def close(self):
+        self._detener()
+        super().close()
+
+
+# ------------------------------------------------------------
+# Eventos muestreados
+# ------------------------------------------------------------
+def _tasa(evento):
+    return getattr(settings, "LOG_MUESTREO", {}).get(evento, 1.0)
+
+
+def registrar_evento(evento, nivel=logging.INFO, **datos):
+    """Registra `evento` con sus datos, según la tasa de muestreo configurada."""
+    tasa = _tasa(evento)
+    if tasa <= 0 or (tasa < 1 and random.random() >= tasa):
+        return
+    if logger_eventos.isEnabledFor(nivel):
+        logger_eventos.log(nivel, evento, extra={"evento": evento, "muestreo": tasa, **datos})
+
+
+# ------------------------------------------------------------
+# Middleware
+# ------------------------------------------------------------
+class RegistroMiddleware:
+    """
+    Request id + contexto de logging por request. Va después de
+    PerfilMiddleware (el usuario ya está cargado: leer el rol no consulta).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = (request.headers.get("X-Request-ID") or "")[:64] or uuid.uuid4().hex
+        request.request_id = request_id
+        rol = "anonimo"
+        if hasattr(request, "session") and request.session.get(SESSION_KEY):
+            rol = getattr(request.user, "rol", None) or "sin_rol"
+        ctx = {"request_id": request_id, "rol": rol, "vista": None}
+        token = _contexto.set(ctx)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            registrar_evento(
+                "request",
+                metodo=request.method,
+                ruta=request.path,
+                estado=response.status_code,
+                ms=round((time.perf_counter() - t0) * 1000, 1),
+            )
+            response["X-Request-ID"] = request_id
+            return response
+        finally:
+            _contexto.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        ctx = _contexto.get()
+        if ctx is not None and request.resolver_match:
+            ctx["vista"] = request.resolver_match.view_name
@@ -0,0 +1,336 @@
+# asistencias/respaldos.py
+"""
+Respaldo y restauración por streaming de los modelos de la app.
+
+A diferencia de dumpdata/loaddata, nunca se carga una tabla entera en
+memoria:
+
+- `respaldar()` recorre cada modelo en orden de pk con paginación por keyset
+  (`pk > último` de a LOTE filas) y escribe un archivo por modelo, NDJSON o
+  CSV, comprimido (gzip / bz2 / xz). Un manifest.json guarda, por modelo,
+  campos, filas, bytes y el sha256 del archivo.
+- Incremental: `desde_id` toma las filas con pk mayor; `desde_fecha`, las
+  modificadas (updated_at) o con fecha / creación posterior. Los modelos sin
+  ninguno de esos campos (tablas chicas) van completos.
+- `restaurar()` verifica los checksums antes de tocar la base y carga cada
+  archivo con bulk_create de a LOTE filas como upsert por pk (un incremental
+  se puede aplicar sobre una copia anterior), en una sola transacción y con
+  las restricciones diferidas, como loaddata. Al final ajusta las
+  secuencias.
+
+Los campos auto_now / auto_now_add conservan el valor respaldado. Las
+tablas intermedias de los M2M (User.groups, User.user_permissions) van
+como un modelo más; apuntan por id a Group y Permission de django.contrib.auth,
+que no se respaldan: tienen que existir con los mismos ids en la base
+destino (si no, la verificación de FKs del final aborta la restauración).
+"""
+import bz2
+import csv
+import gzip
+import hashlib
+import json
+import lzma
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.color import no_style
+from django.core.serializers import sort_dependencies
+from django.db import connection, models, transaction
+
+LOTE = 5000
+FORMATO = 1
+NULO_CSV = r"\N"  # como COPY de PostgreSQL: distingue NULL de ""
+CAMPOS_FECHA = ("updated_at", "fecha", "creado", "creada", "created_at")
+
+COMPRESIONES = {
+    "gzip": (".gz", gzip.open),
+    "bz2": (".bz2", bz2.open),
+    "xz": (".xz", lzma.open),
+    "ninguna": ("", open),
+}
+
+
+class ErrorRespaldo(Exception):
+    pass
+
+
+def carpeta_respaldos():
+    return Path(getattr(settings, "BACKUPS_DIR", Path(settings.BASE_DIR) / "backups"))
+
+
+def modelos(nombres=None):
+    """
+    Modelos de la app en orden de dependencias (padres primero), incluidas
+    las tablas intermedias de los M2M.
+    """
+    app = apps.get_app_config("asistencias")
+    # Con None, sort_dependencies usa get_models() y deja afuera las intermedias
+    ordenados = sort_dependencies([(app, list(app.get_models(include_auto_created=True)))], allow_cycles=True)
+    if nombres:
+        pedidos = {n.lower() for n in nombres}
+        desconocidos = pedidos - {m._meta.model_name for m in ordenados}
+        if desconocidos:
+            raise ErrorRespaldo(f"Modelos desconocidos: {', '.join(sorted(desconocidos))}")
+        ordenados = [m for m in ordenados if m._meta.model_name in pedidos]
+    return ordenados
+
+
+def _sha256(ruta):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------
+# Respaldo
+# ------------------------------------------------------------
+def _a_texto(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return valor
+
+
+def _filtro_incremental(model, desde_id, desde_fecha):
+    filtro = {}
+    if desde_id is not None:
+        filtro["pk__gt"] = desde_id
+    if desde_fecha is not None:
+        nombres = {f.name for f in model._meta.concrete_fields}
+        campo = next((c for c in CAMPOS_FECHA if c in nombres), None)
+        if campo:
+            es_fecha_hora = isinstance(model._meta.get_field(campo), models.DateTimeField)
+            filtro[f"{campo}__date__gte" if es_fecha_hora else f"{campo}__gte"] = desde_fecha
+    return filtro
+
+
+def _filas(model, campos, filtro):
+    """Genera las filas (tuplas) en orden de pk, de a LOTE por consulta."""
+    qs = model._base_manager.filter(**filtro).order_by("pk")
+    pk = model._meta.pk.attname
+    ultimo = None
+    while True:
+        lote_qs = qs if ultimo is None else qs.filter(pk__gt=ultimo)
+        lote = list(lote_qs.values_list(*campos)[:LOTE])
+        if not lote:
+            return
+        yield from lote
+        ultimo = lote[-1][campos.index(pk)]
+
+
+def _escribir(model, ruta, formato, abrir, filtro):
+    campos = [f.attname for f in model._meta.concrete_fields]
+    json_campos = {i for i, f in enumerate(model._meta.concrete_fields) if isinstance(f, models.JSONField)}
+    n = 0
+    with abrir(ruta, "wt", encoding="utf-8", newline="") as f:
+        if formato == "csv":
+            w = csv.writer(f)
+            w.writerow(campos)
+            for fila in _filas(model, campos, filtro):
+                w.writerow([
+                    NULO_CSV if v is None else json.dumps(v) if i in json_campos else _a_texto(v)
+                    for i, v in enumerate(fila)
+                ])
+                n += 1
+        else:
+            f.write(json.dumps({"modelo": model._meta.label_lower, "campos": campos}) + "\n")
+            for fila in _filas(model, campos, filtro):
+                f.write(json.dumps([_a_texto(v) for v in fila], ensure_ascii=False) + "\n")
+                n += 1
+    return campos, n
+
+
+def respaldar(formato="ndjson", compresion="gzip", desde_id=None, desde_fecha=None,
+              nombres=None, destino=None, informar=None):
+    """
+    Escribe un respaldo en una carpeta nueva dentro de backups/ y devuelve
+    la ruta del manifest. `informar(modelo, filas, bytes, segundos)` se
+    llama al terminar cada modelo.
+    """
+    if formato not in ("ndjson", "csv"):
+        raise ErrorRespaldo("Formato inválido (ndjson o csv).")
+    sufijo, abrir = COMPRESIONES[compresion]
+    carpeta = Path(destino) if destino else carpeta_respaldos() / time.strftime("%Y%m%d-%H%M%S")
+    carpeta.mkdir(parents=True, exist_ok=False)
+
+    manifest = {
+        "formato_respaldo": FORMATO,
+        "formato": formato,
+        "compresion": compresion,
+        "creado": datetime.now().isoformat(timespec="seconds"),
+        "incremental": {"desde_id": desde_id, "desde_fecha": desde_fecha and desde_fecha.isoformat()},
+        "modelos": [],
+    }
+    for model in modelos(nombres):
+        t0 = time.perf_counter()
+        ruta = carpeta / f"{model._meta.label_lower}.{formato}{sufijo}"
+        campos, filas = _escribir(model, ruta, formato, abrir, _filtro_incremental(model, desde_id, desde_fecha))
+        tam = ruta.stat().st_size
+        manifest["modelos"].append({
+            "modelo": model._meta.label_lower,
+            "archivo": ruta.name,
+            "campos": campos,
+            "filas": filas,
+            "bytes": tam,
+            "sha256": _sha256(ruta),
+        })
+        if informar:
+            informar(model._meta.label_lower, filas, tam, time.perf_counter() - t0)
+
+    ruta_manifest = carpeta / "manifest.json"
+    ruta_manifest.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    return ruta_manifest
+
+
+# ------------------------------------------------------------
+# Restauración
+# ------------------------------------------------------------
+def leer_manifest(ruta):
+    ruta = Path(ruta)
+    if ruta.is_dir():
+        ruta = ruta / "manifest.json"
+    if not ruta.exists():
+        raise ErrorRespaldo(f"No se encontró {ruta}.")
+    manifest = json.loads(ruta.read_text(encoding="utf-8"))
+    if manifest.get("formato_respaldo") != FORMATO:
+        raise ErrorRespaldo("Versión de respaldo no soportada.")
+    return ruta.parent, manifest
+
+
+def verificar(carpeta, manifest):
+    """Lista de archivos cuyo sha256 no coincide (o faltan)."""
+    errores = []
+    for m in manifest["modelos"]:
+        ruta = carpeta / m["archivo"]
+        if not ruta.exists():
+            errores.append(f"{m['archivo']}: falta")
+        elif _sha256(ruta) != m["sha256"]:
+            errores.append(f"{m['archivo']}: checksum distinto")
+    return errores
+
+
+@contextmanager
+def _conservar_fechas(model):
+    """Desactiva auto_now / auto_now_add mientras se restaura el modelo."""
+    campos = [
+        f for f in model._meta.concrete_fields
+        if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+    ]
+    previos = [(f, f.auto_now, f.auto_now_add) for f in campos]
+    for f in campos:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in previos:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+def _leer(ruta, formato, abrir, campos):
+    with abrir(ruta, "rt", encoding="utf-8", newline="") as f:
+        if formato == "csv":
+            r = csv.reader(f)
+            if next(r) != campos:
+                raise ErrorRespaldo(f"{ruta.name}: encabezado distinto del manifest.")
+            for fila in r:
+                yield [None if v == NULO_CSV else v for v in fila]
+        else:
+            encabezado = json.loads(f.readline())
+            if encabezado["campos"] != campos:
+                raise ErrorRespaldo(f"{ruta.name}: encabezado distinto del manifest.")
+            for linea in f:
+                yield json.loads(linea)
+
+
+def _cargar(model, filas, campos, formato):
+    por_attname = {f.attname: f for f in model._meta.concrete_fields}
+    faltan = set(campos) - set(por_attname)
+    if faltan:
+        raise ErrorRespaldo(f"{model._meta.label_lower}: campos inexistentes {sorted(faltan)}.")
+    convertir = []
+    for c in campos:
+        f = por_attname[c]
+        if isinstance(f, models.JSONField):
+            convertir.append((lambda v: json.loads(v)) if formato == "csv" else (lambda v: v))
+        else:
+            convertir.append(f.to_python)
+    actualizar = [f.name for f in model._meta.concrete_fields if not f.primary_key]
+
+    n = 0
+    lote = []
+
+    def _volcar():
+        model._base_manager.bulk_create(
+            lote, batch_size=LOTE,
+            update_conflicts=bool(actualizar),
+            unique_fields=[model._meta.pk.name] if actualizar else None,
+            update_fields=actualizar or None,
+        )
+
+    for fila in filas:
+        lote.append(model(**{
+            c: (None if v is None else conv(v)) for c, conv, v in zip(campos, convertir, fila)
+        }))
+        if len(lote) >= LOTE:
+            _volcar()
+            n += len(lote)
+            lote = []
+    if lote:
+        _volcar()
+        n += len(lote)
+    return n
+
+
+def restaurar(ruta, nombres=None, informar=None):
+    """
+    Restaura el respaldo de `ruta` (carpeta o manifest.json). Devuelve la
+    cantidad de filas cargadas. Lanza ErrorRespaldo si un checksum no coincide.
+    """
+    carpeta, manifest = leer_manifest(ruta)
+    errores = verificar(carpeta, manifest)
+    if errores:
+        raise ErrorRespaldo("Respaldo dañado: " + "; ".join(errores))
+
+    formato = manifest["formato"]
+    _, abrir = COMPRESIONES[manifest["compresion"]]
+    entradas = manifest["modelos"]
+    if nombres:
+        pedidos = {n.lower() for n in nombres}
+        entradas = [m for m in entradas if m["modelo"].split(".")[-1] in pedidos]
+
+    total = 0
+    cargados = []
+    with transaction.atomic():
+        with connection.constraint_checks_disabled():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+            for m in entradas:
+                model = apps.get_model(m["modelo"])
+                t0 = time.perf_counter()
+                with _conservar_fechas(model):
+                    filas = _cargar(model, _leer(carpeta / m["archivo"], formato, abrir, m["campos"]), m["campos"], formato)
+                if filas != m["filas"]:
+                    raise ErrorRespaldo(f"{m['archivo']}: {filas} filas leídas, el manifest dice {m['filas']}.")
+                total += filas
+                cargados.append(model)
+                if informar:
+                    informar(m["modelo"], filas, m["bytes"], time.perf_counter() - t0)
+
+        # Como loaddata: las FK se verifican una vez, al final
+        connection.check_constraints(table_names=[m._meta.db_table for m in cargados])
+
+        sql = connection.ops.sequence_reset_sql(no_style(), cargados)
+        if sql:
+            with connection.cursor() as cursor:
+                for linea in sql:
+                    cursor.execute(linea)
+    return total
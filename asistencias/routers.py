@@ -0,0 +1,80 @@
+# asistencias/routers.py
+"""
+Ruteo de lecturas analíticas a una réplica de solo lectura.
+
+Las vistas de métricas y reportes se decoran con `@usar_replica`; mientras
+corren, las lecturas van al alias `replica` (si está configurado en
+DATABASES). Las escrituras siempre van a `default`.
+
+Read-your-writes: `ReplicaStickyMiddleware` marca con una cookie a los
+usuarios que acaban de hacer un POST; durante `REPLICA_STICKY_SECONDS`
+sus lecturas siguen yendo a `default`, aunque la vista esté decorada.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = "replica"
+STICKY_COOKIE = "siga_rw"
+
+_leer_de_replica = ContextVar("siga_leer_de_replica", default=False)
+
+
+def replica_configurada():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def debe_usar_primaria(request):
+    """True si el request no puede leer de la réplica (escrituras o POST reciente)."""
+    return request.method not in ("GET", "HEAD") or STICKY_COOKIE in request.COOKIES
+
+
+def usar_replica(view_func):
+    """Decorador para vistas de solo lectura (métricas, reportes, exportes)."""
+
+    if iscoroutinefunction(view_func):
+
+        async def _wrapped(request, *args, **kwargs):
+            if not replica_configurada() or debe_usar_primaria(request):
+                return await view_func(request, *args, **kwargs)
+            token = _leer_de_replica.set(True)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _leer_de_replica.reset(token)
+
+        return wraps(view_func)(_wrapped)
+
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if not replica_configurada() or debe_usar_primaria(request):
+            return view_func(request, *args, **kwargs)
+        token = _leer_de_replica.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _leer_de_replica.reset(token)
+
+    return _wrapped
+
+
+class ReplicaRouter:
+    """Lecturas a `replica` sólo dentro de vistas decoradas con `@usar_replica`."""
+
+    def db_for_read(self, model, **hints):
+        if _leer_de_replica.get():
+            return REPLICA_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primaria y réplica tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
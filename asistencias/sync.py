@@ -0,0 +1,256 @@
+# asistencias/sync.py
+"""
+Sincronización offline de la planilla de asistencia.
+
+- Subida: el cliente acumula operaciones sin conexión (de varios cursos y
+  fechas), cada una con una `clave` de idempotencia generada por él, y las
+  envía en lote. Todo va en una transacción. Primero se reservan las
+  claves (un reintento concurrente del mismo lote espera y responde
+  "dup"); las ya procesadas devuelven el resultado guardado. El resto se
+  aplica con último en escribir gana, en el orden del lote: un upsert
+  masivo para las filas que ya existen, que quedan bloqueadas, y un INSERT
+  para las nuevas. Si otro dispositivo inserta la misma (inscripción,
+  fecha) entre la lectura y el INSERT, esas filas se reaplican como
+  actualización sobre la versión vigente.
+- Bajada: `cambios_desde(cursor)` devuelve las asistencias de los cursos
+  del docente modificadas después del cursor (updated_at, id), paginadas
+  por keyset. Se omiten las filas de los últimos MARGEN_CURSOR segundos
+  para no saltear transacciones que todavía no confirmaron.
+"""
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .estadisticas import roster_docente
+from .models import Asistencia, OperacionSync
+
+MAX_OPERACIONES = 500
+MAX_CAMBIOS = 1000
+MARGEN_CURSOR = 5  # segundos
+INTENTOS_INSERCION = 3
+PENDIENTE = "pendiente"  # OperacionSync reservada, todavía sin resultado
+
+
+class ErrorSync(ValueError):
+    pass
+
+
+def inscripciones_del_docente(user):
+    """AlumnoMateria de los cursos (materia + periodo) que dicta el docente."""
+    return roster_docente(user=user)
+
+
+def _parsear(op, estados_validos):
+    """Devuelve (am_id, fecha, estado, obs) o lanza ErrorSync."""
+    try:
+        am_id = op["alumno_materia_id"]
+        fecha = date.fromisoformat(op["fecha"])
+        estado = op["estado"]
+        obs = (op.get("observaciones") or "").strip()
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise ErrorSync("operación mal formada")
+    if not isinstance(am_id, int) or estado not in estados_validos:
+        raise ErrorSync("operación inválida")
+    return am_id, fecha, estado, obs
+
+
+def _actualizar_existentes(finales, versiones):
+    """
+    Bloquea las filas de `finales` ({(am_id, fecha): (estado, obs)}) que ya
+    existen y las actualiza con un upsert masivo a su versión + 1. Anota en
+    `versiones` la versión de cada una (0 para las nuevas) y devuelve las
+    nuevas, sin guardar: select_for_update no bloquea filas que no existen.
+    """
+    existentes = (
+        Asistencia.objects.select_for_update()
+        .filter(
+            alumno_materia_id__in={am for am, _ in finales},
+            fecha__in={f for _, f in finales},
+        )
+        .values_list("alumno_materia_id", "fecha", "version")
+    )
+    actuales = {(am, f): v for am, f, v in existentes}
+    nuevas, cambiadas = [], []
+    for (am_id, fecha), (estado, obs) in finales.items():
+        previa = actuales.get((am_id, fecha))
+        version = 0 if previa is None else previa + 1
+        versiones[(am_id, fecha)] = version
+        fila = Asistencia(
+            alumno_materia_id=am_id, fecha=fecha, estado=estado,
+            observaciones=obs, version=version,
+        )
+        (nuevas if previa is None else cambiadas).append(fila)
+    if cambiadas:
+        Asistencia.objects.bulk_create(
+            cambiadas,
+            update_conflicts=True,
+            unique_fields=["alumno_materia", "fecha"],
+            update_fields=["estado", "observaciones", "version", "updated_at"],
+        )
+    return nuevas
+
+
+def _reclamar(user, claves):
+    """
+    Reserva las claves del lote antes de aplicar nada: (previas, reclamadas),
+    {clave: OperacionSync} de las ya registradas y de las recién creadas
+    (resultado PENDIENTE hasta el final de la transacción). Un reintento
+    concurrente del mismo lote espera en el índice único a que esta
+    transacción confirme, choca y vuelve a leer: encuentra las claves ya
+    aplicadas y responde "dup".
+    """
+    for intento in range(INTENTOS_INSERCION):
+        previas = {o.clave: o for o in OperacionSync.objects.filter(usuario=user, clave__in=claves)}
+        reclamadas = {
+            k: OperacionSync(usuario=user, clave=k, resultado=PENDIENTE)
+            for k in claves if k not in previas
+        }
+        try:
+            with transaction.atomic():
+                OperacionSync.objects.bulk_create(reclamadas.values())
+            return previas, reclamadas
+        except IntegrityError:
+            if intento == INTENTOS_INSERCION - 1:
+                raise
+
+
+def aplicar_operaciones(user, operaciones):
+    """
+    Aplica un lote de operaciones y devuelve un resultado compacto por cada
+    una, en el mismo orden: {"k": clave, "r": "ok"|"dup"|"err", "v": version}
+    (más "e" con el motivo si r == "err"). Una clave repetida dentro del lote
+    se aplica una vez; las repeticiones responden como un reintento.
+    """
+    if not isinstance(operaciones, list) or len(operaciones) > MAX_OPERACIONES:
+        raise ErrorSync(f"Se esperan hasta {MAX_OPERACIONES} operaciones.")
+
+    claves = [op.get("clave") if isinstance(op, dict) else None for op in operaciones]
+    if any(not isinstance(k, str) or not 0 < len(k) <= 64 for k in claves):
+        raise ErrorSync("Cada operación necesita una clave de hasta 64 caracteres.")
+
+    estados_validos = {e for e, _ in Asistencia.ESTADOS}
+    resultados = [None] * len(operaciones)
+    primeras = {}  # clave -> índice de su primera aparición en el lote
+    for i, k in enumerate(claves):
+        primeras.setdefault(k, i)
+
+    with transaction.atomic():
+        # 1) Reservar las claves: las ya registradas responden lo mismo que la primera vez
+        previas, reclamadas = _reclamar(user, list(primeras))
+
+        # 2) Validación de forma y de pertenencia (una consulta para todo el lote)
+        parseadas = {}
+        for k, i in primeras.items():
+            if k in previas:
+                resultados[i] = _repetida(previas[k])
+                continue
+            try:
+                parseadas[i] = _parsear(operaciones[i], estados_validos)
+            except ErrorSync as e:
+                resultados[i] = {"k": k, "r": "err", "e": str(e)}
+
+        ids = {am_id for am_id, *_ in parseadas.values()}
+        propias = set(
+            inscripciones_del_docente(user).filter(id__in=ids).values_list("id", flat=True)
+        )
+
+        # 3) Estado final por (inscripción, fecha): la última operación del lote gana
+        finales = {}
+        for i, (am_id, fecha, estado, obs) in parseadas.items():
+            if am_id not in propias:
+                resultados[i] = {"k": claves[i], "r": "err", "e": "inscripción ajena"}
+                continue
+            finales[(am_id, fecha)] = (estado, obs)
+
+        # 4) Existentes: bloqueadas y actualizadas. Nuevas: INSERT en un savepoint;
+        #    si otro dispositivo las insertó entretanto (IntegrityError), ya
+        #    existen y se reaplican como actualización sobre su versión.
+        versiones = {}
+        pendientes = finales
+        for intento in range(INTENTOS_INSERCION):
+            if not pendientes:
+                break
+            a_insertar = _actualizar_existentes(pendientes, versiones)
+            try:
+                with transaction.atomic():
+                    Asistencia.objects.bulk_create(a_insertar)
+                break
+            except IntegrityError:
+                if intento == INTENTOS_INSERCION - 1:
+                    raise
+                pendientes = {k: finales[k] for k in ((a.alumno_materia_id, a.fecha) for a in a_insertar)}
+
+        # 5) Guardar el resultado de las claves reservadas
+        for i, (am_id, fecha, _, _) in parseadas.items():
+            if resultados[i] is None:
+                resultados[i] = {"k": claves[i], "r": "ok", "v": versiones[(am_id, fecha)]}
+        for k, op in reclamadas.items():
+            r = resultados[primeras[k]]
+            op.resultado, op.version = r["r"], r.get("v")
+        OperacionSync.objects.bulk_update(reclamadas.values(), ["resultado", "version"])
+
+    # Claves repetidas dentro del lote: como un reintento de la primera
+    for i, k in enumerate(claves):
+        if resultados[i] is None:
+            primera = resultados[primeras[k]]
+            resultados[i] = _repetida(OperacionSync(clave=k, resultado=primera["r"], version=primera.get("v")))
+    return resultados
+
+
+def _repetida(op):
+    """Respuesta para una clave ya aplicada (o rechazada)."""
+    if op.resultado == "ok":
+        return {"k": op.clave, "r": "dup", "v": op.version}
+    return {"k": op.clave, "r": "err", "e": "operación ya rechazada"}
+
+
+# ------------------------------------------------------------
+# Cursor de cambios
+# ------------------------------------------------------------
+# "<microsegundos desde epoch>_<id>": opaco para el cliente y seguro en una URL
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _codificar_cursor(updated_at, pk):
+    return f"{(updated_at - _EPOCH) // timedelta(microseconds=1)}_{pk}"
+
+
+def _decodificar_cursor(cursor):
+    try:
+        marca, pk = cursor.split("_", 1)
+        return _EPOCH + timedelta(microseconds=int(marca)), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        raise ErrorSync("Cursor inválido.")
+
+
+def cambios_desde(user, cursor=None, limite=MAX_CAMBIOS):
+    """
+    Devuelve (filas, siguiente_cursor, hay_mas). Cada fila es
+    [id, alumno_materia_id, fecha, estado, observaciones, version]; estado
+    None es una clase precargada por el cronograma, todavía sin tomar.
+    """
+    limite = max(1, min(limite, MAX_CAMBIOS))
+    qs = Asistencia.objects.filter(
+        alumno_materia__in=inscripciones_del_docente(user),
+        updated_at__lte=timezone.now() - timedelta(seconds=MARGEN_CURSOR),
+    )
+    if cursor:
+        marca, pk = _decodificar_cursor(cursor)
+        qs = qs.filter(Q(updated_at__gt=marca) | Q(updated_at=marca, id__gt=pk))
+
+    filas = list(
+        qs.order_by("updated_at", "id")
+        .values_list("id", "alumno_materia_id", "fecha", "estado", "observaciones", "version", "updated_at")
+        [:limite + 1]
+    )
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    if filas:
+        cursor = _codificar_cursor(filas[-1][6], filas[-1][0])
+    return (
+        [[pk, am, f.isoformat(), e, o or "", v] for pk, am, f, e, o, v, _ in filas],
+        cursor,
+        hay_mas,
+    )
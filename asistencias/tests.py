@@ -0,0 +1,425 @@
+# asistencias/tests.py
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import Group, Permission
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+
+from .checkin import cargar_roster, checkin, generar_token
+from .correo import procesar_pendientes, purgar
+from .eliminacion import ejecutar, solicitar
+from .estadisticas import roster_docente, totales_docente
+from .models import (
+    Alumno, AlumnoMateria, Asistencia, Carrera, CorreoSaliente, Docente, DocenteMateria, Eliminacion, Materia,
+    OperacionSync, Periodo, User,
+)
+from .respaldos import respaldar, restaurar
+from .sync import aplicar_operaciones
+from .traspaso import diferencias, traspasar
+
+
+# ============================================================
+# ROSTER DEL DOCENTE: pares exactos (materia, periodo)
+# ============================================================
+class RosterDocenteTests(TestCase):
+    """
+    Docente con dos materias en dos periodos distintos (A en 2025, B en 2026).
+    Hay inscripciones a A en 2026 y a B en 2025, cursos que no son suyos:
+    no deben contar en su dashboard ni en sus métricas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.p1 = Periodo.objects.create(id=202503, fecha_inicio=date(2025, 3, 1), fecha_fin=date(2025, 7, 31))
+        cls.p2 = Periodo.objects.create(id=202603, fecha_inicio=date(2026, 3, 1), fecha_fin=date(2026, 7, 31))
+        carrera = Carrera.objects.create(nombre="Sistemas", codigo="SIS")
+        cls.materias = [
+            Materia.objects.create(nombre=f"Materia {i}", carrera=carrera, codigo=f"M{i}") for i in range(4)
+        ]
+        a, b = cls.materias[:2]
+
+        user = User.objects.create_user("docente", "docente@test.com", "clave", rol=User.Rol.DOCENTE)
+        cls.docente = Docente.objects.create(user=user, nombre="Ana", apellido="Pérez", legajo=1)
+        DocenteMateria.objects.create(docente=cls.docente, materia=a, periodo=cls.p1)
+        DocenteMateria.objects.create(docente=cls.docente, materia=b, periodo=cls.p2)
+
+        otro = User.objects.create_user("otro", "otro@test.com", "clave", rol=User.Rol.DOCENTE)
+        otro = Docente.objects.create(user=otro, nombre="Luis", apellido="Gómez", legajo=2)
+        DocenteMateria.objects.create(docente=otro, materia=a, periodo=cls.p2)
+        DocenteMateria.objects.create(docente=otro, materia=b, periodo=cls.p1)
+
+        cls.alumnos = [
+            Alumno.objects.create(
+                user=User.objects.create_user(f"alumno{i}", f"alumno{i}@test.com"),
+                nombre=f"Alumno {i}", apellido="Test", dni=30000000 + i,
+            )
+            for i in range(6)
+        ]
+        # (materia, periodo, alumnos, clases con registro, sin tomar)
+        inscripciones = [
+            (a, cls.p1, cls.alumnos[0:4], 3, 1),  # curso del docente
+            (b, cls.p2, cls.alumnos[2:5], 2, 2),  # curso del docente
+            (a, cls.p2, cls.alumnos[0:6], 5, 0),  # cruce: curso de otro
+            (b, cls.p1, cls.alumnos[1:6], 4, 0),  # cruce: curso de otro
+        ]
+        for materia, periodo, alumnos, tomadas, sin_tomar in inscripciones:
+            for alumno in alumnos:
+                am = AlumnoMateria.objects.create(alumno=alumno, materia=materia, periodo=periodo)
+                Asistencia.objects.bulk_create(
+                    Asistencia(
+                        alumno_materia=am,
+                        fecha=periodo.fecha_inicio + timedelta(days=d),
+                        estado="Presente" if d % 2 else "Ausente",
+                    )
+                    for d in range(tomadas)
+                )
+                Asistencia.objects.bulk_create(
+                    Asistencia(alumno_materia=am, fecha=periodo.fecha_fin - timedelta(days=d), estado=None)
+                    for d in range(sin_tomar)
+                )
+
+        # Pares exactos: alumnos 0-4 (distintos) y 4*3 + 3*2 registros tomados
+        cls.esperado = {"alumnos": 5, "asistencias": 4 * 3 + 3 * 2}
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.docente.user)
+
+    def _asignar(self, materia, periodo):
+        """Un curso más para el docente, con un alumno nuevo y una asistencia."""
+        DocenteMateria.objects.create(docente=self.docente, materia=materia, periodo=periodo)
+        alumno = Alumno.objects.create(
+            user=User.objects.create_user(f"extra{materia.pk}", f"extra{materia.pk}@test.com"),
+            nombre="Extra", apellido="Test", dni=40000000 + materia.pk,
+        )
+        am = AlumnoMateria.objects.create(alumno=alumno, materia=materia, periodo=periodo)
+        Asistencia.objects.create(alumno_materia=am, fecha=periodo.fecha_inicio, estado="Presente")
+
+    def test_roster_solo_pares_exactos(self):
+        pares = set(roster_docente(self.docente).values_list("materia_id", "periodo_id").distinct())
+        self.assertEqual(pares, {(self.materias[0].pk, self.p1.pk), (self.materias[1].pk, self.p2.pk)})
+        self.assertEqual(roster_docente(user=self.docente.user).count(), 4 + 3)
+
+    def test_totales_docente(self):
+        self.assertEqual(totales_docente(self.docente), self.esperado)
+
+    def test_dashboard_totales(self):
+        response = self.client.get(reverse("asistencias:docente_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_cursos"], 2)
+        self.assertEqual(response.context["alumnos_totales"], self.esperado["alumnos"])
+        self.assertEqual(response.context["asistencias_totales"], self.esperado["asistencias"])
+
+    def test_metricas_totales(self):
+        response = self.client.get(reverse("asistencias:docente_metricas"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["alumnos_totales"], self.esperado["alumnos"])
+        self.assertEqual(response.context["asistencias_totales"], self.esperado["asistencias"])
+        # 4 presentes de 12 en A-2025; 3 de 6 en B-2026 (los sin tomar no cuentan)
+        porcentajes = {
+            (d["curso"].materia_id, d["curso"].periodo_id): d["porcentaje"]
+            for d in response.context["detalle_cursos"]
+        }
+        self.assertEqual(porcentajes, {
+            (self.materias[0].pk, self.p1.pk): 33.33,
+            (self.materias[1].pk, self.p2.pk): 50.0,
+        })
+
+    def _consultas(self, nombre):
+        """Consultas de una vista ya con la sesión y el perfil cargados."""
+        url = reverse(f"asistencias:{nombre}")
+        self.client.get(url)
+        with self.assertNumQueries(self.CONSULTAS[nombre]):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    # Presupuesto fijo, sesión y usuario incluidos: no crece con los cursos
+    CONSULTAS = {"docente_dashboard": 5, "docente_metricas": 6}
+
+    def test_consultas_dashboard_no_crecen_con_los_cursos(self):
+        self._consultas("docente_dashboard")
+        self._asignar(self.materias[2], self.p1)
+        self._asignar(self.materias[3], self.p2)
+        response = self._consultas("docente_dashboard")
+        self.assertEqual(response.context["total_cursos"], 4)
+        self.assertEqual(response.context["alumnos_totales"], self.esperado["alumnos"] + 2)
+
+    def test_consultas_metricas_no_crecen_con_los_cursos(self):
+        self._consultas("docente_metricas")
+        self._asignar(self.materias[2], self.p1)
+        self._asignar(self.materias[3], self.p2)
+        response = self._consultas("docente_metricas")
+        self.assertEqual(len(response.context["detalle_cursos"]), 4)
+        self.assertEqual(response.context["asistencias_totales"], self.esperado["asistencias"] + 2)
+
+
+# ============================================================
+# SINCRONIZACIÓN OFFLINE: idempotencia por clave
+# ============================================================
+class SyncIdempotenciaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        periodo = Periodo.objects.create(id=202603, fecha_inicio=date(2026, 3, 1), fecha_fin=date(2026, 7, 31))
+        materia = Materia.objects.create(
+            nombre="Materia", codigo="M", carrera=Carrera.objects.create(nombre="Sistemas", codigo="SIS"),
+        )
+        user = User.objects.create_user("docente", "docente@test.com", rol=User.Rol.DOCENTE)
+        Docente.objects.create(user=user, nombre="Ana", apellido="Pérez", legajo=1)
+        DocenteMateria.objects.create(docente=user.docente, materia=materia, periodo=periodo)
+        alumno = Alumno.objects.create(
+            user=User.objects.create_user("alumno", "alumno@test.com"), nombre="Juan", apellido="Test", dni=1,
+        )
+        cls.user = user
+        cls.am = AlumnoMateria.objects.create(alumno=alumno, materia=materia, periodo=periodo)
+
+    def _op(self, clave, estado, fecha="2026-03-02"):
+        return {"clave": clave, "alumno_materia_id": self.am.pk, "fecha": fecha, "estado": estado}
+
+    def test_reintento_no_reaplica(self):
+        lote = [self._op("a", "Presente"), self._op("b", "Ausente", "2026-03-03")]
+        primera = aplicar_operaciones(self.user, lote)
+        self.assertEqual([r["r"] for r in primera], ["ok", "ok"])
+
+        segunda = aplicar_operaciones(self.user, lote)
+        self.assertEqual([(r["r"], r["v"]) for r in segunda], [("dup", 0), ("dup", 0)])
+        self.assertEqual(
+            list(Asistencia.objects.order_by("fecha").values_list("estado", "version")),
+            [("Presente", 0), ("Ausente", 0)],
+        )
+        self.assertFalse(OperacionSync.objects.exclude(resultado__in=["ok", "err"]).exists())
+
+    def test_clave_repetida_en_el_lote_se_aplica_una_vez(self):
+        resultados = aplicar_operaciones(self.user, [
+            self._op("a", "Presente"), self._op("a", "Tardanza"), self._op("c", "Ausente"),
+        ])
+        self.assertEqual([r["r"] for r in resultados], ["ok", "dup", "ok"])
+        # "c" (misma inscripción y fecha) es la última operación real del lote
+        asistencia = Asistencia.objects.get()
+        self.assertEqual((asistencia.estado, asistencia.version), ("Ausente", 0))
+        self.assertEqual(OperacionSync.objects.filter(usuario=self.user).count(), 2)
+
+
+# ============================================================
+# TRASPASO DE PERIODO
+# ============================================================
+class TraspasoTests(TestCase):
+    """Lo que se está borrando (materia, docente, alumno) no se traspasa, ni en el dry-run."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.origen = Periodo.objects.create(id=202503, fecha_inicio=date(2025, 3, 1), fecha_fin=date(2025, 7, 31))
+        cls.destino = Periodo.objects.create(id=202603, fecha_inicio=date(2026, 3, 1), fecha_fin=date(2026, 7, 31))
+        carrera = Carrera.objects.create(nombre="Sistemas", codigo="SIS")
+        materias = [Materia.objects.create(nombre=f"Materia {i}", carrera=carrera, codigo=f"M{i}") for i in range(3)]
+        docentes = [
+            Docente.objects.create(
+                user=User.objects.create_user(f"docente{i}", f"docente{i}@test.com", rol=User.Rol.DOCENTE),
+                nombre="Docente", apellido=str(i), legajo=i,
+            )
+            for i in range(2)
+        ]
+        alumnos = [
+            Alumno.objects.create(
+                user=User.objects.create_user(f"alumno{i}", f"alumno{i}@test.com"),
+                nombre="Alumno", apellido=str(i), dni=i,
+            )
+            for i in range(3)
+        ]
+        for materia in materias:
+            for docente in docentes:
+                DocenteMateria.objects.create(docente=docente, materia=materia, periodo=cls.origen)
+            for alumno in alumnos:
+                AlumnoMateria.objects.create(alumno=alumno, materia=materia, periodo=cls.origen)
+
+        # En proceso de borrado: la materia 2, el docente 1 y el alumno 2
+        Materia._base_manager.filter(pk=materias[2].pk).update(eliminado=True)
+        User._base_manager.filter(pk__in=[docentes[1].user_id, alumnos[2].user_id]).update(eliminado=True)
+        # Quedan 2 materias x 1 docente y 2 materias x 2 alumnos
+        cls.esperado = (2, 4)
+
+    def test_dry_run_igual_a_lo_insertado(self):
+        filas = diferencias(self.origen, self.destino, inscripciones=True)
+        previstas = (
+            sum(f["docentes"][0] for f in filas),
+            sum(f["inscripciones"][0] for f in filas),
+        )
+        self.assertEqual(previstas, self.esperado)
+        self.assertEqual(traspasar(self.origen, self.destino, inscripciones=True), self.esperado)
+        self.assertEqual(DocenteMateria.objects.filter(periodo=self.destino, materia__eliminado=True).count(), 0)
+        # Segunda pasada: nada nuevo
+        self.assertEqual(traspasar(self.origen, self.destino, inscripciones=True), (0, 0))
+
+
+# ============================================================
+# AUTOCOMPLETAR: prefijos con tildes y terminados en Z
+# ============================================================
+class AutocompletarTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@test.com", "clave")
+        for i, (apellido, nombre) in enumerate([
+            ("Muñoz", "José"), ("Pérez", "Ana"), ("Díaz", "Luis"), ("Perfecto", "Juan"),
+        ]):
+            Alumno.objects.create(
+                user=User.objects.create_user(f"alumno{i}", f"alumno{i}@test.com"),
+                nombre=nombre, apellido=apellido, dni=30000000 + i,
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def _apellidos(self, q):
+        respuesta = self.client.get(reverse("asistencias:autocompletar_alumnos"), {"q": q})
+        self.assertEqual(respuesta.status_code, 200)
+        return [r["texto"].split(",")[0] for r in respuesta.json()["resultados"]]
+
+    def test_tildes_y_enie(self):
+        for q in ["mu", "muñ", "MUÑOZ", "munoz", "josé", "jose"]:
+            self.assertEqual(self._apellidos(q), ["Muñoz"], q)
+
+    def test_apellido_completo_terminado_en_z(self):
+        for q in ["pérez", "PEREZ", "perez ana"]:
+            self.assertEqual(self._apellidos(q), ["Pérez"], q)
+        self.assertEqual(self._apellidos("díaz"), ["Díaz"])
+        # Sin tildes "PEREZ" < "PERFECTO"
+        self.assertEqual(self._apellidos("pér"), ["Pérez", "Perfecto"])
+
+
+# ============================================================
+# CRON DE ELIMINACIONES (sin hilos, como en Vercel)
+# ============================================================
+@override_settings(
+    CRON_SECRET="secreto", ELIMINACION_EN_HILO=False, ELIMINACION_UMBRAL=0, ELIMINACION_LOTE=2,
+    ELIMINACION_CRON_SEGUNDOS=60,
+)
+class CronEliminacionesTests(TestCase):
+
+    def setUp(self):
+        periodo = Periodo.objects.create(id=202603, fecha_inicio=date(2026, 3, 1), fecha_fin=date(2026, 7, 31))
+        self.materia = Materia.objects.create(
+            nombre="Materia", codigo="M", carrera=Carrera.objects.create(nombre="Sistemas", codigo="SIS"),
+        )
+        for i in range(5):
+            alumno = Alumno.objects.create(
+                user=User.objects.create_user(f"alumno{i}", f"alumno{i}@test.com"),
+                nombre="Alumno", apellido=str(i), dni=i,
+            )
+            AlumnoMateria.objects.create(alumno=alumno, materia=self.materia, periodo=periodo)
+        self.url = reverse("asistencias:cron_eliminaciones")
+
+    def test_secreto(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        with override_settings(CRON_SECRET=""):
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION="Bearer ").status_code, 404)
+
+    def test_reanuda_lo_cortado_por_tiempo(self):
+        eliminacion = solicitar(self.materia)
+        self.assertEqual(eliminacion.estado, Eliminacion.Estado.PENDIENTE)
+        # Un lote y se corta: queda EN_CURSO
+        eliminacion = ejecutar(eliminacion, limite=time.monotonic())
+        self.assertEqual((eliminacion.estado, eliminacion.borrados), (Eliminacion.Estado.EN_CURSO, 2))
+
+        respuesta = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(respuesta.json(), {"terminadas": 1, "con_error": 0})
+        self.assertFalse(Materia._base_manager.filter(pk=self.materia.pk).exists())
+        self.assertFalse(AlumnoMateria.objects.exists())
+
+
+# ============================================================
+# OUTBOX DE CORREO: sin cuerpos guardados una vez enviados
+# ============================================================
+@override_settings(
+    EMAIL_BACKEND="asistencias.correo.CorreoSalienteBackend", CORREO_EN_HILO=False,
+    CORREO_BACKEND_ENVIO="django.core.mail.backends.locmem.EmailBackend", CORREO_RETENCION_DIAS=7,
+)
+class OutboxCorreoTests(TestCase):
+
+    def test_enviado_sin_cuerpo_y_purgado(self):
+        mail.send_mail("Reset", "https://siga/reset/abc/", "siga@test.com", ["ana@test.com"])
+        self.assertEqual(procesar_pendientes(), (1, 0))
+        self.assertEqual(mail.outbox[0].body, "https://siga/reset/abc/")
+
+        correo = CorreoSaliente.objects.get()
+        self.assertEqual((correo.estado, correo.cuerpo, correo.html), (CorreoSaliente.Estado.ENVIADO, "", ""))
+
+        self.assertEqual(purgar(), 0)
+        CorreoSaliente.objects.update(proximo_intento=timezone.now() - timedelta(days=8))
+        self.assertEqual(purgar(), 1)
+
+
+# ============================================================
+# CHECK-IN POR QR
+# ============================================================
+class CheckinTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        periodo = Periodo.objects.create(id=202603, fecha_inicio=date(2026, 3, 1), fecha_fin=date(2026, 7, 31))
+        materia = Materia.objects.create(
+            nombre="Materia", codigo="M", carrera=Carrera.objects.create(nombre="Sistemas", codigo="SIS"),
+        )
+        docente = Docente.objects.create(
+            user=User.objects.create_user("docente", "docente@test.com", rol=User.Rol.DOCENTE),
+            nombre="Ana", apellido="Pérez", legajo=1,
+        )
+        cls.dm = DocenteMateria.objects.create(docente=docente, materia=materia, periodo=periodo)
+        cls.user = User.objects.create_user("alumno", "alumno@test.com")
+        alumno = Alumno.objects.create(user=cls.user, nombre="Juan", apellido="Test", dni=1)
+        cls.am = AlumnoMateria.objects.create(alumno=alumno, materia=materia, periodo=periodo)
+        cls.fecha = date(2026, 3, 2)
+
+    def _checkin(self):
+        return checkin(generar_token(self.dm, self.fecha), self.user.pk)
+
+    def _estado(self):
+        return Asistencia.objects.get(alumno_materia=self.am, fecha=self.fecha).estado
+
+    def test_sin_tomar_y_ausente_pasan_a_presente(self):
+        for previo in [None, "Ausente"]:
+            Asistencia.objects.update_or_create(alumno_materia=self.am, fecha=self.fecha, defaults={"estado": previo})
+            self.assertEqual(self._checkin(), (True, "¡Asistencia registrada!"))
+            self.assertEqual(self._estado(), "Presente")
+
+    def test_no_pisa_justificado(self):
+        Asistencia.objects.create(alumno_materia=self.am, fecha=self.fecha, estado="Justificado")
+        ok, _ = self._checkin()
+        self.assertTrue(ok)
+        self.assertEqual(self._estado(), "Justificado")
+
+    def test_padron_viejo_sin_error(self):
+        cargar_roster(self.dm.materia_id, self.dm.periodo_id)
+        # Baja hecha en otra instancia: el padrón cacheado de esta no se entera
+        AlumnoMateria.objects.filter(pk=self.am.pk).delete()
+        self.assertEqual(self._checkin(), (False, "No figurás inscripto en este curso."))
+        self.assertFalse(Asistencia.objects.exists())
+
+
+# ============================================================
+# RESPALDO / RESTAURACIÓN
+# ============================================================
+class RespaldoTests(TestCase):
+
+    def test_grupos_y_permisos_de_usuario(self):
+        user = User.objects.create_user("docente", "docente@test.com", rol=User.Rol.DOCENTE)
+        grupo = Group.objects.create(name="Coordinación")
+        permiso = Permission.objects.get(codename="view_materia")
+        user.groups.add(grupo)
+        user.user_permissions.add(permiso)
+
+        with tempfile.TemporaryDirectory() as carpeta:
+            manifest = respaldar(destino=Path(carpeta) / "respaldo")
+            user.groups.clear()
+            user.user_permissions.clear()
+            restaurar(manifest)
+
+        self.assertEqual(list(user.groups.all()), [grupo])
+        self.assertEqual(list(user.user_permissions.all()), [permiso])
@@ -0,0 +1,130 @@
+# asistencias/traspaso.py
+"""
+Traspaso de un periodo a otro: clona las asignaciones (DocenteMateria) del
+periodo origen en el destino y, opcionalmente, las inscripciones
+(AlumnoMateria) con ciertos estado_inscripcion. Reemplaza el alta de a una
+con asignar_docente / inscribir_alumnos al abrir un periodo.
+
+- `diferencias()` es el dry-run: por materia, cuántas filas se crearían y
+  cuántas ya están en el destino.
+- `traspasar()` hace un INSERT ... SELECT por tabla (sin traer filas a
+  Python) dentro de una transacción. Las filas que ya existen en el destino
+  se saltean con NOT EXISTS: se puede correr de nuevo sin duplicar ni pisar
+  lo cargado a mano (turno y aula incluidos).
+
+Ambas parten de los mismos querysets (`_asignaciones`, `_inscripciones`),
+así lo que muestra el dry-run es exactamente lo que se inserta. Las
+materias, docentes y alumnos que se están borrando en segundo plano
+(`eliminado`, ver eliminacion.py) no se traspasan.
+"""
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, DateTimeField, Exists, OuterRef, Value
+from django.utils import timezone
+
+from .checkin import invalidar_roster
+from .models import AlumnoMateria, DocenteMateria, Materia
+
+ESTADOS_DEFAULT = ("Activo",)
+
+
+def _asignaciones(origen, destino, materias=None):
+    """(nuevas, existentes): DocenteMateria del origen según estén o no en el destino."""
+    qs = DocenteMateria.objects.filter(
+        periodo=origen, materia__eliminado=False, docente__user__eliminado=False,
+    )
+    if materias:
+        qs = qs.filter(materia_id__in=materias)
+    en_destino = Exists(DocenteMateria.objects.filter(
+        periodo=destino, docente=OuterRef("docente"), materia=OuterRef("materia"),
+    ))
+    return qs.exclude(en_destino), qs.filter(en_destino)
+
+
+def _inscripciones(origen, destino, estados=None, materias=None):
+    """(nuevas, existentes): AlumnoMateria del origen según estén o no en el destino."""
+    qs = AlumnoMateria.objects.filter(
+        periodo=origen, estado_inscripcion__in=estados or ESTADOS_DEFAULT,
+        materia__eliminado=False, alumno__user__eliminado=False,
+    )
+    if materias:
+        qs = qs.filter(materia_id__in=materias)
+    en_destino = Exists(AlumnoMateria.objects.filter(
+        periodo=destino, alumno=OuterRef("alumno"), materia=OuterRef("materia"),
+    ))
+    return qs.exclude(en_destino), qs.filter(en_destino)
+
+
+def _por_materia(qs):
+    return dict(qs.order_by().values_list("materia_id").annotate(n=Count("pk")))
+
+
+def diferencias(origen, destino, inscripciones=False, estados=None, materias=None):
+    """
+    Lista de dicts por materia (ordenada por nombre) con "materia",
+    "docentes" e "inscripciones", cada uno un par (a crear, ya en destino).
+    Una consulta agrupada por conjunto, más la de nombres.
+    """
+    conteos = {"docentes": [_por_materia(q) for q in _asignaciones(origen, destino, materias)]}
+    if inscripciones:
+        conteos["inscripciones"] = [
+            _por_materia(q) for q in _inscripciones(origen, destino, estados, materias)
+        ]
+
+    ids = {m for pares in conteos.values() for c in pares for m in c}
+    filas = []
+    for materia in Materia.objects.filter(id__in=ids).order_by("nombre"):
+        fila = {"materia": materia, "docentes": (0, 0), "inscripciones": (0, 0)}
+        for clave, (nuevas, existentes) in conteos.items():
+            fila[clave] = (nuevas.get(materia.id, 0), existentes.get(materia.id, 0))
+        filas.append(fila)
+    return filas
+
+
+def _insertar_desde(model, campos, qs):
+    """INSERT INTO tabla (campos) <SELECT de qs>; devuelve las filas insertadas."""
+    sql, params = qs.order_by().query.sql_with_params()
+    columnas = ", ".join(connection.ops.quote_name(model._meta.get_field(c).column) for c in campos)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columnas}) {sql}", params)
+        return cursor.rowcount
+
+
+def _invalidar_rosters(materias, periodo_id):
+    for materia_id in materias:
+        invalidar_roster(materia_id, periodo_id)
+
+
+def traspasar(origen, destino, inscripciones=False, estados=None, materias=None):
+    """
+    Clona en `destino` las asignaciones de `origen` (y sus inscripciones con
+    estado_inscripcion en `estados`, default "Activo", si `inscripciones`).
+    Las inscripciones nuevas quedan "Activo" con fecha de inscripción de hoy.
+    Todo en una transacción. Devuelve (asignaciones, inscripciones) creadas.
+    """
+    if origen.pk == destino.pk:
+        raise ValueError("El periodo origen y el destino son el mismo.")
+
+    with transaction.atomic():
+        nuevas, _ = _asignaciones(origen, destino, materias)
+        docentes = _insertar_desde(DocenteMateria, ["docente", "materia", "periodo", "turno", "aula"], (
+            nuevas.annotate(periodo_destino=Value(destino.pk))
+            .values_list("docente_id", "materia_id", "periodo_destino", "turno", "aula")
+        ))
+
+        alumnos = 0
+        if inscripciones:
+            nuevas, _ = _inscripciones(origen, destino, estados, materias)
+            # Pares a invalidar en el padrón cacheado del check-in por QR
+            materias_inscriptas = set(nuevas.order_by().values_list("materia_id", flat=True).distinct())
+            alumnos = _insertar_desde(AlumnoMateria, [
+                "alumno", "materia", "periodo", "fecha_inscripcion", "estado_inscripcion", "updated_at",
+            ], nuevas.annotate(
+                periodo_destino=Value(destino.pk),
+                hoy=Value(date.today(), output_field=DateField()),  # como auto_now_add
+                estado_nuevo=Value(AlumnoMateria._meta.get_field("estado_inscripcion").default),
+                ahora=Value(timezone.now(), output_field=DateTimeField()),
+            ).values_list("alumno_id", "materia_id", "periodo_destino", "hoy", "estado_nuevo", "ahora"))
+            transaction.on_commit(lambda: _invalidar_rosters(materias_inscriptas, destino.pk))
+    return docentes, alumnos
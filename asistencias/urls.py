@@ -1,4 +1,5 @@
 # asistencias/urls.py
+from django.conf import settings
 from django.urls import path, reverse_lazy
 from django.contrib.auth import views as auth_views
 
@@ -10,6 +11,7 @@ from .views.admin_views import (
     admin_dashboard,
     admin_cursadas,
     cursada_detalle,      # Detalle de cursada
+    cursada_cronograma,
     asignar_docente,
     inscribir_alumnos,
 
@@ -40,6 +42,9 @@ from .views.admin_views import (
     # Reportes
     reportes_curso,
 
+    # Borrados en segundo plano
+    eliminaciones_lista,
+
     # Métricas (solo Admin; Docente y Alumno van en sus views)
     admin_metricas,
 )
@@ -48,6 +53,7 @@ from .views.admin_views import (
 from .views.docente_views import (
     cursos_docente,
     marcar_asistencia,
+    guardar_celdas,
     docente_dashboard,
     docente_metricas,
 )
@@ -56,10 +62,19 @@ from .views.docente_views import (
 from .views.alumno_views import (
     alumno_dashboard,       # Dashboard del alumno
     consulta_asistencia,
+    detalle_cursada,
     subir_certificado,
     alumno_metricas,        # Métricas del alumno
 )
 from .views.session_views import logout_all_devices
+from .views.checkin_views import checkin_qr, checkin_qr_svg, checkin_alumno
+from .views.sync_views import sync_subir, sync_cambios
+from .views.autocompletar_views import autocompletar_alumnos, autocompletar_docentes, autocompletar_materias
+from .views.cron_views import cron_correos, cron_eliminaciones
+
+# Bajo ASGI: dashboards/métricas con consultas concurrentes
+if settings.ASYNC_VIEWS:
+    from .views.async_views import admin_dashboard, docente_dashboard, docente_metricas
 
 app_name = "asistencias"
 
@@ -115,9 +130,15 @@ urlpatterns = [
     # =========================
     path("admin/cursadas/", admin_cursadas, name="admin_cursadas"),
     path("admin/cursadas/<int:cursada_id>/", cursada_detalle, name="cursada_detalle"),
+    path("admin/cursadas/<int:cursada_id>/cronograma/", cursada_cronograma, name="cursada_cronograma"),
     path("admin/asignar-docente/", asignar_docente, name="asignar_docente"),
     path("admin/inscribir-alumnos/", inscribir_alumnos, name="inscribir_alumnos"),
 
+    # Autocompletar (JSON) para los formularios de asignación / inscripción
+    path("admin/autocompletar/alumnos/", autocompletar_alumnos, name="autocompletar_alumnos"),
+    path("admin/autocompletar/docentes/", autocompletar_docentes, name="autocompletar_docentes"),
+    path("admin/autocompletar/materias/", autocompletar_materias, name="autocompletar_materias"),
+
     # =========================
     # ADMIN — Justificativos
     # =========================
@@ -130,6 +151,11 @@ urlpatterns = [
     # =========================
     path("admin/reportes/", reportes_curso, name="reportes_curso"),
 
+    # =========================
+    # ADMIN — Eliminaciones en segundo plano
+    # =========================
+    path("admin/eliminaciones/", eliminaciones_lista, name="eliminaciones_lista"),
+
     # =========================
     # MÉTRICAS (Admin / Docente / Alumno)
     # =========================
@@ -143,13 +169,20 @@ urlpatterns = [
     path("docente/dashboard/", docente_dashboard, name="docente_dashboard"),
     path("docente/cursos/", cursos_docente, name="cursos_docente"),
     path("docente/marcar/<int:curso_id>/", marcar_asistencia, name="marcar_asistencia"),
+    path("docente/marcar/<int:curso_id>/celdas/", guardar_celdas, name="guardar_celdas"),
+    path("docente/checkin/<int:curso_id>/", checkin_qr, name="checkin_qr"),
+    path("docente/checkin/<int:curso_id>/qr.svg", checkin_qr_svg, name="checkin_qr_svg"),
+    path("docente/sync/", sync_subir, name="sync_subir"),
+    path("docente/sync/cambios/", sync_cambios, name="sync_cambios"),
     
     # =========================
     # ALUMNO
     # =========================
     path("alumno/dashboard/", alumno_dashboard, name="alumno_dashboard"),
     path("alumno/asistencias/", consulta_asistencia, name="consulta_asistencia"),
+    path("alumno/asistencias/<int:am_id>/detalle/", detalle_cursada, name="detalle_cursada"),
     path("alumno/justificativo/subir/", subir_certificado, name="subir_certificado"),
+    path("alumno/checkin/<str:token>/", checkin_alumno, name="checkin_alumno"),
 
     # Cerrar sesiones en todos los dispositivos
     path("perfil/logout-all/", logout_all_devices, name="logout_all_devices"),
@@ -189,4 +222,10 @@ urlpatterns = [
         ),
         name="password_reset_complete",
     ),
+
+    # =========================
+    # Cron HTTP (Vercel, ver vercel.json)
+    # =========================
+    path("cron/correos/", cron_correos, name="cron_correos"),
+    path("cron/eliminaciones/", cron_eliminaciones, name="cron_eliminaciones"),
 ]
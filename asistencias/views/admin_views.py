@@ -6,14 +6,55 @@ from django.utils.timezone import now
 from django.core.paginator import Paginator
 from django.db.models import Q
 from django.http import HttpResponse
+from django.views.decorators.http import require_POST
 import csv
 
 from ..models import (
     User, Alumno, Docente, Carrera, Materia, Periodo,
-    DocenteMateria, AlumnoMateria, Asistencia
+    DocenteMateria, AlumnoMateria, Asistencia, Eliminacion
 )
+from ..perfiles import invalidar_perfil
 from ..permissions import is_admin
-from django.db.models import Count, Case, When, IntegerField
+from ..routers import usar_replica
+from ..checkin import invalidar_roster
+from ..cache_exportes import exportar
+from ..eliminacion import EliminacionProtegida, solicitar as solicitar_eliminacion
+from ..estadisticas import (
+    con_totales_cursada, con_totales_materia, porcentaje as porcentaje_de, resumen_curso,
+)
+from django.db.models import Count, Case, Exists, F, OuterRef, When, IntegerField
+
+
+# =========================
+# Listados: orden y paginación por querystring
+# =========================
+POR_PAGINA = 25
+
+
+def _listado(request, qs, ordenes, default, prefijo="", por_pagina=POR_PAGINA):
+    """
+    Ordena `qs` según ?<prefijo>orden= (clave de `ordenes`, con "-" para
+    descendente; los nulos siempre al final) y lo pagina con ?<prefijo>page=.
+    Devuelve la página y el contexto para los links: `orden` actual, `qs`
+    (querystring sin la página) y `qs_orden` (sin página ni orden).
+    """
+    orden = request.GET.get(f"{prefijo}orden") or default
+    if orden.lstrip("-") not in ordenes:
+        orden = default
+    desc = orden.startswith("-")
+    campos = [
+        F(c).desc(nulls_last=True) if desc else F(c).asc(nulls_last=True)
+        for c in ordenes[orden.lstrip("-")]
+    ]
+    paginator = Paginator(qs.order_by(*campos, "pk"), por_pagina)
+    pagina = paginator.get_page(request.GET.get(f"{prefijo}page"))
+    pagina.rango = list(paginator.get_elided_page_range(pagina.number, on_each_side=2, on_ends=1))
+
+    params = request.GET.copy()
+    params.pop(f"{prefijo}page", None)
+    qs_pagina = params.urlencode()
+    params.pop(f"{prefijo}orden", None)
+    return pagina, {"orden": orden, "qs": qs_pagina, "qs_orden": params.urlencode(), "prefijo": prefijo}
 
 
 # =========================
@@ -25,7 +66,7 @@ def admin_dashboard(request):
     total_docentes = Docente.objects.count()
     total_alumnos = Alumno.objects.count()
     total_materias = Materia.objects.count()
-    total_asistencias = Asistencia.objects.count()
+    total_asistencias = Asistencia.objects.filter(estado__isnull=False).count()
     return render(request, "admin/dashboard.html", {
         "total_docentes": total_docentes,
         "total_alumnos": total_alumnos,
@@ -121,6 +162,7 @@ def usuarios_editar(request, user_id):
         form = CustomUserEditForm(request.POST, instance=usuario)
         if form.is_valid():
             form.save()
+            invalidar_perfil(usuario)  # pudo cambiar el rol
             messages.success(request, "Usuario actualizado correctamente.")
             return redirect("asistencias:usuarios_lista")
         messages.error(request, "Revisá los datos del formulario.")
@@ -149,11 +191,39 @@ def usuarios_eliminar(request, user_id):
         messages.error(request, "No podés eliminar el último superusuario.")
         return redirect("asistencias:usuarios_lista")
 
-    usuario.delete()
-    messages.success(request, "Usuario eliminado correctamente.")
+    _eliminar(request, usuario, "el usuario")
     return redirect("asistencias:usuarios_lista")
 
 
+# =========================
+# Borrados en cascada (en segundo plano si son grandes)
+# =========================
+def _eliminar(request, obj, etiqueta):
+    """Estima la cascada y borra por lotes (ver eliminacion.py)."""
+    try:
+        eliminacion = solicitar_eliminacion(obj, request.user)
+    except EliminacionProtegida as e:
+        messages.error(request, f"No se puede eliminar {etiqueta}: {e}")
+        return
+    if eliminacion.estado == Eliminacion.Estado.TERMINADA:
+        messages.success(request, f"Se eliminó {etiqueta} ({eliminacion.borrados} registros).")
+    elif eliminacion.estado == Eliminacion.Estado.ERROR:
+        messages.error(request, f"Falló la eliminación de {etiqueta}: {eliminacion.error}")
+    else:
+        messages.info(
+            request,
+            f"Se está eliminando {etiqueta} en segundo plano (~{eliminacion.estimado} registros); "
+            "ya no aparece en los listados. El progreso se ve en Eliminaciones.",
+        )
+
+
+@login_required
+@user_passes_test(is_admin)
+def eliminaciones_lista(request):
+    eliminaciones = Eliminacion.objects.select_related("solicitada_por").order_by("-creada")[:50]
+    return render(request, "admin/eliminaciones.html", {"eliminaciones": eliminaciones})
+
+
 # =========================
 # Académico: Carreras / Materias
 # =========================
@@ -190,8 +260,7 @@ def carrera_eliminar(request, carrera_id):
         messages.error(request, "Acción no permitida.")
         return redirect("asistencias:carreras_lista")
 
-    carrera.delete()
-    messages.success(request, "Carrera eliminada correctamente.")
+    _eliminar(request, carrera, "la carrera")
     return redirect("asistencias:carreras_lista")
 
 
@@ -261,8 +330,7 @@ def materia_eliminar(request, materia_id):
         messages.error(request, "Acción no permitida.")
         return redirect("asistencias:materias_lista")
 
-    materia.delete()
-    messages.success(request, "Materia eliminada correctamente.")
+    _eliminar(request, materia, "la materia")
     return redirect("asistencias:materias_lista")
 
 
@@ -289,28 +357,35 @@ def crear_materia(request):
 def carrera_detalle(request, carrera_id):
     carrera = get_object_or_404(Carrera, id=carrera_id)
 
-    # Materias de la carrera + cantidad de alumnos inscriptos por materia
-    materias = (
-        Materia.objects
-        .filter(carrera=carrera)
-        .annotate(
-            total_alumnos=Count("alumnomateria__alumno", distinct=True)
-        )
-        .order_by("nombre")
+    # Materias de la carrera con inscriptos y % de asistencia (subconsultas)
+    materias, listado_materias = _listado(
+        request,
+        con_totales_materia(Materia.objects.filter(carrera=carrera)),
+        {
+            "codigo": ["codigo"],
+            "nombre": ["nombre"],
+            "alumnos": ["total_alumnos"],
+            "porcentaje": ["porcentaje"],
+        },
+        default="nombre", prefijo="m",
     )
 
-    # Alumnos inscriptos en cualquier materia de la carrera (sin repetir)
-    alumnos = (
-        Alumno.objects
-        .filter(alumnomateria__materia__carrera=carrera)
-        .distinct()
-        .order_by("apellido", "nombre")
+    # Alumnos inscriptos en alguna materia de la carrera: EXISTS en lugar de
+    # JOIN + DISTINCT, paginado
+    inscripciones = AlumnoMateria.objects.filter(alumno_id=OuterRef("pk"), materia__carrera=carrera)
+    alumnos, listado_alumnos = _listado(
+        request,
+        Alumno.objects.filter(Exists(inscripciones)),
+        {"apellido": ["apellido", "nombre"], "dni": ["dni"]},
+        default="apellido", prefijo="a",
     )
 
     context = {
         "carrera": carrera,
         "materias": materias,
+        "listado_materias": listado_materias,
         "alumnos": alumnos,
+        "listado_alumnos": listado_alumnos,
     }
     return render(request, "admin/carrera_detalle.html", context)
 
@@ -321,40 +396,38 @@ def carrera_detalle(request, carrera_id):
 @login_required
 @user_passes_test(is_admin)
 def materia_detalle(request, materia_id):
-    materia = get_object_or_404(Materia, id=materia_id)
-
-    # Cursadas (Docente + Período) de esa materia
-    cursadas = (
-        DocenteMateria.objects
-        .filter(materia=materia)
-        .select_related("docente", "periodo")
-        .order_by("periodo__id")
+    materia = get_object_or_404(Materia.objects.select_related("carrera"), id=materia_id)
+
+    # Cursadas (Docente + Período) con inscriptos y % de asistencia, en una consulta
+    cursadas, listado_cursadas = _listado(
+        request,
+        con_totales_cursada(
+            DocenteMateria.objects.filter(materia=materia).select_related("docente", "periodo")
+        ),
+        {
+            "periodo": ["periodo_id"],
+            "docente": ["docente__apellido", "docente__nombre"],
+            "inscriptos": ["inscriptos"],
+            "porcentaje": ["porcentaje"],
+        },
+        default="periodo", prefijo="c",
     )
 
-    # Para cada cursada, contamos alumnos inscriptos en ese período
-    cursadas_datos = []
-    for dm in cursadas:
-        total_alumnos = AlumnoMateria.objects.filter(
-            materia=materia,
-            periodo=dm.periodo
-        ).count()
-        cursadas_datos.append({
-            "cursada": dm,
-            "total_alumnos": total_alumnos,
-        })
-
     # Alumnos inscriptos en la materia (en cualquier período, sin repetir)
-    alumnos = (
-        Alumno.objects
-        .filter(alumnomateria__materia=materia)
-        .distinct()
-        .order_by("apellido", "nombre")
+    inscripciones = AlumnoMateria.objects.filter(alumno_id=OuterRef("pk"), materia=materia)
+    alumnos, listado_alumnos = _listado(
+        request,
+        Alumno.objects.filter(Exists(inscripciones)),
+        {"apellido": ["apellido", "nombre"], "dni": ["dni"]},
+        default="apellido", prefijo="a",
     )
 
     context = {
         "materia": materia,
-        "cursadas_datos": cursadas_datos,
+        "cursadas": cursadas,
+        "listado_cursadas": listado_cursadas,
         "alumnos": alumnos,
+        "listado_alumnos": listado_alumnos,
     }
     return render(request, "admin/materia_detalle.html", context)
 
@@ -378,7 +451,7 @@ def lista_justificativos(request):
 def aprobar_justificativo(request, asistencia_id):
     a = get_object_or_404(Asistencia, id=asistencia_id)
     # Si el ADMIN no es Docente, guardamos None para no romper la FK
-    a.validado_por = get_object_or_404(Docente, user=request.user) if hasattr(request.user, "docente") else None
+    a.validado_por = request.profile if isinstance(request.profile, Docente) else None
     a.validado_fecha = now()
     a.save()
     messages.success(request, "Justificativo aprobado correctamente.")
@@ -397,12 +470,30 @@ def rechazar_justificativo(request, asistencia_id):
 
 
 # =========================
-# Reportes (filtro + paginación + export CSV/XLSX)
+# Reportes (filtro + paginación + export CSV/XLSX/PDF)
 # =========================
+def _exportar_reporte(request, curso, export):
+    """XLSX o PDF del reporte de un curso, servido por la caché de exportaciones."""
+    try:
+        if export == "xlsx":
+            from ..exports import xlsx_reporte_curso as generar, XLSX_CONTENT_TYPE as content_type
+        else:
+            from ..pdf import pdf_reporte_curso as generar, PDF_CONTENT_TYPE as content_type
+    except ImportError:
+        paquete = "openpyxl" if export == "xlsx" else "reportlab"
+        messages.error(request, f"Para exportar a {export.upper()} instalá '{paquete}' (pip install {paquete}).")
+        return redirect(f"{request.path}?curso={curso.id}")
+
+    return exportar(
+        curso, f"reporte_{export}", f"reporte_curso_{curso.id}.{export}", content_type,
+        lambda destino: generar(curso, resumen_curso(curso), destino),
+    )
+
+
 @login_required
 @user_passes_test(is_admin)
+@usar_replica
 def reportes_curso(request):
-    from pathlib import Path
     cursos = (
         DocenteMateria.objects
         .select_related("materia", "periodo", "docente")
@@ -412,7 +503,7 @@ def reportes_curso(request):
 
     # Filtros
     curso_id = request.GET.get("curso", "")
-    export = request.GET.get("export", "")  # "csv" o "xlsx"
+    export = request.GET.get("export", "")  # "csv", "xlsx" o "pdf"
 
     datos = []
     curso = None
@@ -425,6 +516,12 @@ def reportes_curso(request):
             .get(id=curso_id)
         )
 
+        # XLSX/PDF: desde la caché de exportaciones si los datos no cambiaron
+        if export in ("xlsx", "pdf"):
+            respuesta = _exportar_reporte(request, curso, export)
+            if respuesta is not None:
+                return respuesta
+
         inscriptos = (
             AlumnoMateria.objects
             .filter(materia=curso.materia, periodo=curso.periodo)
@@ -434,7 +531,7 @@ def reportes_curso(request):
         )
 
         for am in inscriptos:
-            qs = am.asistencia_set.all()
+            qs = [a for a in am.asistencia_set.all() if a.estado is not None]
             total = len(qs)
             presentes = sum(1 for a in qs if a.estado == "Presente")
             justificados = sum(1 for a in qs if a.estado == "Justificado")
@@ -466,120 +563,6 @@ def reportes_curso(request):
             ])
         return response
 
-    # ======== Exportar XLSX con formato institucional ========
-    if export == "xlsx" and curso and datos:
-        try:
-            import openpyxl
-            from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-            from openpyxl.utils import get_column_letter
-            from openpyxl.drawing.image import Image as XLImage
-        except ImportError:
-            messages.error(request, "Para exportar a XLSX instalá 'openpyxl' (pip install openpyxl).")
-            return redirect(f"{request.path}?curso={curso.id}")
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Reporte"
-
-        from pathlib import Path
-        base_dir = Path(__file__).resolve().parents[2]
-        logo_path = base_dir / "static" / "img" / "logo.png"
-        start_row = 1
-        if logo_path.exists():
-            try:
-                img = XLImage(str(logo_path))
-                img.height = 60  # ajuste visual
-                img.width = 60
-                ws.add_image(img, "A1")
-                start_row = 5  # dejamos espacio para el logo
-            except Exception:
-                start_row = 3
-
-        # --- Título institucional ---
-        titulo = (
-            f"Reporte de Asistencia — {curso.materia.nombre} / "
-            f"{curso.periodo.nombre} — Docente: {curso.docente}"
-        )
-        ws.merge_cells(start_row=start_row, start_column=1, end_row=start_row, end_column=6)
-        cell_title = ws.cell(row=start_row, column=1, value=titulo)
-        cell_title.font = Font(bold=True, size=14)
-        cell_title.alignment = Alignment(horizontal="center")
-        start_row += 2  # salteamos una fila
-
-        # --- Encabezados
-        headers = ["Alumno", "Total", "Presentes", "Justificados", "Ausentes", "% Asistencia"]
-        header_row = start_row
-        for col, h in enumerate(headers, start=1):
-            c = ws.cell(row=header_row, column=col, value=h)
-            c.font = Font(bold=True, color="FFFFFF")
-            c.fill = PatternFill("solid", fgColor="111827")  # gris oscuro
-            c.alignment = Alignment(horizontal="center", vertical="center")
-            c.border = Border(
-                left=Side(style="thin", color="CCCCCC"),
-                right=Side(style="thin", color="CCCCCC"),
-                top=Side(style="thin", color="CCCCCC"),
-                bottom=Side(style="thin", color="CCCCCC"),
-            )
-
-        # --- Datos
-        data_row_start = header_row + 1
-        row = data_row_start
-        for d in datos:
-            ws.cell(row=row, column=1, value=str(d["alumno"]))
-            ws.cell(row=row, column=2, value=d["total"])
-            ws.cell(row=row, column=3, value=d["presentes"])
-            ws.cell(row=row, column=4, value=d["justificados"])
-            ws.cell(row=row, column=5, value=d["ausentes"])
-            # porcentaje numérico (0..1) con formato 0.00%
-            pcell = ws.cell(row=row, column=6, value=(d["porcentaje"] / 100.0))
-            pcell.number_format = "0.00%"
-            # bordes ligeros
-            for col in range(1, 7):
-                ws.cell(row=row, column=col).border = Border(
-                    left=Side(style="thin", color="EEEEEE"),
-                    right=Side(style="thin", color="EEEEEE"),
-                    top=Side(style="thin", color="EEEEEE"),
-                    bottom=Side(style="thin", color="EEEEEE"),
-                )
-            row += 1
-
-        # --- Autoajuste de ancho de columnas (en base al contenido)
-        from openpyxl.utils import get_column_letter
-        for col in range(1, 7):
-            col_letter = get_column_letter(col)
-            max_len = 0
-            for r in range(header_row, row):
-                val = ws.cell(row=r, column=col).value
-                if col == 6 and isinstance(val, (int, float)):
-                    val_str = f"{val:.2%}"
-                else:
-                    val_str = str(val) if val is not None else ""
-                max_len = max(max_len, len(val_str))
-            ws.column_dimensions[col_letter].width = min(max(12, max_len + 2), 45)
-
-        # --- Alineaciones
-        from openpyxl.styles import Alignment
-        for r in ws.iter_rows(min_row=data_row_start, min_col=2, max_col=6, max_row=row - 1):
-            for c in r:
-                c.alignment = Alignment(horizontal="center")
-
-        # --- Congelar encabezado
-        ws.freeze_panes = ws.cell(row=data_row_start, column=1)  # congela todo por encima
-
-        # --- Resumen al final (opcional)
-        summary_row = row + 1
-        ws.cell(row=summary_row, column=1, value="Total alumnos:")
-        ws.cell(row=summary_row, column=2, value=len(datos))
-        ws.cell(row=summary_row, column=1).font = Font(bold=True)
-
-        # --- Respuesta HTTP
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = f'attachment; filename="reporte_curso_{curso.id}.xlsx"'
-        wb.save(response)
-        return response
-
     # ======== Paginación para la tabla HTML ========
     paginator = Paginator(datos, 15)  # 15 filas por página
     page_number = request.GET.get("page")
@@ -600,18 +583,34 @@ def reportes_curso(request):
 @login_required
 @user_passes_test(is_admin)
 def admin_cursadas(request):
-    cursadas = (
-        DocenteMateria.objects
-        .select_related("materia", "periodo", "docente", "docente__user")
-        .order_by("materia__nombre", "periodo__id")
+    """Cursadas con inscriptos y % de asistencia, paginadas y ordenables."""
+    periodo = request.GET.get("periodo", "").strip()
+    cursadas = con_totales_cursada(
+        DocenteMateria.objects.select_related("materia", "periodo", "docente")
     )
-    return render(request, "admin/cursadas.html", {"cursadas": cursadas})
+    if periodo.isdigit():
+        cursadas = cursadas.filter(periodo_id=int(periodo))
+
+    pagina, listado = _listado(request, cursadas, {
+        "materia": ["materia__nombre", "periodo_id"],
+        "periodo": ["periodo_id", "materia__nombre"],
+        "docente": ["docente__apellido", "docente__nombre"],
+        "inscriptos": ["inscriptos"],
+        "porcentaje": ["porcentaje"],
+    }, default="materia")
+    return render(request, "admin/cursadas.html", {
+        "cursadas": pagina,
+        "listado": listado,
+        "periodos": Periodo.objects.order_by("-id").values_list("id", flat=True),
+        "periodo": periodo,
+    })
 
 # =========================
 # Detalle de cursada
 # =========================
 @login_required
 @user_passes_test(is_admin)
+@usar_replica
 def cursada_detalle(request, cursada_id):
     """Detalle de una cursada (DocenteMateria) con estadísticas de asistencia."""
     from django.shortcuts import get_object_or_404
@@ -622,6 +621,24 @@ def cursada_detalle(request, cursada_id):
         id=cursada_id,
     )
 
+    # ===== Exportar a Excel (XLSX), desde la caché si los datos no cambiaron =====
+    if request.GET.get("export") == "xlsx":
+        try:
+            from ..exports import xlsx_cursada, XLSX_CONTENT_TYPE
+        except ImportError:
+            messages.error(request, "Para exportar a Excel instalá 'openpyxl' (pip install openpyxl).")
+            return redirect(request.path)
+
+        def generar(destino):
+            datos = resumen_curso(dm)
+            registros = sum(d["total"] for d in datos)
+            ok = sum(d["presentes"] + d["justificados"] for d in datos)
+            xlsx_cursada(dm, datos, len(datos), porcentaje_de(ok, registros), destino)
+
+        respuesta = exportar(dm, "cursada_xlsx", f"asistencia_cursada_{dm.id}.xlsx", XLSX_CONTENT_TYPE, generar)
+        if respuesta is not None:
+            return respuesta
+
     # Alumnos inscriptos en esa materia/período, con sus asistencias prefetchadas
     inscriptos = (
         AlumnoMateria.objects
@@ -634,9 +651,11 @@ def cursada_detalle(request, cursada_id):
     datos = []
     total_registros = 0
     total_ok = 0  # presentes + justificados
+    sin_tomar = 0  # precargadas por el cronograma, todavía sin marcar
 
     for am in inscriptos:
-        qs = list(am.asistencia_set.all())
+        qs = [a for a in am.asistencia_set.all() if a.estado is not None]
+        sin_tomar += len(am.asistencia_set.all()) - len(qs)
         total = len(qs)
         presentes = sum(1 for a in qs if a.estado == "Presente")
         justificados = sum(1 for a in qs if a.estado == "Justificado")
@@ -659,95 +678,11 @@ def cursada_detalle(request, cursada_id):
     total_alumnos = len(datos)
     porcentaje_global = round((total_ok / total_registros * 100), 2) if total_registros else 0
 
-    # ===== Exportar a Excel (XLSX) =====
-    export = request.GET.get("export")
-    if export == "xlsx" and datos:
-        try:
-            import openpyxl
-            from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
-            from openpyxl.utils import get_column_letter
-        except ImportError:
-            messages.error(request, "Para exportar a Excel instalá 'openpyxl' (pip install openpyxl).")
-            return redirect(request.path)
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Asistencia cursada"
-
-        # Título
-        titulo = (
-            f"Asistencia — {dm.materia.nombre} / {dm.periodo.nombre} "
-            f"(Docente: {dm.docente})"
-        )
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
-        cell_title = ws.cell(row=1, column=1, value=titulo)
-        cell_title.font = Font(bold=True, size=14)
-        cell_title.alignment = Alignment(horizontal="center")
-
-        # Encabezados
-        headers = ["Alumno", "DNI", "Total", "Presentes", "Justificados", "Ausentes", "% Asistencia"]
-        header_row = 3
-        for col, h in enumerate(headers, start=1):
-            c = ws.cell(row=header_row, column=col, value=h)
-            c.font = Font(bold=True, color="FFFFFF")
-            c.fill = PatternFill("solid", fgColor="111827")
-            c.alignment = Alignment(horizontal="center", vertical="center")
-            c.border = Border(
-                left=Side(style="thin", color="CCCCCC"),
-                right=Side(style="thin", color="CCCCCC"),
-                top=Side(style="thin", color="CCCCCC"),
-                bottom=Side(style="thin", color="CCCCCC"),
-            )
-
-        # Datos
-        row = header_row + 1
-        for d in datos:
-            ws.cell(row=row, column=1, value=str(d["alumno"]))
-            ws.cell(row=row, column=2, value=d["dni"])
-            ws.cell(row=row, column=3, value=d["total"])
-            ws.cell(row=row, column=4, value=d["presentes"])
-            ws.cell(row=row, column=5, value=d["justificados"])
-            ws.cell(row=row, column=6, value=d["ausentes"])
-            pcell = ws.cell(row=row, column=7, value=(d["porcentaje"] / 100.0))
-            pcell.number_format = "0.00%"
-
-            for col in range(1, 8):
-                ws.cell(row=row, column=col).border = Border(
-                    left=Side(style="thin", color="EEEEEE"),
-                    right=Side(style="thin", color="EEEEEE"),
-                    top=Side(style="thin", color="EEEEEE"),
-                    bottom=Side(style="thin", color="EEEEEE"),
-                )
-            row += 1
-
-        # Autoajuste de columnas
-        for col in range(1, 8):
-            col_letter = get_column_letter(col)
-            max_len = 0
-            for r in range(1, row):
-                val = ws.cell(row=r, column=col).value
-                if col == 7 and isinstance(val, (int, float)):
-                    val_str = f"{val:.2%}"
-                else:
-                    val_str = str(val) if val is not None else ""
-                max_len = max(max_len, len(val_str))
-            ws.column_dimensions[col_letter].width = min(max(12, max_len + 2), 45)
-
-        # Resumen al final
-        summary_row = row + 1
-        ws.cell(row=summary_row, column=1, value="Total alumnos:")
-        ws.cell(row=summary_row, column=2, value=total_alumnos)
-        ws.cell(row=summary_row + 1, column=1, value="% asistencia global:")
-        ws.cell(row=summary_row + 1, column=2, value=(porcentaje_global / 100.0)).number_format = "0.00%"
-
-        # Respuesta HTTP
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        filename = f"asistencia_cursada_{dm.id}.xlsx"
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        wb.save(response)
-        return response
+    # Cronograma: fechas de clase previstas y cuántas ya pasaron
+    from ..cronograma import cronograma
+    from ..forms import FeriadoForm, HorarioClaseForm
+    fechas = cronograma(dm.periodo, cursos=[dm.id]).get(dm.id, [])
+    hoy = now().date()
 
     context = {
         "cursada": dm,
@@ -755,9 +690,54 @@ def cursada_detalle(request, cursada_id):
         "datos": datos,
         "total_alumnos": total_alumnos,
         "porcentaje_global": porcentaje_global,
+        "horarios": dm.horarios.all(),
+        "feriados": dm.periodo.feriados.all(),
+        "clases_previstas": len(fechas),
+        "clases_dictadas": sum(1 for f in fechas if f <= hoy),
+        "sin_tomar": sin_tomar,
+        "horario_form": HorarioClaseForm(),
+        "feriado_form": FeriadoForm(),
     }
     return render(request, "admin/cursada_detalle.html", context)
 
+
+@login_required
+@user_passes_test(is_admin)
+@require_POST
+def cursada_cronograma(request, cursada_id):
+    """Alta / baja de horarios del curso y de feriados de su periodo."""
+    from ..forms import FeriadoForm, HorarioClaseForm
+    from ..models import Feriado, HorarioClase
+
+    dm = get_object_or_404(DocenteMateria.objects.select_related("periodo"), id=cursada_id)
+    accion = request.POST.get("accion")
+
+    if accion == "agregar_horario":
+        form = HorarioClaseForm(request.POST, curso=dm)
+        if form.is_valid():
+            form.instance.curso = dm
+            form.save()
+            messages.success(request, f"Horario agregado: {form.instance}.")
+        else:
+            messages.error(request, " ".join(e for errores in form.errors.values() for e in errores))
+    elif accion == "quitar_horario":
+        HorarioClase.objects.filter(curso=dm, id=request.POST.get("id")).delete()
+        messages.success(request, "Horario eliminado.")
+    elif accion == "agregar_feriado":
+        form = FeriadoForm(request.POST, periodo=dm.periodo)
+        if form.is_valid():
+            form.instance.periodo = dm.periodo
+            form.save()
+            messages.success(request, f"Feriado agregado al periodo {dm.periodo_id}: {form.instance}.")
+        else:
+            messages.error(request, " ".join(e for errores in form.errors.values() for e in errores))
+    elif accion == "quitar_feriado":
+        Feriado.objects.filter(periodo=dm.periodo, id=request.POST.get("id")).delete()
+        messages.success(request, "Feriado eliminado.")
+    else:
+        messages.error(request, "Acción desconocida.")
+    return redirect("asistencias:cursada_detalle", cursada_id=dm.id)
+
 @login_required
 @user_passes_test(is_admin)
 def asignar_docente(request):
@@ -793,6 +773,8 @@ def inscribir_alumnos(request):
                 )
                 if created:
                     creados += 1
+            # El padrón cacheado del check-in por QR queda desactualizado
+            invalidar_roster(materia.id, periodo.id)
             messages.success(request, f"Inscripciones registradas: {creados}.")
             return redirect("asistencias:admin_cursadas")
         messages.error(request, "Revisá los datos del formulario.")
@@ -806,6 +788,7 @@ def inscribir_alumnos(request):
 # =========================
 @login_required
 @user_passes_test(is_admin)
+@usar_replica
 def admin_metricas(request):
     # Filtros opcionales
     materia_id = request.GET.get("materia")
@@ -813,6 +796,7 @@ def admin_metricas(request):
 
     asistencias = (
         Asistencia.objects
+        .filter(estado__isnull=False)
         .select_related("alumno_materia__materia", "alumno_materia__periodo")
     )
 
@@ -860,6 +844,19 @@ def admin_metricas(request):
         for r in por_materia
     ]
 
+    # Desgloses por docente / turno / día / carrera (motor columnar, requiere numpy)
+    try:
+        from ..analitica import desgloses
+        analitica = desgloses(periodo_id=periodo_id, materia_id=materia_id)
+    except ImportError:
+        analitica = None
+    analitica_tablas = [
+        ("Por docente (menor asistencia primero)", analitica["docentes"]),
+        ("Por turno", analitica["turnos"]),
+        ("Por día de la semana", analitica["dias"]),
+        ("Por carrera", analitica["carreras"]),
+    ] if analitica else []
+
     materias = Materia.objects.all().order_by("nombre")
     periodos = Periodo.objects.all().order_by("-id")
 
@@ -867,6 +864,8 @@ def admin_metricas(request):
         "kpis": kpis,
         "chart_labels": chart_labels,
         "chart_values": chart_values,
+        "analitica": analitica,
+        "analitica_tablas": analitica_tablas,
         "materias": materias,
         "periodos": periodos,
         "materia_id": str(materia_id or ""),
@@ -884,7 +883,7 @@ def alumno_metricas(request):
     alumno = request.user.alumno
     asistencias = (
         Asistencia.objects
-        .filter(alumno_materia__alumno=alumno)
+        .filter(alumno_materia__alumno=alumno, estado__isnull=False)
         .select_related("alumno_materia__materia", "alumno_materia__periodo")
     )
 
@@ -2,21 +2,78 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.db.models import Q
-
-from ..models import Alumno, AlumnoMateria, Asistencia
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+import hashlib
+
+from ..estadisticas import con_resumen, huella_cursadas, porcentaje as porcentaje_de
+from ..models import AlumnoMateria, Asistencia
+from ..perfiles import con_alumno
 from ..permissions import is_alumno
 
 
+# ============================================================
+# GET CONDICIONAL: huella de los datos del alumno
+# ============================================================
+def _huella_alumno(request):
+    """
+    Versión de los datos del alumno (una consulta agregada).
+    Se memoiza en el request: `condition` la pide para ETag y Last-Modified.
+    """
+    if not hasattr(request, "_huella_alumno"):
+        request._huella_alumno = huella_cursadas(
+            AlumnoMateria.objects.filter(alumno__user=request.user)
+        )
+    return request._huella_alumno
+
+
+def _con_mensajes(request):
+    # Con mensajes pendientes la página no es la misma: sin 304
+    return bool(len(messages.get_messages(request)))
+
+
+def _etag_alumno(request, *args, **kwargs):
+    if _con_mensajes(request):
+        return None
+    h = _huella_alumno(request)
+    base = "|".join(str(x) for x in (
+        request.user.pk,
+        request.session.session_key,   # nueva sesión => nuevo token CSRF en la página
+        timezone.localdate(),          # textos relativos a "hoy"
+        request.get_full_path(),
+        h["cursadas"], h["registros"], h["cursadas_max"], h["registros_max"],
+    ))
+    return hashlib.sha1(base.encode()).hexdigest()
+
+
+def _ultima_modificacion_alumno(request, *args, **kwargs):
+    if _con_mensajes(request):
+        return None
+    h = _huella_alumno(request)
+    marcas = [m for m in (h["cursadas_max"], h["registros_max"]) if m]
+    return max(marcas) if marcas else None
+
+
+def datos_del_alumno(vista):
+    """El navegador guarda la página pero revalida siempre (304 si no cambió)."""
+    condicional = condition(etag_func=_etag_alumno, last_modified_func=_ultima_modificacion_alumno)
+    return cache_control(private=True, no_cache=True)(condicional(vista))
+
+
 @login_required
 @user_passes_test(is_alumno)
-def alumno_dashboard(request):
+@datos_del_alumno
+@con_alumno
+def alumno_dashboard(request, alumno):
     """
     Panel principal del rol ALUMNO.
     Muestra un resumen global de asistencia, materias activas,
     inasistencias y justificativos pendientes, además de materias en riesgo.
     """
-    alumno = get_object_or_404(Alumno, user=request.user)
 
     # Todas las cursadas del alumno
     cursadas = (
@@ -28,7 +85,7 @@ def alumno_dashboard(request):
     # Todas las asistencias del alumno
     asistencias = (
         Asistencia.objects
-        .filter(alumno_materia__alumno=alumno)
+        .filter(alumno_materia__alumno=alumno, estado__isnull=False)
         .select_related("alumno_materia__materia", "alumno_materia__periodo")
     )
 
@@ -51,8 +108,16 @@ def alumno_dashboard(request):
         validado_por__isnull=True
     ).count()
 
-    # Materias en riesgo (< 75% de asistencia)
+    # Proyección al final del periodo (requiere numpy; se calcula una vez por día)
+    try:
+        from ..proyeccion import proyecciones_de
+        proyectadas = proyecciones_de(cursadas)
+    except ImportError:
+        proyectadas = {}
+
+    # Materias en riesgo (< 75% de asistencia) y en riesgo pronto (según la proyección)
     materias_en_riesgo = []
+    materias_en_riesgo_pronto = []
     for am in cursadas:
         qs = asistencias.filter(alumno_materia=am)
         total = qs.count()
@@ -61,10 +126,18 @@ def alumno_dashboard(request):
         pres = qs.filter(estado="Presente").count()
         jus = qs.filter(estado="Justificado").count()
         porcentaje = round(((pres + jus) / total * 100), 2)
+        proyeccion = proyectadas.get(am.id)
         if porcentaje < 75:
             materias_en_riesgo.append({
                 "cursada": am,
                 "porcentaje": porcentaje,
+                "proyeccion": proyeccion,
+            })
+        elif proyeccion and proyeccion.en_riesgo_pronto:
+            materias_en_riesgo_pronto.append({
+                "cursada": am,
+                "porcentaje": porcentaje,
+                "proyeccion": proyeccion,
             })
 
     context = {
@@ -73,63 +146,91 @@ def alumno_dashboard(request):
         "ausentes_totales": ausentes,
         "justificados_pendientes": justificativos_pendientes,
         "materias_en_riesgo": materias_en_riesgo,
+        "materias_en_riesgo_pronto": materias_en_riesgo_pronto,
     }
     return render(request, "alumno/dashboard.html", context)
 
 
 @login_required
 @user_passes_test(is_alumno)
-def consulta_asistencia(request):
+@datos_del_alumno
+@con_alumno
+def consulta_asistencia(request, alumno):
     """
     Vista de 'Mis asistencias' para el alumno.
-    Muestra tarjetas por materia con resumen + detalle expandible.
+    Muestra tarjetas por materia con el resumen (una consulta agregada); el
+    detalle de cada tarjeta se pide a `detalle_cursada` al expandirla.
     """
-    alumno = get_object_or_404(Alumno, user=request.user)
 
-    cursadas = (
+    cursadas = con_resumen(
         AlumnoMateria.objects
         .filter(alumno=alumno)
         .select_related("materia", "periodo")
-    )
+    ).filter(total__gt=0)
 
-    cursos = []
-    for am in cursadas:
-        qs = (
-            Asistencia.objects
-            .filter(alumno_materia=am)
-            .order_by("fecha")
-        )
-        total = qs.count()
-        if not total:
-            continue
-
-        presentes = qs.filter(estado="Presente").count()
-        justificados = qs.filter(estado="Justificado").count()
-        ausentes = qs.filter(Q(estado="Ausente") | Q(estado="Tardanza")).count()
-        porcentaje = round(((presentes + justificados) / total * 100), 2) if total else 0
-
-        cursos.append({
+    cursos = [
+        {
             "cursada": am,
-            "total": total,
-            "presentes": presentes,
-            "justificados": justificados,
-            "ausentes": ausentes,
-            "porcentaje": porcentaje,
-            "asistencias": qs,
-        })
+            "total": am.total,
+            "presentes": am.presentes,
+            "justificados": am.justificados,
+            "ausentes": am.ausentes,
+            "porcentaje": porcentaje_de(am.presentes + am.justificados, am.total),
+        }
+        for am in cursadas
+    ]
 
     context = {"cursos": cursos}
     return render(request, "alumno/consulta.html", context)
 
 
+DETALLE_POR_PAGINA = 20
+
+
+@login_required
+@user_passes_test(is_alumno)
+@datos_del_alumno
+def detalle_cursada(request, am_id):
+    """
+    Registros de asistencia de una cursada del alumno, paginados.
+    Devuelve un fragmento HTML (filas de la tabla) o, con ?formato=json,
+    {"asistencias": [...], "pagina", "siguiente"}.
+    """
+    am = get_object_or_404(AlumnoMateria, id=am_id, alumno__user=request.user)
+    pagina = Paginator(
+        Asistencia.objects
+        .filter(alumno_materia=am, estado__isnull=False)
+        .order_by("fecha")
+        .only("fecha", "estado", "observaciones"),
+        DETALLE_POR_PAGINA,
+    ).get_page(request.GET.get("page"))
+    siguiente = pagina.next_page_number() if pagina.has_next() else None
+
+    if request.GET.get("formato") == "json":
+        return JsonResponse({
+            "asistencias": [
+                {"fecha": a.fecha.isoformat(), "estado": a.estado, "observaciones": a.observaciones or ""}
+                for a in pagina
+            ],
+            "pagina": pagina.number,
+            "siguiente": siguiente,
+        })
+
+    return render(request, "partials/_detalle_cursada.html", {
+        "cursada": am,
+        "asistencias": pagina,
+        "siguiente": siguiente,
+    })
+
+
 @login_required
 @user_passes_test(is_alumno)
-def subir_certificado(request):
+@con_alumno
+def subir_certificado(request, alumno):
     """
     Vista para subir certificados (justificativos).
     Muestra formulario y listado de justificativos cargados.
     """
-    alumno = get_object_or_404(Alumno, user=request.user)
     cursadas = (
         AlumnoMateria.objects
         .filter(alumno=alumno)
@@ -181,12 +282,12 @@ def subir_certificado(request):
 
 @login_required
 @user_passes_test(is_alumno)
-def alumno_metricas(request):
+@con_alumno
+def alumno_metricas(request, alumno):
     """
     Métricas específicas del alumno por materia.
     Reutiliza la lógica de cálculo de porcentajes por cursada.
     """
-    alumno = get_object_or_404(Alumno, user=request.user)
 
     cursadas = (
         AlumnoMateria.objects
@@ -196,7 +297,7 @@ def alumno_metricas(request):
 
     asistencias = (
         Asistencia.objects
-        .filter(alumno_materia__alumno=alumno)
+        .filter(alumno_materia__alumno=alumno, estado__isnull=False)
     )
 
     total_registros = asistencias.count()
@@ -0,0 +1,134 @@
+# asistencias/views/async_views.py
+"""
+Versiones async de los dashboards y métricas.
+
+Se usan cuando la app corre bajo ASGI (ver asistencia/asgi.py y el setting
+ASYNC_VIEWS). Los agregados independientes se lanzan a la vez con
+`asyncio.gather`, así la latencia total queda cerca de la consulta más lenta
+en lugar de la suma de todas.
+
+Los métodos `a*` del ORM (acount, aget, ...) corren en el único hilo
+"thread sensitive" de asgiref, por lo que un gather sobre ellos se
+serializa igual. Por eso, con el pool de conexiones activo (DB_POOL),
+`_en_paralelo` ejecuta cada consulta con `sync_to_async(thread_sensitive=False)`:
+cada una usa su propio hilo y una conexión del pool, hasta
+ASYNC_PARALELO_MAX a la vez. Sin pool (SQLite, DB_POOL=False) cada hilo
+abriría y cerraría su propia conexión en cada request, así que las
+consultas corren una tras otra en el hilo sync, sobre su conexión
+persistente.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db import close_old_connections
+from django.shortcuts import render
+
+from ..estadisticas import totales_docente
+from ..models import Alumno, Docente, Materia, DocenteMateria, Asistencia
+from ..perfiles import con_docente
+from ..permissions import is_admin, is_docente
+from ..routers import usar_replica
+from .docente_views import _detalles_cursos
+
+
+def _en_hilo(fn):
+    def _run():
+        try:
+            return fn()
+        finally:
+            # Devolver la conexión de este hilo (al pool o según CONN_MAX_AGE)
+            close_old_connections()
+    return _run
+
+
+async def _en_paralelo(**consultas):
+    """Ejecuta callables sync (consultas ORM) y devuelve {nombre: resultado}."""
+    if not settings.DB_POOL:
+        return await sync_to_async(lambda: {nombre: fn() for nombre, fn in consultas.items()})()
+
+    limite = asyncio.Semaphore(getattr(settings, "ASYNC_PARALELO_MAX", 4))
+
+    async def _una(fn):
+        async with limite:
+            return await sync_to_async(_en_hilo(fn), thread_sensitive=False)()
+
+    resultados = await asyncio.gather(*(_una(fn) for fn in consultas.values()))
+    return dict(zip(consultas, resultados))
+
+
+async def _render(request, template, context):
+    # El render accede a request.user (context processors): se hace en el hilo sync
+    return await sync_to_async(render)(request, template, context)
+
+
+# ============================================================
+# ADMIN
+# ============================================================
+@login_required
+@user_passes_test(is_admin)
+async def admin_dashboard(request):
+    totales = await _en_paralelo(
+        total_docentes=Docente.objects.count,
+        total_alumnos=Alumno.objects.count,
+        total_materias=Materia.objects.count,
+        total_asistencias=Asistencia.objects.filter(estado__isnull=False).count,
+    )
+    return await _render(request, "admin/dashboard.html", totales)
+
+
+# ============================================================
+# DOCENTE
+# ============================================================
+def _consultas_docente(docente):
+    """Cursos del docente y sus totales sobre el roster (pares materia + periodo)."""
+    cursos = (
+        DocenteMateria.objects
+        .filter(docente=docente)
+        .select_related("materia", "periodo", "docente")
+    )
+    return cursos, lambda: totales_docente(docente)
+
+
+@login_required
+@user_passes_test(is_docente)
+@con_docente
+async def docente_dashboard(request, docente):
+    cursos, totales = _consultas_docente(docente)
+
+    r = await _en_paralelo(
+        cursos=lambda: list(cursos),
+        totales=totales,
+    )
+
+    context = {
+        "cursos": r["cursos"],
+        "total_cursos": len(r["cursos"]),
+        "alumnos_totales": r["totales"]["alumnos"],
+        "asistencias_totales": r["totales"]["asistencias"],
+    }
+    return await _render(request, "docente/dashboard.html", context)
+
+
+@login_required
+@user_passes_test(is_docente)
+@usar_replica
+@con_docente
+async def docente_metricas(request, docente):
+    cursos, totales = _consultas_docente(docente)
+    cursos = [c async for c in cursos]
+
+    # KPIs y detalle de los cursos, a la vez
+    r = await _en_paralelo(
+        totales=totales,
+        detalle_cursos=lambda: _detalles_cursos(docente, cursos),
+    )
+
+    context = {
+        "total_cursos": len(cursos),
+        "alumnos_totales": r["totales"]["alumnos"],
+        "asistencias_totales": r["totales"]["asistencias"],
+        "detalle_cursos": r["detalle_cursos"],
+    }
+    return await _render(request, "docente/metricas.html", context)
@@ -1,7 +1,11 @@
+import logging
+
 from django.conf import settings
 from django.contrib.auth.views import LoginView
 from django.utils import timezone
 
+from ..registro import registrar_evento
+
 
 class CustomLoginView(LoginView):
     """LoginView que soporta el checkbox `remember_me` en la plantilla.
@@ -34,4 +38,9 @@ class CustomLoginView(LoginView):
             # No bloquear el flujo de login por errores al guardar
             pass
 
+        registrar_evento("login", usuario=self.request.user.username, rol_usuario=self.request.user.rol)
         return response
+
+    def form_invalid(self, form):
+        registrar_evento("login_fallido", logging.WARNING, usuario=form.data.get("username", "")[:150])
+        return super().form_invalid(form)
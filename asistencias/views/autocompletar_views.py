@@ -0,0 +1,151 @@
+# asistencias/views/autocompletar_views.py
+"""
+Endpoints JSON de autocompletar para los formularios de admin (ver
+widgets.py). Búsqueda por prefijo que usa los índices:
+
+- Texto: cada palabra tiene que ser prefijo de alguno de los campos, como
+  rango sobre el texto plegado (models.Plegado: sin tildes, en mayúsculas),
+  Plegado(campo) >= "GAR" AND Plegado(campo) < "GAS". Los índices son sobre
+  la misma expresión; sirve en SQLite y PostgreSQL, a diferencia de ILIKE.
+  "perez", "pérez" y "PÉR" encuentran a "Pérez".
+- Números (DNI / legajo): un rango por cantidad de dígitos posible sobre el
+  índice de la columna entera.
+
+Respuesta: {"resultados": [{"id", "texto"}], "mas": bool}, de a POR_PAGINA
+(?page=N). Sin COUNT: se pide una fila de más para saber si hay otra página.
+"""
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from ..models import Alumno, Docente, Materia, Plegado, plegar
+from ..permissions import is_admin
+
+POR_PAGINA = 20
+MIN_CARACTERES = 2
+MAX_DIGITOS = 9  # DNI / legajo
+ALFABETO = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def _siguiente(prefijo):
+    """
+    Menor cadena mayor que todas las que empiezan con `prefijo`, o None si no
+    hay cota (todo Z). Se sube dentro de 0-9A-Z, que ordenan igual en la
+    collation C y en las de locale: "PEREZ" -> "PERF", no "PERE[" (en una
+    collation de locale "[" se ignora y "PERE[" queda antes que "PEREZ").
+    """
+    prefijo = prefijo.rstrip("Z")
+    if not prefijo:
+        return None
+    ultimo = prefijo[-1]
+    if ultimo in ALFABETO:
+        return prefijo[:-1] + ALFABETO[ALFABETO.index(ultimo) + 1]
+    return prefijo[:-1] + chr(ord(ultimo) + 1)
+
+
+def _prefijo_texto(alias, palabra):
+    palabra = plegar(palabra)
+    q = Q(**{f"{alias}__gte": palabra})
+    hasta = _siguiente(palabra)
+    if hasta is not None:
+        q &= Q(**{f"{alias}__lt": hasta})
+    return q
+
+
+def _es_numero(palabra):
+    # Sólo 0-9: isdigit() también acepta "²³" y otros dígitos Unicode que int() rechaza
+    return palabra.isascii() and palabra.isdigit()
+
+
+def _prefijo_numero(campo, digitos):
+    """Q con los rangos de enteros cuya representación empieza con `digitos`."""
+    base = int(digitos)
+    q = Q(**{campo: base})
+    for extra in range(1, MAX_DIGITOS - len(digitos) + 1):
+        desde = base * 10 ** extra
+        q |= Q(**{f"{campo}__gte": desde, f"{campo}__lt": desde + 10 ** extra})
+    return q
+
+
+def _buscar(qs, texto, campos_texto, campo_numero=None):
+    """Filtra `qs` por las palabras de `texto` (AND entre palabras)."""
+    qs = qs.alias(**{f"_{c}": Plegado(c) for c in campos_texto})
+    for palabra in texto.split():
+        if campo_numero and _es_numero(palabra):
+            qs = qs.filter(_prefijo_numero(campo_numero, palabra))
+            continue
+        q = Q()
+        for c in campos_texto:
+            q |= _prefijo_texto(f"_{c}", palabra)
+        qs = qs.filter(q)
+    return qs
+
+
+def _responder(request, qs, texto_de):
+    try:
+        pagina = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        pagina = 1
+    desde = (pagina - 1) * POR_PAGINA
+    filas = list(qs[desde:desde + POR_PAGINA + 1])
+    return JsonResponse({
+        "resultados": [{"id": o.pk, "texto": texto_de(o)} for o in filas[:POR_PAGINA]],
+        "mas": len(filas) > POR_PAGINA,
+    })
+
+
+def _consulta(request):
+    texto = (request.GET.get("q") or "").strip()[:100]
+    return texto if len(texto) >= MIN_CARACTERES or _es_numero(texto) else None
+
+
+# ============================================================
+# ENDPOINTS
+# ============================================================
+@login_required
+@user_passes_test(is_admin)
+@require_GET
+def autocompletar_alumnos(request):
+    """Alumnos por apellido / nombre (prefijo) o DNI (prefijo)."""
+    texto = _consulta(request)
+    if texto is None:
+        return JsonResponse({"resultados": [], "mas": False})
+    qs = (
+        _buscar(Alumno.objects.all(), texto, ["apellido", "nombre"], campo_numero="dni")
+        .only("id", "apellido", "nombre", "dni")
+        .order_by("_apellido", "_nombre", "id")
+    )
+    return _responder(request, qs, lambda a: f"{a.apellido}, {a.nombre} (DNI {a.dni})")
+
+
+@login_required
+@user_passes_test(is_admin)
+@require_GET
+def autocompletar_docentes(request):
+    """Docentes por apellido / nombre (prefijo) o legajo (prefijo)."""
+    texto = _consulta(request)
+    if texto is None:
+        return JsonResponse({"resultados": [], "mas": False})
+    qs = (
+        _buscar(Docente.objects.all(), texto, ["apellido", "nombre"], campo_numero="legajo")
+        .only("id", "apellido", "nombre", "legajo")
+        .order_by("_apellido", "_nombre", "id")
+    )
+    return _responder(request, qs, lambda d: f"{d.apellido}, {d.nombre} (legajo {d.legajo})")
+
+
+@login_required
+@user_passes_test(is_admin)
+@require_GET
+def autocompletar_materias(request):
+    """Materias por nombre o código (prefijo)."""
+    texto = _consulta(request)
+    if texto is None:
+        return JsonResponse({"resultados": [], "mas": False})
+    qs = (
+        _buscar(Materia.objects.select_related("carrera"), texto, ["nombre", "codigo"])
+        .only("id", "nombre", "codigo", "carrera__codigo")
+        .order_by("_nombre", "id")
+    )
+    return _responder(request, qs, str)
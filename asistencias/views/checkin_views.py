@@ -0,0 +1,76 @@
+# asistencias/views/checkin_views.py
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
+
+from ..checkin import checkin, generar_token
+from ..models import DocenteMateria
+from ..permissions import is_docente, is_alumno
+from ..registro import registrar_evento
+
+
+# ============================================================
+# DOCENTE: pantalla con el QR rotativo
+# ============================================================
+@login_required
+@user_passes_test(is_docente)
+def checkin_qr(request, curso_id):
+    """
+    Muestra el QR que los alumnos escanean para registrar su asistencia.
+    La imagen se refresca sola cada CHECKIN_ROTACION segundos.
+    """
+    dm = get_object_or_404(
+        DocenteMateria.objects.select_related("materia", "periodo"),
+        id=curso_id,
+        docente__user=request.user,
+    )
+    context = {
+        "curso": dm,
+        "rotacion": getattr(settings, "CHECKIN_ROTACION", 30),
+    }
+    return render(request, "docente/checkin_qr.html", context)
+
+
+@never_cache
+@login_required
+@user_passes_test(is_docente)
+def checkin_qr_svg(request, curso_id):
+    """SVG del QR con un token recién firmado."""
+    from reportlab.graphics import renderSVG
+    from reportlab.graphics.barcode.qr import QrCodeWidget
+    from reportlab.graphics.shapes import Drawing
+
+    dm = get_object_or_404(DocenteMateria, id=curso_id, docente__user=request.user)
+    url = request.build_absolute_uri(
+        reverse("asistencias:checkin_alumno", args=[generar_token(dm)])
+    )
+
+    qr = QrCodeWidget(url, barLevel="M")
+    x0, y0, x1, y1 = qr.getBounds()
+    lado = 300
+    dibujo = Drawing(lado, lado, transform=[lado / (x1 - x0), 0, 0, lado / (y1 - y0), 0, 0])
+    dibujo.add(qr)
+    return HttpResponse(renderSVG.drawToString(dibujo), content_type="image/svg+xml")
+
+
+# ============================================================
+# ALUMNO: endpoint que abre el QR
+# ============================================================
+@csrf_exempt  # el token firmado y de vida corta cumple el rol del token CSRF
+@never_cache
+@login_required
+@user_passes_test(is_alumno)
+def checkin_alumno(request, token):
+    """
+    Registra al alumno como presente en el curso del token.
+    GET (escaneo desde el celular) responde HTML; POST responde JSON.
+    """
+    ok, mensaje = checkin(token, request.user.id)
+    registrar_evento("asistencia_guardada", origen="checkin", ok=ok)
+    if request.method == "POST":
+        return JsonResponse({"ok": ok, "mensaje": mensaje}, status=200 if ok else 400)
+    return render(request, "alumno/checkin.html", {"ok": ok, "mensaje": mensaje}, status=200 if ok else 400)
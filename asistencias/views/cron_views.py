@@ -0,0 +1,45 @@
+# asistencias/views/cron_views.py
+"""
+Tareas periódicas disparadas por HTTP, para plataformas sin procesos de
+fondo (Vercel Cron, ver vercel.json). Vercel llama con GET y el header
+`Authorization: Bearer <CRON_SECRET>`; sin CRON_SECRET configurado el
+endpoint no existe (404).
+"""
+from hmac import compare_digest
+
+from django.conf import settings
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from .. import correo, eliminacion
+
+
+def _autorizado(request):
+    secreto = getattr(settings, "CRON_SECRET", "")
+    if not secreto:
+        raise Http404
+    return compare_digest(request.headers.get("Authorization", ""), f"Bearer {secreto}")
+
+
+@never_cache
+@require_GET
+def cron_correos(request):
+    """
+    Envía el outbox de correo (reset de contraseña incluido) por un tiempo
+    acotado y purga los mensajes viejos ya resueltos.
+    """
+    if not _autorizado(request):
+        return HttpResponseForbidden()
+    enviados, fallidos = correo.procesar_pendientes(segundos=settings.CORREO_CRON_SEGUNDOS)
+    return JsonResponse({"enviados": enviados, "fallidos": fallidos, "purgados": correo.purgar()})
+
+
+@never_cache
+@require_GET
+def cron_eliminaciones(request):
+    """Avanza los borrados en cascada grandes por un tiempo acotado (reanudables)."""
+    if not _autorizado(request):
+        return HttpResponseForbidden()
+    terminadas, con_error = eliminacion.procesar_pendientes(segundos=settings.ELIMINACION_CRON_SEGUNDOS)
+    return JsonResponse({"terminadas": terminadas, "con_error": con_error})
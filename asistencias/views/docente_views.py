@@ -3,9 +3,19 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils.timezone import now
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.views.decorators.http import require_POST
+from datetime import date
+import json
 
-from ..models import Docente, DocenteMateria, AlumnoMateria, Asistencia
+from ..estadisticas import con_resumen, porcentaje, roster_docente, totales_docente
+from ..models import DocenteMateria, AlumnoMateria, Asistencia
+from ..perfiles import con_docente
 from ..permissions import is_docente
+from ..registro import registrar_evento
+from ..routers import usar_replica
 
 
 # ============================================================
@@ -13,12 +23,12 @@ from ..permissions import is_docente
 # ============================================================
 @login_required
 @user_passes_test(is_docente)
-def docente_dashboard(request):
+@con_docente
+def docente_dashboard(request, docente):
     """
     Panel principal del rol DOCENTE.
     Muestra un resumen de cursos, alumnos y asistencias.
     """
-    docente = get_object_or_404(Docente, user=request.user)
 
     # Cursos asignados a este docente
     cursos = (
@@ -28,23 +38,14 @@ def docente_dashboard(request):
     )
     total_cursos = cursos.count()
 
-    # Alumnos totales (aproximado a partir de materia + periodo)
-    am_qs = AlumnoMateria.objects.filter(
-        materia__in=cursos.values("materia"),
-        periodo__in=cursos.values("periodo"),
-    )
-    alumnos_totales = am_qs.values("alumno").distinct().count()
-
-    # Registros de asistencia cargados por sus cursos
-    asistencias_totales = Asistencia.objects.filter(
-        alumno_materia__in=am_qs
-    ).count()
+    # Alumnos y registros de asistencia de sus cursos (pares materia + periodo)
+    totales = totales_docente(docente)
 
     context = {
         "cursos": cursos,
         "total_cursos": total_cursos,
-        "alumnos_totales": alumnos_totales,
-        "asistencias_totales": asistencias_totales,
+        "alumnos_totales": totales["alumnos"],
+        "asistencias_totales": totales["asistencias"],
     }
     return render(request, "docente/dashboard.html", context)
 
@@ -90,8 +91,6 @@ def marcar_asistencia(request, curso_id):
     )
 
     # Fecha: si no viene en POST/GET, usamos hoy
-    from datetime import date
-
     fecha_str = request.POST.get("fecha") or request.GET.get("fecha")
     if fecha_str:
         try:
@@ -102,119 +101,263 @@ def marcar_asistencia(request, curso_id):
         fecha = now().date()
 
     if request.method == "POST":
-        # Guardar asistencia para cada alumno
+        # Validar todos los estados y versiones antes de guardar ninguno
+        estados_validos = {e for e, _ in Asistencia.ESTADOS}
+        estados = {am.id: request.POST.get(f"estado_{am.id}", "Ausente") for am in inscriptos}
+        invalidos = sorted({e for e in estados.values() if e not in estados_validos})
+        if invalidos:
+            return HttpResponseBadRequest(f"Estado desconocido: {', '.join(invalidos)}.")
+        try:
+            # La versión que vio la planilla ("" si no había registro), como en guardar_celdas
+            versiones = {
+                am.id: int(v) if (v := request.POST.get(f"version_{am.id}", "")) else None
+                for am in inscriptos
+            }
+        except ValueError:
+            return HttpResponseBadRequest("Versión inválida.")
+
+        # Guardar sólo las filas que cambiaron, con el mismo control optimista
+        registradas = {
+            a.alumno_materia_id: a
+            for a in Asistencia.objects.filter(alumno_materia__in=inscriptos, fecha=fecha)
+        }
+        guardadas = conflictos = 0
         for am in inscriptos:
-            estado = request.POST.get(f"estado_{am.id}", "Ausente")
+            estado, version = estados[am.id], versiones[am.id]
             obs = request.POST.get(f"obs_{am.id}", "").strip()
+            actual = registradas.get(am.id)
+            if (
+                actual is not None and actual.version == version
+                and actual.estado == estado and (actual.observaciones or "") == obs
+            ):
+                continue
+            ok, _ = _aplicar_cambio(am.id, fecha, estado, obs, version)
+            guardadas += ok
+            conflictos += not ok
 
-            Asistencia.objects.update_or_create(
-                alumno_materia=am,
-                fecha=fecha,
-                defaults={
-                    "estado": estado,
-                    "observaciones": obs,
-                }
+        registrar_evento("asistencia_guardada", origen="planilla", curso=dm.id,
+                         fecha=fecha.isoformat(), filas=guardadas, conflictos=conflictos)
+        if conflictos:
+            # No se pisa lo que guardó otro docente: se vuelve a la planilla con el valor vigente
+            messages.warning(
+                request,
+                f"{conflictos} fila(s) ya habían sido modificadas por otro docente y no se "
+                f"guardaron: se muestra el valor actual.",
             )
-
+            return redirect(f"{request.path}?fecha={fecha.isoformat()}")
         messages.success(request, "Asistencias registradas correctamente.")
         return redirect("asistencias:cursos_docente")
 
-    # GET: construir estructura para la tabla
+    # GET: construir estructura para la tabla (una sola consulta de asistencias)
+    registradas = {
+        a.alumno_materia_id: a
+        for a in Asistencia.objects.filter(alumno_materia__in=inscriptos, fecha=fecha)
+    }
     alumnos = []
     for am in inscriptos:
-        asistencia = Asistencia.objects.filter(
-            alumno_materia=am,
-            fecha=fecha
-        ).first()
+        asistencia = registradas.get(am.id)
         alumnos.append({
             "alumno": am.alumno,
             "alumno_materia_id": am.id,
-            "estado": asistencia.estado if asistencia else "Presente",
+            "estado": (asistencia.estado if asistencia else None) or "Presente",
+            # Precargada por el cronograma y todavía sin tomar
+            "sin_tomar": asistencia is not None and asistencia.estado is None,
             "observaciones": asistencia.observaciones if asistencia else "",
+            # None = todavía no hay registro para esa fecha
+            "version": asistencia.version if asistencia else None,
         })
 
     context = {
         "curso": dm,
         "alumnos": alumnos,
         "fecha": fecha,
+        "max_cambios": MAX_CAMBIOS,
     }
     # Usa la plantilla "docente/marcar.html"
     return render(request, "docente/marcar.html", context)
 
 
 # ============================================================
-# MÉTRICAS DEL DOCENTE
+# GUARDADO INCREMENTAL (por celda) DE LA PLANILLA
 # ============================================================
+MAX_CAMBIOS = 200
+
+
+def _aplicar_cambio(am_id, fecha, estado, obs, version):
+    """
+    Aplica un cambio con control optimista. Devuelve (ok, asistencia_actual).
+    `version` es la que vio el cliente; None si no había registro.
+    """
+    if version is None:
+        try:
+            with transaction.atomic():
+                a = Asistencia.objects.create(
+                    alumno_materia_id=am_id, fecha=fecha, estado=estado, observaciones=obs,
+                )
+            return True, a
+        except IntegrityError:
+            pass  # otro docente lo creó antes: conflicto
+    else:
+        actualizadas = (
+            Asistencia.objects
+            .filter(alumno_materia_id=am_id, fecha=fecha, version=version)
+            .update(estado=estado, observaciones=obs, version=F("version") + 1, updated_at=now())
+        )
+        if actualizadas:
+            return True, Asistencia(
+                alumno_materia_id=am_id, fecha=fecha, estado=estado,
+                observaciones=obs, version=version + 1,
+            )
+    return False, Asistencia.objects.filter(alumno_materia_id=am_id, fecha=fecha).first()
+
+
 @login_required
 @user_passes_test(is_docente)
-def docente_metricas(request):
+@require_POST
+def guardar_celdas(request, curso_id):
     """
-    Métricas por curso para el docente.
-    Muestra KPIs + detalle por curso con asistencia promedio y alumnos en riesgo.
+    API JSON de la planilla: aplica sólo las celdas modificadas.
+
+    Entrada: {"cambios": [{"alumno_materia_id", "fecha", "estado",
+              "observaciones", "version"}, ...]}
+    Salida:  {"resultados": [{"alumno_materia_id", "fecha", "ok", "version",
+              "estado", "observaciones"}, ...]}
+
+    Si la versión no coincide (otro docente guardó antes) el resultado lleva
+    ok=false y el estado actual del servidor para que el cliente lo muestre.
     """
-    docente = get_object_or_404(Docente, user=request.user)
+    dm = get_object_or_404(DocenteMateria, id=curso_id, docente__user=request.user)
 
-    # Cursos asignados al docente
-    cursos = (
-        DocenteMateria.objects
-        .filter(docente=docente)
-        .select_related("materia", "periodo", "docente")
+    try:
+        cambios = json.loads(request.body or b"{}").get("cambios", [])
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+    if not isinstance(cambios, list) or len(cambios) > MAX_CAMBIOS:
+        return JsonResponse({"error": f"Se esperan hasta {MAX_CAMBIOS} cambios."}, status=400)
+
+    estados_validos = {e for e, _ in Asistencia.ESTADOS}
+    ids = {c.get("alumno_materia_id") for c in cambios if isinstance(c, dict)}
+    del_curso = set(
+        AlumnoMateria.objects
+        .filter(id__in=[i for i in ids if isinstance(i, int)], materia=dm.materia, periodo=dm.periodo)
+        .values_list("id", flat=True)
     )
-    total_cursos = cursos.count()
 
-    # Alumnos totales
-    am_qs = AlumnoMateria.objects.filter(
-        materia__in=cursos.values("materia"),
-        periodo__in=cursos.values("periodo"),
+    # Validar todo el lote antes de escribir
+    validos = []
+    for c in cambios:
+        try:
+            am_id = c["alumno_materia_id"]
+            fecha = date.fromisoformat(c["fecha"])
+            estado = c["estado"]
+            obs = (c.get("observaciones") or "").strip()
+            version = c.get("version")
+        except (KeyError, TypeError, ValueError):
+            return JsonResponse({"error": "Cambio mal formado."}, status=400)
+        if am_id not in del_curso or estado not in estados_validos or not (
+            version is None or isinstance(version, int)
+        ):
+            return JsonResponse({"error": f"Cambio inválido para la inscripción {am_id}."}, status=400)
+        validos.append((am_id, fecha, estado, obs, version))
+
+    resultados = []
+    for am_id, fecha, estado, obs, version in validos:
+        ok, actual = _aplicar_cambio(am_id, fecha, estado, obs, version)
+        resultados.append({
+            "alumno_materia_id": am_id,
+            "fecha": fecha.isoformat(),
+            "ok": ok,
+            "version": actual.version if actual else None,
+            "estado": actual.estado if actual else None,
+            "observaciones": (actual.observaciones or "") if actual else "",
+        })
+
+    registrar_evento(
+        "asistencia_guardada", origen="celdas", curso=dm.id, filas=len(resultados),
+        conflictos=sum(not r["ok"] for r in resultados),
     )
-    alumnos_totales = am_qs.values("alumno").distinct().count()
+    return JsonResponse({"resultados": resultados})
 
-    # Asistencias totales
-    asistencias_totales = Asistencia.objects.filter(
-        alumno_materia__in=am_qs
-    ).count()
 
-    # Detalle por curso
-    detalle_cursos = []
-    for c in cursos:
-        am_curso = AlumnoMateria.objects.filter(
-            materia=c.materia,
-            periodo=c.periodo
-        )
-        asistencias = Asistencia.objects.filter(alumno_materia__in=am_curso)
+# ============================================================
+# MÉTRICAS DEL DOCENTE
+# ============================================================
+def _detalles_cursos(docente, cursos):
+    """
+    Porcentaje de asistencia y alumnos en riesgo (< 75%) de cada curso, en
+    una sola consulta sobre el roster del docente (más las proyecciones).
+    Compartido por la vista sync y la async (ver async_views.py).
+    """
+    inscriptos = list(con_resumen(roster_docente(docente).select_related("alumno")))
+
+    # Proyección al final del periodo (requiere numpy; se calcula una vez por día)
+    try:
+        from ..proyeccion import proyecciones_de
+        proyectadas = proyecciones_de(inscriptos)
+    except ImportError:
+        proyectadas = {}
+
+    por_curso = {}
+    for am in inscriptos:
+        por_curso.setdefault((am.materia_id, am.periodo_id), []).append(am)
 
-        total = asistencias.count()
-        if total:
-            presentes = asistencias.filter(estado="Presente").count()
-            justificados = asistencias.filter(estado="Justificado").count()
-            porcentaje = round(((presentes + justificados) / total * 100), 2)
-        else:
-            porcentaje = 0
+    detalles = []
+    for c in cursos:
+        am_curso = por_curso.get((c.materia_id, c.periodo_id), [])
+        total = sum(am.total for am in am_curso)
+        ok = sum(am.presentes + am.justificados for am in am_curso)
 
-        # Alumnos en riesgo (< 75%)
+        # Alumnos en riesgo (< 75%) y en riesgo pronto (proyección < 75% o sin margen de faltas)
         alumnos_riesgo = []
+        alumnos_riesgo_pronto = []
         for am in am_curso:
-            a_qs = Asistencia.objects.filter(alumno_materia=am)
-            t = a_qs.count()
-            if not t:
+            if not am.total:
                 continue
-            p = a_qs.filter(estado="Presente").count()
-            j = a_qs.filter(estado="Justificado").count()
-            porc_ind = round(((p + j) / t * 100), 2)
-            if porc_ind < 75:
+            if porcentaje(am.presentes + am.justificados, am.total) < 75:
                 alumnos_riesgo.append(am)
+            elif am.id in proyectadas and proyectadas[am.id].en_riesgo_pronto:
+                am.proyeccion = proyectadas[am.id]
+                alumnos_riesgo_pronto.append(am)
 
-        detalle_cursos.append({
+        detalles.append({
             "curso": c,
-            "porcentaje": porcentaje,
+            "porcentaje": porcentaje(ok, total),
             "alumnos_riesgo": alumnos_riesgo,
             "cant_riesgo": len(alumnos_riesgo),
+            "alumnos_riesgo_pronto": alumnos_riesgo_pronto,
+            "cant_riesgo_pronto": len(alumnos_riesgo_pronto),
         })
+    return detalles
+
+
+@login_required
+@user_passes_test(is_docente)
+@usar_replica
+@con_docente
+def docente_metricas(request, docente):
+    """
+    Métricas por curso para el docente.
+    Muestra KPIs + detalle por curso con asistencia promedio y alumnos en riesgo.
+    """
+
+    # Cursos asignados al docente
+    cursos = (
+        DocenteMateria.objects
+        .filter(docente=docente)
+        .select_related("materia", "periodo", "docente")
+    )
+    total_cursos = cursos.count()
+
+    # Alumnos y asistencias totales
+    totales = totales_docente(docente)
+
+    # Detalle por curso
+    detalle_cursos = _detalles_cursos(docente, cursos)
 
     context = {
         "total_cursos": total_cursos,
-        "alumnos_totales": alumnos_totales,
-        "asistencias_totales": asistencias_totales,
+        "alumnos_totales": totales["alumnos"],
+        "asistencias_totales": totales["asistencias"],
         "detalle_cursos": detalle_cursos,
     }
     return render(request, "docente/metricas.html", context)
@@ -6,6 +6,7 @@ from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth import update_session_auth_hash
 
 from ..models import User, Docente, Alumno
+from ..perfiles import invalidar_perfil
 from ..forms import (
     PerfilUserForm,
     PerfilDocenteForm,
@@ -72,6 +73,7 @@ def editar_perfil(request):
                 docente_form.save()
             if alumno_form:
                 alumno_form.save()
+            invalidar_perfil(user)
             messages.success(request, "Perfil actualizado correctamente.")
             return redirect("asistencias:editar_perfil")
         else:
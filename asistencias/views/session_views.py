@@ -1,25 +1,27 @@
-from django.contrib.sessions.models import Session
+from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
+from django.db.models import F
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.views.decorators.http import require_POST
+
+from ..models import User
 
 
 @login_required
+@require_POST
 def logout_all_devices(request):
-    """Eliminar todas las sesiones activas del usuario actual.
+    """Cerrar todas las sesiones del usuario actual, incluida ésta.
 
-    Esto cierra la sesión en otros dispositivos y en el actual (si se desea).
+    Incrementa `sesiones_version`, que forma parte del hash de autenticación
+    guardado en cada sesión: las de otros dispositivos dejan de validar en su
+    próximo request, con cualquier SESSION_ENGINE (también las cookies
+    firmadas, que no se pueden borrar del lado del servidor). No recorre la
+    tabla de sesiones.
     """
     user = request.user
-    deleted = 0
-    for s in Session.objects.all():
-        try:
-            data = s.get_decoded()
-        except Exception:
-            continue
-        if data.get('_auth_user_id') == str(user.id):
-            s.delete()
-            deleted += 1
+    User.objects.filter(pk=user.pk).update(sesiones_version=F("sesiones_version") + 1)
+    logout(request)
 
-    messages.success(request, f'Sesiones cerradas: {deleted}')
-    return redirect('asistencias:editar_perfil')
+    messages.success(request, "Se cerró la sesión en todos los dispositivos.")
+    return redirect('login')
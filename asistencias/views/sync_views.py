@@ -0,0 +1,62 @@
+# asistencias/views/sync_views.py
+import json
+
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET, require_POST
+
+from ..permissions import is_docente
+from ..registro import registrar_evento
+from ..sync import ErrorSync, MAX_CAMBIOS, aplicar_operaciones, cambios_desde
+
+
+# ============================================================
+# DOCENTE: sincronización offline de la planilla
+# ============================================================
+@login_required
+@user_passes_test(is_docente)
+@require_POST
+def sync_subir(request):
+    """
+    Recibe la cola de operaciones acumuladas sin conexión.
+
+    Entrada: {"operaciones": [{"clave", "alumno_materia_id", "fecha",
+              "estado", "observaciones"}, ...]}
+    Salida:  {"resultados": [{"k", "r", "v"}, ...]} en el mismo orden.
+
+    Reenviar un lote ya procesado es seguro: las claves conocidas
+    responden "dup" sin volver a escribir.
+    """
+    try:
+        operaciones = json.loads(request.body or b"{}").get("operaciones", [])
+    except (ValueError, AttributeError):
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+    try:
+        resultados = aplicar_operaciones(request.user, operaciones)
+    except ErrorSync as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    registrar_evento(
+        "asistencia_guardada", origen="sync", filas=len(resultados),
+        duplicadas=sum(r["r"] == "dup" for r in resultados),
+    )
+    return JsonResponse({"resultados": resultados})
+
+
+@never_cache
+@login_required
+@user_passes_test(is_docente)
+@require_GET
+def sync_cambios(request):
+    """
+    Cambios de asistencia en los cursos del docente posteriores a ?cursor=
+    (sin cursor: desde el principio). Filas: [id, alumno_materia_id, fecha,
+    estado, observaciones, version]. Si "mas" es true, volver a pedir con
+    el cursor devuelto.
+    """
+    try:
+        limite = int(request.GET.get("limite", MAX_CAMBIOS))
+        filas, cursor, mas = cambios_desde(request.user, request.GET.get("cursor"), limite)
+    except ValueError as e:  # incluye ErrorSync
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"cambios": filas, "cursor": cursor, "mas": mas})
@@ -0,0 +1,50 @@
+# asistencias/widgets.py
+"""
+Widgets de autocompletar para campos ModelChoiceField /
+ModelMultipleChoiceField con tablas grandes (alumnos, docentes, materias).
+
+Sólo renderizan las opciones ya elegidas (una consulta por pk, no la tabla
+entera); static/js/autocompletar.js agrega un buscador que pide el resto al
+endpoint JSON (ver views/autocompletar_views.py). La validación sigue
+siendo la del campo, que consulta únicamente los ids enviados.
+"""
+from django import forms
+from django.urls import reverse
+
+
+class _AutocompletarMixin:
+    def __init__(self, url_name, attrs=None, placeholder="Buscar…"):
+        self.url_name = url_name
+        self.placeholder = placeholder
+        super().__init__(attrs)
+
+    class Media:
+        js = ("js/autocompletar.js",)
+
+    def get_context(self, name, value, attrs):
+        attrs = {
+            **(attrs or {}),
+            "data-autocompletar": reverse(self.url_name),
+            "data-placeholder": self.placeholder,
+        }
+        return super().get_context(name, value, attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        ids = [str(v) for v in value if str(v).isdigit()]
+        opciones = []
+        if not self.allow_multiple_selected:
+            opciones.append(self.create_option(name, "", "---------", not ids, 0, attrs=attrs))
+        if ids:
+            qs = self.choices.queryset.filter(pk__in=ids)
+            label = self.choices.field.label_from_instance
+            for i, obj in enumerate(qs, start=len(opciones)):
+                opciones.append(self.create_option(name, obj.pk, label(obj), True, i, attrs=attrs))
+        return [(None, opciones, 0)]
+
+
+class AutocompletarSelect(_AutocompletarMixin, forms.Select):
+    pass
+
+
+class AutocompletarSelectMultiple(_AutocompletarMixin, forms.SelectMultiple):
+    pass
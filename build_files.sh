@@ -10,6 +10,9 @@ export DJANGO_SETTINGS_MODULE=asistencia.settings
 echo "Ejecutando migraciones..."
 python manage.py migrate --noinput
 
+echo "Creando tablas de cache (SESION_CACHE=db)..."
+python manage.py createcachetable
+
 echo "Creando superusuario (si no existe)..."
 python - << 'EOF'
 import os
@@ -28,6 +31,12 @@ EOF
 echo "Ejecutando collectstatic..."
 python manage.py collectstatic --noinput --clear
 
+echo "Precompilando plantillas..."
+python manage.py precompilar_plantillas
+
+echo "Generando bytecode (.pyc) para acelerar el arranque en frío..."
+python -m compileall -q asistencia asistencias
+
 echo ""
 echo "=================================================="
 echo "Build completado!"
@@ -0,0 +1,78 @@
+// static/js/autocompletar.js
+// Buscador para los <select data-autocompletar="url"> (ver asistencias/widgets.py).
+// El select sólo trae las opciones elegidas; al escribir se piden coincidencias
+// al endpoint JSON y se muestran junto a lo ya seleccionado.
+(function () {
+  const ESPERA_MS = 250;
+
+  function opcion(id, texto, seleccionada) {
+    const o = new Option(texto, id, false, seleccionada);
+    o.dataset.resultado = seleccionada ? '' : '1';
+    return o;
+  }
+
+  function iniciar(select) {
+    const url = select.dataset.autocompletar;
+    const buscador = document.createElement('input');
+    buscador.type = 'search';
+    buscador.className = 'form-control form-control-sm mb-1';
+    buscador.placeholder = select.dataset.placeholder || 'Buscar…';
+    buscador.autocomplete = 'off';
+    select.parentNode.insertBefore(buscador, select);
+
+    const mas = document.createElement('button');
+    mas.type = 'button';
+    mas.className = 'btn btn-link btn-sm p-0 d-none';
+    mas.textContent = 'Ver más resultados';
+    select.parentNode.insertBefore(mas, select.nextSibling);
+
+    let temporizador = null;
+    let pedido = null;
+    let pagina = 1;
+
+    function limpiar() {
+      // Quita los resultados anteriores que no quedaron elegidos
+      Array.from(select.options).forEach(o => {
+        if (o.dataset.resultado && !o.selected) o.remove();
+        else if (o.selected) o.dataset.resultado = '';
+      });
+    }
+
+    async function buscar(agregar) {
+      const q = buscador.value.trim();
+      if (pedido) pedido.abort();
+      if (!agregar) { pagina = 1; limpiar(); }
+      if (q.length < 2 && !/^\d+$/.test(q)) { mas.classList.add('d-none'); return; }
+
+      pedido = new AbortController();
+      try {
+        const r = await fetch(`${url}?q=${encodeURIComponent(q)}&page=${pagina}`, {
+          signal: pedido.signal,
+          headers: { 'Accept': 'application/json' },
+        });
+        if (!r.ok) return;
+        const datos = await r.json();
+        const presentes = new Set(Array.from(select.options).map(o => o.value));
+        datos.resultados.forEach(({ id, texto }) => {
+          if (!presentes.has(String(id))) select.add(opcion(id, texto, false));
+        });
+        mas.classList.toggle('d-none', !datos.mas);
+      } catch (e) {
+        if (e.name !== 'AbortError') throw e;
+      }
+    }
+
+    buscador.addEventListener('input', () => {
+      clearTimeout(temporizador);
+      temporizador = setTimeout(() => buscar(false), ESPERA_MS);
+    });
+    buscador.addEventListener('keydown', e => {
+      if (e.key === 'Enter') e.preventDefault();  // no enviar el formulario
+    });
+    mas.addEventListener('click', () => { pagina += 1; buscar(true); });
+  }
+
+  document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('select[data-autocompletar]').forEach(iniciar);
+  });
+})();